@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - benchmark suite
+Generates databases at several scale factors, then times every registered query (the
+'queries' dict in solutions/queries.py and the tier queries in helper_utils/solutions.py)
+through each solution path - a plain sqlite3 cursor, as in query_starter,
+pandas.read_sql_query, as in my_solutions, and the NumPy engine in columnar.py for the
+queries it implements. Results are written as JSON and can be checked against a saved
+baseline.
+
+Every measurement runs in a freshly spawned process, so the peak RSS reported is that
+measurement's own. "cold" runs open a new connection each time (empty SQLite page cache,
+the OS file cache is not dropped); "warm" runs reuse one connection after a warm-up run.
+For 'columnar', cold is loading the column store plus the query, warm the query alone on a
+loaded store, and every result is checked row for row against the sqlite3 answer.
+Any single execution running past --timeout seconds is interrupted (through SQLite's progress
+handler) and its cell is reported as timed out, so one slow query at a large scale can't
+stall the whole matrix.
+
+--startup instead times how long main.py takes to start and answer one query, each run
+a new interpreter, against a bare 'python -c pass'.
+
+Usage (from the repository root):
+    python3 -m helper_utils.benchmark --scales 1 10 100 --save-baseline
+    python3 -m helper_utils.benchmark --scales 1 10 100 --baseline benchmarks/baseline.json
+    python3 -m helper_utils.benchmark --startup --repeat 20
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+
+implementations = ('sqlite3', 'pandas', 'columnar')
+
+# SQLite VM instructions between progress-handler calls - checking the clock is cheap next
+# to this many steps, and an overrun is noticed within a millisecond or so
+PROGRESS_STEPS = 10000
+
+# Command lines timed by --startup, run from the repository root
+startup_commands = {
+    'python -c pass': ['-c', 'pass'],
+    'main.py --help': ['main.py', '--help'],
+    'main.py query boot_errors': ['main.py', 'query', 'boot_errors'],
+    'main.py query boot_errors --pandas': ['main.py', 'query', 'boot_errors', '--pandas'],
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of 'values'."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    return {
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p95_ms': percentile(timings, 95) * 1000,
+        'min_ms': min(timings) * 1000,
+    }
+
+
+def peak_rss_kib() -> int:
+    # VmHWM starts over at exec; ru_maxrss would carry the parent's high-water mark
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS reports bytes
+
+
+def measure_generation(db_path: str, scale: int, sessions: int, seed: int,
+                       workers: int | None) -> dict:
+    """Worker entry point: build one database and time it."""
+    from helper_utils.generate_ctf_db import generate, generate_parallel
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    start = time.perf_counter()
+    if workers:
+        stats = generate_parallel(db_path, scale, sessions, workers, seed=seed,
+                                  vectorized=True, verbose=False)
+    else:
+        stats = generate(db_path, scale, sessions, bulk=True, seed=seed, vectorized=True,
+                         verbose=False)
+    return {
+        'seconds': time.perf_counter() - start,
+        'rows': int(sum(rows for rows, _ in stats.values())),
+        'bytes': os.path.getsize(db_path),
+        'peak_rss_kib': peak_rss_kib(),
+    }
+
+
+class TimedOut(Exception):
+    """An execution ran past the per-query timeout."""
+
+
+def within(timeout: float | None, conn: sqlite3.Connection, execute, *args):
+    """execute(*args) with every statement on 'conn' interrupted after 'timeout' seconds."""
+    if not timeout:
+        return execute(*args)
+    deadline = time.perf_counter() + timeout
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, PROGRESS_STEPS)
+    try:
+        return execute(*args)
+    except Exception:
+        # sqlite3 raises OperationalError('interrupted'); pandas wraps it in its own error
+        if time.perf_counter() > deadline:
+            raise TimedOut from None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def timed_out(timeout: float) -> dict:
+    return {'timed_out': True, 'timeout_s': timeout, 'peak_rss_kib': peak_rss_kib()}
+
+
+def measure_query(db_path: str, name: str, sql: str, implementation: str, repeat: int,
+                  timeout: float | None = None) -> dict:
+    """
+    Worker entry point: 'repeat' cold and 'repeat' warm executions of one query, or a
+    timed-out record as soon as one of them runs past 'timeout' seconds.
+    """
+    if implementation == 'columnar':
+        return measure_columnar(db_path, name, sql, repeat, timeout)
+    if implementation == 'pandas':
+        import pandas as pd
+
+        def execute(conn):
+            return len(pd.read_sql_query(sql, con=conn))
+    else:
+        def execute(conn):
+            return len(conn.execute(sql).fetchall())
+
+    try:
+        cold = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn = sqlite3.connect(db_path)
+            try:
+                rows = within(timeout, conn, execute, conn)
+            finally:
+                conn.close()
+            cold.append(time.perf_counter() - start)
+
+        warm = []
+        conn = sqlite3.connect(db_path)
+        try:
+            within(timeout, conn, execute, conn)  # Warm-up
+            for _ in range(repeat):
+                start = time.perf_counter()
+                within(timeout, conn, execute, conn)
+                warm.append(time.perf_counter() - start)
+        finally:
+            conn.close()
+    except TimedOut:
+        return timed_out(timeout)
+    return {
+        'rows': rows,
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'peak_rss_kib': peak_rss_kib(),
+    }
+
+
+def measure_columnar(db_path: str, name: str, sql: str, repeat: int,
+                     timeout: float | None = None) -> dict:
+    """
+    measure_query for the column store, plus whether it agrees with SQLite ('matches' is
+    None if the SQLite answer itself timed out). Loading is interruptible like any query;
+    the NumPy work is not, so a run that finishes past 'timeout' counts as timed out.
+    """
+    from helper_utils.columnar import ColumnStore, equivalent
+
+    def run_store(store):
+        start = time.perf_counter()
+        _, rows = store.run(name)
+        if timeout and time.perf_counter() - start > timeout:
+            raise TimedOut
+        return rows
+
+    try:
+        cold = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn = sqlite3.connect(db_path)
+            try:
+                store = within(timeout, conn, ColumnStore.load, conn)
+            finally:
+                conn.close()
+            rows = run_store(store)
+            cold.append(time.perf_counter() - start)
+
+        warm = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_store(store)
+            warm.append(time.perf_counter() - start)
+    except TimedOut:
+        return timed_out(timeout)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        expected = within(timeout, conn, lambda: conn.execute(sql).fetchall())
+    except TimedOut:
+        expected = None
+    finally:
+        conn.close()
+    return {
+        'rows': len(rows),
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'peak_rss_kib': peak_rss_kib(),
+        'matches': None if expected is None else equivalent(name, expected, rows),
+    }
+
+
+def isolated(function, *args):
+    """Run function(*args) in a fresh spawned process and return its result."""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def measure_startup(repeat: int = 10, db_path: str = 'kernel_logs.db') -> list[dict]:
+    """Wall time of each startup_commands entry, a fresh interpreter every run."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    db_path = os.path.abspath(db_path)
+    results = []
+    for label, command in startup_commands.items():
+        argv = [sys.executable] + command
+        if 'query' in command:
+            argv += ['--db', db_path]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(argv, cwd=root, check=True, stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+        results.append({'name': label, **summarize(timings)})
+    return results
+
+
+def print_startup(results: list[dict]) -> None:
+    floor = results[0]['p50_ms']
+    print(f"\n{'Command':<38} {'p50 ms':>9} {'p95 ms':>9} {'min ms':>9} {'over python':>12}")
+    print("-" * 81)
+    for r in results:
+        print(f"{r['name']:<38} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['min_ms']:>9.1f} "
+              f"{r['p50_ms'] - floor:>+12.1f}")
+
+
+def run(scales: list[int], sessions: int = 3, repeat: int = 5, seed: int = 42,
+        workdir: str = 'benchmarks', reuse: bool = False,
+        impls: tuple[str, ...] = implementations, workers: int | None = None,
+        timeout: float | None = 60.0, verbose: bool = True) -> dict:
+    """
+    Benchmark every scale and return {'meta': {...}, 'results': [...]}. Executions longer
+    than 'timeout' seconds (None for no limit) are cut off and recorded as timed out.
+    """
+    from helper_utils.columnar import implementations as columnar_queries
+    from helper_utils.index_advisor import registered_queries
+
+    os.makedirs(workdir, exist_ok=True)
+    workload = registered_queries()
+    results = []
+    for scale in scales:
+        db_path = os.path.join(workdir, f"bench_x{scale}.db")
+        if not (reuse and os.path.exists(db_path)):
+            generation = isolated(measure_generation, db_path, scale, sessions, seed, workers)
+            results.append({'scale': scale, 'name': 'generate', 'impl': 'generate', **generation})
+            if verbose:
+                print(f"x{scale:<6} generate {generation['rows']:>12,} rows "
+                      f"{generation['seconds']:>9.2f}s", flush=True)
+        for name, sql in workload.items():
+            for impl in impls:
+                if impl == 'columnar' and name not in columnar_queries:
+                    continue
+                measured = isolated(measure_query, db_path, name, sql, impl, repeat, timeout)
+                results.append({'scale': scale, 'name': name, 'impl': impl, **measured})
+                if verbose:
+                    print(f"x{scale:<6} {name:<26} {impl:<8} {cell(measured)}", flush=True)
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'sessions': sessions,
+            'repeat': repeat,
+            'seed': seed,
+            'timeout_s': timeout,
+        },
+        'results': results,
+    }
+
+
+def cell(result: dict) -> str:
+    if result.get('timed_out'):
+        return f"timed out after {result['timeout_s']:g}s"
+    return f"warm p50 {result['warm']['p50_ms']:>10.2f} ms"
+
+
+def headline(result: dict) -> float | None:
+    """
+    The number compared against the baseline: warm p50 ms, or build time for generation.
+    None if the query timed out.
+    """
+    if result['name'] == 'generate':
+        return result['seconds'] * 1000
+    if result.get('timed_out'):
+        return None
+    return result['warm']['p50_ms']
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25,
+            floor_ms: float = 1.0) -> list[dict]:
+    """
+    Results slower than the baseline by more than 'threshold' (a fraction) and by more than
+    'floor_ms' in absolute terms, which keeps sub-millisecond noise from counting. A query
+    that now times out but didn't before counts too, with 'current_ms' None.
+    """
+    previous = {(r['scale'], r['name'], r['impl']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get((result['scale'], result['name'], result['impl']))
+        if old is None:
+            continue
+        before, after = headline(old), headline(result)
+        if before is None:
+            continue  # Nothing to compare against
+        if after is None:
+            regressions.append({'scale': result['scale'], 'name': result['name'],
+                                'impl': result['impl'], 'baseline_ms': before,
+                                'current_ms': None, 'ratio': None})
+        elif after > before * (1 + threshold) and after - before > floor_ms:
+            regressions.append({'scale': result['scale'], 'name': result['name'],
+                                'impl': result['impl'], 'baseline_ms': before,
+                                'current_ms': after, 'ratio': after / before})
+    return regressions
+
+
+def mismatches(report: dict) -> list[dict]:
+    """Columnar results that disagree with SQLite."""
+    return [r for r in report['results'] if r.get('matches') is False]
+
+
+def print_report(report: dict, regressions: list[dict]) -> None:
+    print(f"\n{'Scale':<7} {'Query':<26} {'Impl':<9} {'Rows':>10} {'Cold p50':>10} "
+          f"{'Warm p50':>10} {'Warm p95':>10} {'RSS MiB':>8}")
+    print("-" * 96)
+    for r in report['results']:
+        if r['name'] == 'generate':
+            print(f"x{r['scale']:<6} {'generate':<26} {'':<9} {r['rows']:>10,} "
+                  f"{r['seconds'] * 1000:>10.1f} {'':>10} {'':>10} {r['peak_rss_kib'] / 1024:>8.1f}")
+        elif r.get('timed_out'):
+            print(f"x{r['scale']:<6} {r['name']:<26} {r['impl']:<9} {'':>10} "
+                  f"{'timed out after ' + format(r['timeout_s'], 'g') + 's':>32} "
+                  f"{r['peak_rss_kib'] / 1024:>8.1f}")
+        else:
+            print(f"x{r['scale']:<6} {r['name']:<26} {r['impl']:<9} {r['rows']:>10,} "
+                  f"{r['cold']['p50_ms']:>10.2f} {r['warm']['p50_ms']:>10.2f} "
+                  f"{r['warm']['p95_ms']:>10.2f} {r['peak_rss_kib'] / 1024:>8.1f}")
+    for r in regressions:
+        if r['current_ms'] is None:
+            print(f"❌ REGRESSION x{r['scale']} {r['name']} ({r['impl']}): "
+                  f"{r['baseline_ms']:.2f} ms -> timed out")
+            continue
+        print(f"❌ REGRESSION x{r['scale']} {r['name']} ({r['impl']}): "
+              f"{r['baseline_ms']:.2f} -> {r['current_ms']:.2f} ms ({r['ratio']:.2f}x)")
+    for r in mismatches(report):
+        print(f"❌ MISMATCH x{r['scale']} {r['name']} ({r['impl']}): "
+              f"the result differs from SQLite's")
+    if any('matches' in r for r in report['results']) and not mismatches(report):
+        print("✅ Every columnar result matches SQLite")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark generation and every registered query")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Scale factors to generate and query")
+    parser.add_argument('--sessions', type=int, default=3, help="Boot sessions per database")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per cold/warm mode")
+    parser.add_argument('--seed', type=int, default=42, help="Generator seed")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Generate with this many processes")
+    parser.add_argument('--impl', nargs='+', choices=implementations, default=implementations,
+                        help="Solution paths to time")
+    parser.add_argument('--workdir', default='benchmarks', help="Where the databases go")
+    parser.add_argument('--reuse', action='store_true',
+                        help="Reuse databases already in --workdir instead of regenerating")
+    parser.add_argument('--output', default=None,
+                        help="Results file (default <workdir>/results.json)")
+    parser.add_argument('--baseline', default=None, help="Baseline results to compare against")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Also write the results to <workdir>/baseline.json")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed slowdown over the baseline, as a fraction")
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="Seconds before one query execution is cut off (0 = no limit)")
+    parser.add_argument('--startup', action='store_true',
+                        help="Time main.py start-up instead (uses --repeat and --db)")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database for --startup queries")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.startup:
+        results = measure_startup(args.repeat, args.db)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'startup': results}, f, indent=2)
+        print_startup(results)
+        return 0
+
+    report = run(args.scales, args.sessions, args.repeat, args.seed, args.workdir,
+                 args.reuse, tuple(args.impl), args.workers, args.timeout or None)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report['regressions'] = regressions
+
+    output = args.output or os.path.join(args.workdir, 'results.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(os.path.join(args.workdir, 'baseline.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print_report(report, regressions)
+    print(f"\n📄 Results written to {output}")
+    return 1 if regressions or mismatches(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
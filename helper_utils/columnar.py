@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - vectorized columnar engine
+Loads the columns the challenge queries touch from all six tables once, into NumPy arrays,
+and answers the tier queries (and their 'queries' dict twins) with masks and bincounts
+instead of SQLite's row-at-a-time joins. Built for asking the same aggregations over and
+over of one unchanging snapshot.
+
+Every filtered or grouped column is factorized: an int32 code per row into a sorted list of
+its distinct values. Module names share one list across all tables, so a per-module
+aggregate from any table is np.bincount over the same codes, and "module satisfies A in
+table X and B in table Y" is an AND of two length-M boolean arrays. WHERE predicates are
+evaluated once per distinct value with SQLite's semantics (NULL never matches, LIKE is
+ASCII case-insensitive, numbers sort before text), then broadcast to the rows by code.
+
+    from helper_utils.columnar import ColumnStore
+
+    store = ColumnStore.load(sqlite3.connect('kernel_logs.db'))
+    columns, rows = store.run('tier:4.1')
+
+Usage (from the repository root):
+    python3 -m helper_utils.columnar                    # time and check every query vs SQL
+    python3 -m helper_utils.columnar --repeat 50
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+MODULE = 'module'  # Column factorized over the shared module list
+FACTOR = 'factor'  # Column factorized over its own values
+FLOAT = 'float'  # Raw float64, NULL as NaN
+
+# The columns loaded from each table
+store_columns = {
+    'boot_logs': {'log_level': FACTOR, 'boot_session': FACTOR},
+    'module_events': {'module_name': MODULE, 'status': FACTOR, 'boot_session': FACTOR,
+                      'timestamp': FLOAT},
+    'error_codes': {'affected_module': MODULE, 'severity': FACTOR, 'subsystem': FACTOR,
+                    'timestamp': FLOAT},
+    'memory_events': {'requesting_module': MODULE, 'allocation_success': FACTOR,
+                      'timestamp': FLOAT},
+    'device_drivers': {'parent_module': MODULE, 'driver_name': FACTOR,
+                       'initialization_status': FACTOR},
+    'system_calls': {'caller_module': MODULE, 'return_code': FACTOR, 'timestamp': FLOAT},
+}
+
+module_columns = {table: column for table, columns in store_columns.items()
+                  for column, kind in columns.items() if kind == MODULE}
+
+
+def sql_order(value) -> tuple:
+    """Sort key matching SQLite's ORDER BY across types: NULL, numbers, text, then blobs."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, value) if isinstance(value, str) else (3, value)
+
+
+def sql_round(value: float, digits: int = 0) -> float:
+    """
+    SQLite's ROUND(): half away from zero on the value's shortest decimal form. Python's
+    round() works on the exact binary value and breaks ties to even, so e.g. 3.125 gives
+    3.12 where SQLite gives 3.13.
+    """
+    return float(Decimal(repr(value)).quantize(Decimal(1).scaleb(-digits), ROUND_HALF_UP))
+
+
+# WHERE predicates, applied to single values
+def equals(*options) -> Callable:
+    return lambda v: v is not None and not isinstance(v, bytes) and v in options
+
+
+def below(limit: float) -> Callable:
+    return lambda v: isinstance(v, (int, float)) and v < limit
+
+
+def like(pattern: str) -> Callable:
+    regex = re.compile(''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c)
+                               for c in pattern), re.IGNORECASE | re.ASCII | re.DOTALL)
+    return lambda v: v is not None and regex.fullmatch(str(v)) is not None
+
+
+class Factor(NamedTuple):
+    codes: np.ndarray  # int32, one per row
+    values: list  # Distinct values in SQL order; codes index into it
+
+    def mask(self, predicate: Callable) -> np.ndarray:
+        """Rows whose value satisfies 'predicate' - evaluated once per distinct value."""
+        return np.array([predicate(v) for v in self.values], dtype=bool)[self.codes]
+
+
+def _sorted_factor(codes: np.ndarray, vocab: dict) -> Factor:
+    """Renumber codes so that their order is the values' SQL order."""
+    values = list(vocab)
+    order = sorted(range(len(values)), key=lambda i: sql_order(values[i]))
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    return Factor(remap[codes] if len(codes) else codes, [values[i] for i in order])
+
+
+def _factorize(values: tuple, vocab: dict) -> np.ndarray:
+    return np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), np.int32, len(values))
+
+
+class Implementation(NamedTuple):
+    method: str  # ColumnStore method computing the rows
+    order_key: Callable | None  # The query's ORDER BY, as a row -> key function
+    limited: bool = False  # LIMIT may cut through a group of tied rows
+
+
+def _column(i: int) -> Callable:
+    return lambda row: row[i]
+
+
+def _sum_of(*columns: int) -> Callable:
+    return lambda row: sum(row[i] for i in columns)
+
+
+implementations = {
+    'tier:1.2': Implementation('error_sessions', _column(0)),
+    'tier:2.1': Implementation('top_failed_loads', _column(1), limited=True),
+    'tier:2.2': Implementation('failed_with_severe_errors', _column(0)),
+    'tier:3.1': Implementation('triple_threat', _sum_of(1, 2, 3)),
+    'tier:3.2': Implementation('syscall_failures_near_loads', _column(0)),
+    'tier:4.1': Implementation('memory_failure_rates', _column(3)),
+    'tier:4.2': Implementation('network_driver_failures', None),
+    'tier:5.1': Implementation('netfilter_timeline', _column(0), limited=True),
+    'tier:5.2': Implementation('danger_scores', _column(6)),
+    'my:boot_errors': Implementation('boot_errors', _column(0)),
+    'my:failed_modules': Implementation('failed_modules', _column(1)),
+    'my:ct_investigation': Implementation('ct_investigation', _column(1)),
+    'my:triple_threat': Implementation('loose_triple_threat', _sum_of(1, 2, 3)),
+    'my:temporal_analysis': Implementation('syscall_failures_near_loads', _column(0)),
+}
+
+
+class ColumnStore:
+    """The six tables as column arrays; see the module docstring."""
+
+    def __init__(self, tables: dict[str, dict], modules: list):
+        self.tables = tables
+        self.modules = modules
+        self.valid = np.array([m is not None for m in modules], dtype=bool)  # Joinable
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> 'ColumnStore':
+        module_vocab, module_codes, tables = {}, {}, {}
+        for table, columns in store_columns.items():
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+            data = list(zip(*rows)) or [()] * len(columns)
+            tables[table] = {}
+            for (column, kind), values in zip(columns.items(), data):
+                if kind == FLOAT:
+                    tables[table][column] = np.fromiter(
+                        (np.nan if v is None else v for v in values), np.float64, len(values)
+                    )
+                elif kind == MODULE:
+                    module_codes[table] = _factorize(values, module_vocab)
+                else:
+                    vocab = {}
+                    tables[table][column] = _sorted_factor(_factorize(values, vocab), vocab)
+        for table, codes in module_codes.items():
+            tables[table][module_columns[table]] = _sorted_factor(codes, module_vocab)
+        return cls(tables, _sorted_factor(np.empty(0, np.int32), module_vocab).values)
+
+    def run(self, name: str) -> tuple[list[str], list[tuple]]:
+        """(column names, rows) for a registered query name with an implementation."""
+        return getattr(self, implementations[name].method)()
+
+    # ---- building blocks ------------------------------------------------------------------
+
+    def _modules(self, table: str) -> np.ndarray:
+        return self.tables[table][module_columns[table]].codes
+
+    def per_module(self, table: str, mask: np.ndarray | None = None) -> np.ndarray:
+        """Rows per module (matching 'mask', if given), indexed by module code."""
+        codes = self._modules(table)
+        return np.bincount(codes if mask is None else codes[mask],
+                           minlength=len(self.modules))
+
+    def where(self, table: str, column: str, predicate: Callable) -> np.ndarray:
+        return self.tables[table][column].mask(predicate)
+
+    def _failed(self) -> np.ndarray:
+        return self.per_module('module_events',
+                               self.where('module_events', 'status', equals('FAILED')))
+
+    def _module_rows(self, selected: np.ndarray, *columns: np.ndarray,
+                     descending: np.ndarray | None = None) -> list[tuple]:
+        """One row per selected module code, ordered by module name or a descending key."""
+        codes = np.flatnonzero(selected)
+        if descending is not None:
+            codes = codes[np.argsort(-descending[codes], kind='stable')]
+        return [(self.modules[c],) + tuple(column[c].item() for column in columns)
+                for c in codes]
+
+    def _by_module(self, table: str, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Module codes and timestamps of the 'mask' rows, sorted by module then time."""
+        modules = self._modules(table)[mask]
+        times = self.tables[table]['timestamp'][mask]
+        order = np.lexsort((times, modules))
+        return modules[order], times[order]
+
+    def _rate(self, numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """ROUND(CAST(numerator AS REAL) / denominator * 100, 2) per module, 0 without rows."""
+        rate = np.zeros(len(self.modules))
+        grouped = denominator > 0
+        ratios = numerator[grouped].astype(np.float64) / denominator[grouped] * 100
+        rate[grouped] = [sql_round(r, 2) for r in ratios.tolist()]
+        return rate
+
+    def _distinct(self, factor: Factor, mask: np.ndarray) -> list:
+        return [factor.values[c] for c in np.unique(factor.codes[mask])]
+
+    # ---- the queries ----------------------------------------------------------------------
+
+    def error_sessions(self, levels=('ERROR', 'CRIT'), column='boot_session'):
+        mask = self.where('boot_logs', 'log_level', equals(*levels))
+        sessions = self._distinct(self.tables['boot_logs']['boot_session'], mask)
+        return [column], [(session,) for session in sessions]
+
+    def boot_errors(self):
+        columns, rows = self.error_sessions(('ERROR', 'CRITICAL'), 'sessions_with_errors')
+        return columns, rows[::-1]
+
+    def failed_modules(self, limit: int | None = None):
+        failed = self._failed()
+        rows = self._module_rows(failed > 0, failed, descending=failed)
+        return ['module_name', 'failure_count'], rows[:limit]
+
+    def top_failed_loads(self):
+        return self.failed_modules(limit=10)
+
+    def failed_with_severe_errors(self):
+        severe = self.per_module('error_codes', self.where(
+            'error_codes', 'severity', equals('HIGH', 'CRITICAL')))
+        selected = (self._failed() > 0) & (severe > 0) & self.valid
+        return ['module_name'], self._module_rows(selected)
+
+    def ct_investigation(self):
+        errors = self.tables['error_codes']
+        severity = errors['severity']
+        critical, high = like('CRIT%'), like('H___')
+        matching = severity.mask(lambda v: critical(v) or high(v))
+        modules = self._modules('error_codes')
+        failed = (self._failed() > 0) & self.valid
+        mask = matching & failed[modules]
+        pairs = np.unique(modules[mask].astype(np.int64) * len(severity.values)
+                          + severity.codes[mask])
+        module_codes, severity_codes = np.divmod(pairs, len(severity.values))
+        order = np.argsort(severity_codes, kind='stable')
+        return ['module_name', 'error_severity'], [
+            (self.modules[module_codes[i]], severity.values[severity_codes[i]]) for i in order
+        ]
+
+    def _triple_threat(self, critical: Callable, memory_failed: Callable):
+        failed = self._failed()
+        errors = self.per_module('error_codes',
+                                 self.where('error_codes', 'severity', critical))
+        memory = self.per_module('memory_events', self.where(
+            'memory_events', 'allocation_success', memory_failed))
+        selected = (failed > 0) & (errors > 0) & (memory > 0) & self.valid
+        return self._module_rows(selected, failed, errors, memory,
+                                 descending=failed + errors + memory)
+
+    def triple_threat(self):
+        rows = self._triple_threat(equals('CRITICAL'), equals(0))
+        return ['module_name', 'failed_loads', 'critical_errors', 'memory_failures'], rows
+
+    def loose_triple_threat(self):
+        # my:triple_threat's LIKE 'CRIT%' and allocation_success != 'True', as SQLite reads them
+        rows = self._triple_threat(like('CRIT%'),
+                                   lambda v: v is not None and v != 'True')
+        return ['module_name', 'failed_loads', 'crit_errors', 'mem_failures'], rows
+
+    def syscall_failures_near_loads(self, window: float = 100):
+        loads = self.where('module_events', 'boot_session', equals(2, 3))
+        failures = self.where('system_calls', 'return_code', below(0))
+        load_modules, load_times = self._by_module('module_events', loads)
+        call_modules, call_times = self._by_module('system_calls', failures)
+        load_bounds = np.searchsorted(load_modules, np.arange(len(self.modules) + 1))
+        call_bounds = np.searchsorted(call_modules, np.arange(len(self.modules) + 1))
+        found = np.zeros(len(self.modules), dtype=bool)
+        for module in np.flatnonzero(self.valid):
+            times = load_times[load_bounds[module]:load_bounds[module + 1]]
+            calls = call_times[call_bounds[module]:call_bounds[module + 1]]
+            if not len(times) or not len(calls):
+                continue
+            # The first call after t - window is the one to test; its neighbours cover
+            # rounding in the subtraction, and the test itself is the query's ABS(...) < window
+            start = np.searchsorted(calls, times - window, side='right')
+            for shift in (-1, 0, 1):
+                nearest = calls[np.clip(start + shift, 0, len(calls) - 1)]
+                if np.any(np.abs(times - nearest) < window):
+                    found[module] = True
+                    break
+        return ['module_name'], self._module_rows(found)
+
+    def memory_failure_rates(self):
+        total = self.per_module('memory_events')
+        failures = self.per_module('memory_events', self.where(
+            'memory_events', 'allocation_success', equals(0)))
+        rate = self._rate(failures, total)
+        rows = self._module_rows((total >= 5) & (rate > 40), total, failures, rate,
+                                 descending=rate)
+        return ['requesting_module', 'total_requests', 'failures', 'failure_rate_pct'], rows
+
+    def network_driver_failures(self):
+        network_errors = self.per_module('error_codes', self.where(
+            'error_codes', 'subsystem', equals('network')))
+        drivers = (self.where('device_drivers', 'driver_name', equals('eth0', 'wlan0'))
+                   & self.where('device_drivers', 'initialization_status', equals('FAILED')))
+        modules = self._modules('device_drivers')
+        drivers &= (network_errors > 0)[modules] & self.valid[modules]
+        failing = np.bincount(modules[drivers], minlength=len(self.modules))
+        return ['parent_module'], self._module_rows(failing >= 2)
+
+    def netfilter_timeline(self, module: str = 'corrupted_netfilter', limit: int = 20):
+        columns = ['timestamp', 'event_type', 'detail', 'boot_session']
+        if module not in self.modules:
+            return columns, []
+        code = self.modules.index(module)
+        events = self.tables['module_events']
+        errors = self.tables['error_codes']
+        memory = self.tables['memory_events']
+        times, rows = [], []
+
+        def decode(factor: Factor, mask: np.ndarray) -> list:
+            return [factor.values[c] for c in factor.codes[mask]]
+
+        mask = events['module_name'].codes == code
+        times.append(events['timestamp'][mask])
+        rows += [('MODULE_EVENT', status, session) for status, session in
+                 zip(decode(events['status'], mask), decode(events['boot_session'], mask))]
+        mask = errors['affected_module'].codes == code
+        times.append(errors['timestamp'][mask])
+        rows += [('ERROR_CODE', severity, None) for severity in decode(errors['severity'], mask)]
+        mask = memory['requesting_module'].codes == code
+        times.append(memory['timestamp'][mask])
+        failed = memory['allocation_success'].mask(equals(0))[mask]
+        rows += [('MEMORY_EVENT', 'FAILED' if f else 'SUCCESS', None) for f in failed.tolist()]
+
+        times = np.concatenate(times)
+        order = np.lexsort((times, ~np.isnan(times)))[:limit]  # NULL first, as in SQL
+        return columns, [(None if np.isnan(times[i]) else times[i].item(),) + rows[i]
+                         for i in order]
+
+    def danger_scores(self):
+        failed = self._failed()
+        critical = self.per_module('error_codes', self.where(
+            'error_codes', 'severity', equals('CRITICAL')))
+        total = self.per_module('memory_events')
+        failed_allocs = self.per_module('memory_events', self.where(
+            'memory_events', 'allocation_success', equals(0)))
+        network = self.per_module('device_drivers', (
+            self.where('device_drivers', 'initialization_status', equals('FAILED'))
+            & self.where('device_drivers', 'driver_name', equals('eth0', 'wlan0'))))
+        syscalls = self.per_module('system_calls', self.where(
+            'system_calls', 'return_code', below(0)))
+        rate = self._rate(failed_allocs, total)
+        score = failed * 3 + critical * 5 + network * 4 + syscalls * 1
+        selected = (failed >= 3) & (critical >= 2) & (rate > 35) & self.valid
+        rows = self._module_rows(selected, failed, critical, rate, network, syscalls, score,
+                                 descending=score)
+        return ['module_name', 'failed_loads', 'critical_errors', 'mem_failure_pct',
+                'network_failures', 'syscall_failures', 'danger_score'], rows
+
+
+def equivalent(name: str, expected: list[tuple], actual: list[tuple]) -> bool:
+    """
+    Whether 'actual' is a valid answer to query 'name' given SQLite's 'expected': the same
+    rows in the same ORDER BY sequence. Rows that tie on the sort key may come in either
+    order, and where a LIMIT cuts through a tie either tied row may make the cut.
+    """
+    implementation = implementations[name]
+    key = implementation.order_key or (lambda row: 0)
+    if [key(row) for row in expected] != [key(row) for row in actual]:
+        return False
+    groups: dict = {}
+    for row in expected:
+        groups.setdefault(key(row), [[], []])[0].append(row)
+    for row in actual:
+        groups[key(row)][1].append(row)
+    last = key(expected[-1]) if expected else None
+    return all(sorted(e, key=repr) == sorted(a, key=repr) for k, (e, a) in groups.items()
+               if not (implementation.limited and k == last))
+
+
+def rounding_mismatches(conn: sqlite3.Connection, largest: int = 256) -> list[tuple]:
+    """
+    The percentages the rate queries round - n of d for every 0 <= n <= d <= 'largest' -
+    where sql_round disagrees with SQLite's ROUND(). Includes tie cases like 13 of 32.
+    """
+    rows = conn.execute(
+        "WITH RECURSIVE k(x) AS (SELECT 0 UNION ALL SELECT x + 1 FROM k WHERE x < ?) "
+        "SELECT n.x, d.x, CAST(n.x AS REAL) / d.x * 100, ROUND(CAST(n.x AS REAL) / d.x * 100, 2) "
+        "FROM k AS n, k AS d WHERE d.x > 0 AND n.x <= d.x", (largest,)
+    )
+    return [(n, d, expected) for n, d, rate, expected in rows if sql_round(rate, 2) != expected]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time the columnar engine against SQLite")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to load")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query and engine")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    from helper_utils.index_advisor import registered_queries
+
+    args = parse_args(argv)
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    started = time.perf_counter()
+    store = ColumnStore.load(conn)
+    print(f"Loaded {len(store.modules)} modules from {len(store_columns)} tables in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms\n")
+    print(f"{'Query':<24} {'Rows':>6} {'SQLite ms':>10} {'NumPy ms':>10} {'Speed-up':>9}  Match")
+    print("-" * 72)
+    workload = registered_queries()
+    rounding = rounding_mismatches(conn)
+    mismatches = len(rounding)
+    print(f"{'ROUND(n / d * 100, 2)':<24} {len(rounding):>6} {'':>10} {'':>10} {'':>9}  "
+          f"{'❌' if rounding else '✅'}")
+    for name in implementations:
+        expected = conn.execute(workload[name]).fetchall()
+        _, actual = store.run(name)
+        timings = []
+        for run in (lambda: conn.execute(workload[name]).fetchall(), lambda: store.run(name)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                run()
+            timings.append((time.perf_counter() - started) / args.repeat * 1000)
+        matches = equivalent(name, expected, actual)
+        mismatches += not matches
+        print(f"{name:<24} {len(expected):>6} {timings[0]:>10.3f} {timings[1]:>10.3f} "
+              f"{timings[0] / timings[1]:>8.1f}x  {'✅' if matches else '❌'}")
+    conn.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
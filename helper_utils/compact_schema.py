@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - dictionary-encoded compact layout
+Optional storage layout that replaces the repeated TEXT columns (module names, subsystem,
+log level, status, severity) with integer keys into small dimension tables, and stores
+load_address as a 64-bit integer instead of an 18-character hex string.
+
+Each fact table becomes '<table>_data'; a view with the original table name joins the
+dimensions back in and exposes exactly the original columns, so every existing query keeps
+working. INSTEAD OF INSERT triggers on the views encode new rows, so append and ingest keep
+working too. New queries can join on the integer '<column>_id' columns of the _data tables.
+
+Usage (from the repository root):
+    python3 -m helper_utils.compact_schema                  # convert kernel_logs.db in place
+    python3 -m helper_utils.generate_ctf_db --scale 100 --compact
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+
+from helper_utils import fulltext
+from helper_utils.generate_ctf_db import indexes, insert_columns, primary_keys, schema
+
+# Encoded columns per table and the dimension each one draws from
+encoded_columns = {
+    'boot_logs': {'log_level': 'log_levels', 'subsystem': 'subsystems'},
+    'module_events': {'module_name': 'modules', 'status': 'statuses'},
+    'error_codes': {'severity': 'severities', 'subsystem': 'subsystems',
+                    'affected_module': 'modules'},
+    'system_calls': {'caller_module': 'modules'},
+    'device_drivers': {'initialization_status': 'statuses', 'parent_module': 'modules'},
+    'memory_events': {'requesting_module': 'modules'},
+}
+
+dimensions = sorted({dim for columns in encoded_columns.values() for dim in columns.values()})
+
+# Columns holding '0x' + 16 hex digits, stored as the same 64 bits in a signed INTEGER.
+# Anything else (e.g. shorter addresses from real logs) is kept as TEXT, so reads round-trip.
+address_columns = {'module_events': ('load_address',)}
+
+HEX_DIGITS = '0123456789abcdef'
+ADDRESS_GLOB = "'0x" + '[0-9a-f]' * 16 + "'"
+COLUMN_TYPE = re.compile(r'^\s+(?!CREATE\b)(\w+) (\w+)', re.M)
+INDEX_TARGET = re.compile(r'ON (\w+)\(([\w, ]+)\)')
+
+
+def data_table(table: str) -> str:
+    return f"{table}_data"
+
+
+def stored_column(table: str, column: str) -> str:
+    """Name of 'column' in the _data table."""
+    return f"{column}_id" if column in encoded_columns.get(table, {}) else column
+
+
+def encode_address(value: str) -> str:
+    """SQL expression turning a '0x' + 16 hex digit string into a 64-bit integer."""
+    nibbles = ' | '.join(
+        f"((instr('{HEX_DIGITS}', substr({value}, {3 + i}, 1)) - 1) << {60 - 4 * i})"
+        for i in range(16)
+    )
+    return f"CASE WHEN {value} GLOB {ADDRESS_GLOB} THEN ({nibbles}) ELSE {value} END"
+
+
+def decode_address(value: str) -> str:
+    return f"CASE WHEN typeof({value}) = 'integer' THEN printf('0x%016x', {value}) ELSE {value} END"
+
+
+def dimension_ddl(dimension: str) -> str:
+    return f"CREATE TABLE {dimension} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+
+
+def data_ddl(table: str) -> str:
+    columns = []
+    for column, kind in COLUMN_TYPE.findall(schema[table]):
+        if column == primary_keys[table]:
+            columns.append(f"{column} INTEGER PRIMARY KEY")
+        elif column in encoded_columns[table]:
+            columns.append(f"{column}_id INTEGER REFERENCES {encoded_columns[table][column]}(id)")
+        elif column in address_columns.get(table, ()):
+            columns.append(f"{column} INTEGER")
+        else:
+            columns.append(f"{column} {kind}")
+    return f"CREATE TABLE {data_table(table)} (\n    " + ",\n    ".join(columns) + "\n)"
+
+
+def view_ddl(table: str) -> str:
+    """The original table, rebuilt as a view with the original column names and order."""
+    select, joins = [], []
+    for column in (primary_keys[table],) + insert_columns[table]:
+        if column in encoded_columns[table]:
+            alias = f"j{len(joins)}"
+            joins.append(f"LEFT JOIN {encoded_columns[table][column]} AS {alias} "
+                         f"ON {alias}.id = d.{column}_id")
+            select.append(f"{alias}.name AS {column}")
+        elif column in address_columns.get(table, ()):
+            select.append(f"{decode_address(f'd.{column}')} AS {column}")
+        else:
+            select.append(f"d.{column}")
+    return (f"CREATE VIEW {table} AS SELECT {', '.join(select)} "
+            f"FROM {data_table(table)} AS d {' '.join(joins)}")
+
+
+def encoded_values(table: str, row: str) -> list[str]:
+    """Expressions for the _data columns, reading the original values from 'row'."""
+    values = []
+    for column in (primary_keys[table],) + insert_columns[table]:
+        if column in encoded_columns[table]:
+            values.append(f"(SELECT id FROM {encoded_columns[table][column]} "
+                          f"WHERE name = {row}.{column})")
+        elif column in address_columns.get(table, ()):
+            values.append(encode_address(f"{row}.{column}"))
+        else:
+            values.append(f"{row}.{column}")
+    return values
+
+
+def stored_columns(table: str) -> list[str]:
+    return [stored_column(table, column)
+            for column in (primary_keys[table],) + insert_columns[table]]
+
+
+def insert_trigger(table: str) -> str:
+    new_dimension_values = ''.join(
+        f"INSERT OR IGNORE INTO {dimension} (name) "
+        f"SELECT NEW.{column} WHERE NEW.{column} IS NOT NULL;\n        "
+        for column, dimension in encoded_columns[table].items()
+    )
+    return f"""
+    CREATE TRIGGER {table}_insert INSTEAD OF INSERT ON {table}
+    BEGIN
+        {new_dimension_values}INSERT INTO {data_table(table)} ({', '.join(stored_columns(table))})
+        VALUES ({', '.join(encoded_values(table, 'NEW'))});
+    END
+    """
+
+
+def compact_index(ddl: str) -> str:
+    """A CREATE INDEX on an original table, pointed at the _data table's stored columns."""
+    def target(match: re.Match) -> str:
+        table = match.group(1)
+        columns = [stored_column(table, column.strip()) for column in match.group(2).split(',')]
+        return f"ON {data_table(table)}({', '.join(columns)})"
+
+    return INDEX_TARGET.sub(target, ddl)
+
+
+# The generator's indexes, pointed at the integer columns of the _data tables
+compact_indexes = [compact_index(ddl) for ddl in indexes]
+
+
+def new_row_value(table: str, column: str) -> str:
+    """
+    The original value of NEW.<column>, for an AFTER INSERT trigger on the _data table
+    (views cannot carry AFTER triggers). Encoded columns are decoded from their dimension.
+    """
+    if column in encoded_columns[table]:
+        return f"(SELECT name FROM {encoded_columns[table][column]} WHERE id = NEW.{column}_id)"
+    if column in address_columns.get(table, ()):
+        return decode_address(f"NEW.{column}")
+    return f"NEW.{column}"
+
+
+def is_compact(cursor: sqlite3.Cursor) -> bool:
+    (count,) = cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'view' AND name = 'boot_logs'"
+    ).fetchone()
+    return count > 0
+
+
+def drop_compact(cursor: sqlite3.Cursor) -> None:
+    """Remove the views (and their triggers), _data tables and dimensions, if present."""
+    if not is_compact(cursor):
+        return
+    for table in schema:
+        cursor.execute(f"DROP VIEW IF EXISTS {table}")
+        cursor.execute(f"DROP TABLE IF EXISTS {data_table(table)}")
+    for dimension in dimensions:
+        cursor.execute(f"DROP TABLE IF EXISTS {dimension}")
+
+
+def compact(db_path: str = 'kernel_logs.db', verbose: bool = True) -> tuple[int, int]:
+    """
+    Convert 'db_path' to the compact layout in place (a no-op if it already is one) and
+    VACUUM it. Returns the file size in bytes (before, after).
+    """
+    before = os.path.getsize(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    if is_compact(cursor):
+        conn.close()
+        return before, before
+
+    cursor.execute("BEGIN")
+    indexed = fulltext.is_installed(cursor)
+    fulltext.drop(cursor)  # Rebuilt over the _data tables below, if there were any
+    for dimension in dimensions:
+        cursor.execute(dimension_ddl(dimension))
+        sources = ' UNION '.join(
+            f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+            for table, columns in encoded_columns.items()
+            for column, target in columns.items() if target == dimension
+        )
+        cursor.execute(
+            f"INSERT INTO {dimension} (name) SELECT DISTINCT * FROM ({sources}) ORDER BY 1"
+        )
+    for table in schema:
+        cursor.execute(data_ddl(table))
+        cursor.execute(
+            f"INSERT INTO {data_table(table)} ({', '.join(stored_columns(table))}) "
+            f"SELECT {', '.join(encoded_values(table, table))} FROM {table} "
+            f"ORDER BY {primary_keys[table]}"
+        )
+        cursor.execute(f"DROP TABLE {table}")  # Its indexes and triggers go with it
+        cursor.execute(view_ddl(table))
+        cursor.execute(insert_trigger(table))
+    for ddl in compact_indexes:
+        cursor.execute(ddl)
+    if indexed:
+        fulltext.install(cursor)
+    cursor.execute("COMMIT")
+    cursor.execute("VACUUM")
+    conn.close()
+
+    after = os.path.getsize(db_path)
+    if verbose:
+        print(f"📦 {db_path}: {before / 2**20:.1f} MiB -> {after / 2**20:.1f} MiB "
+              f"({after / before:.0%} of the original size)")
+    return before, after
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert a database to the compact layout")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to convert in place")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    compact(args.db)
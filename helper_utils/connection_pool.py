@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - shared SQLite connection pool
+One bounded pool of long-lived connections per database, used by query_starter,
+solutions/my_solutions.py and (through a 'creator') the SQLAlchemy engine, so a small
+query no longer pays for opening a connection and re-applying PRAGMAs.
+
+    from helper_utils.connection_pool import get_pool
+
+    pool = get_pool('kernel_logs.db')
+    with pool.connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM boot_logs").fetchone()
+    print(pool.stats())
+
+Connections handed out by checkout() are PooledConnection objects: calling close() on one
+returns it to the pool instead of closing it, so existing open/close call sites keep working.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Applied once when a connection is opened, never per query
+default_pragmas = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MiB per connection, negative values are KiB
+    "PRAGMA mmap_size = 268435456",  # 256 MiB
+)
+
+
+class _Hold:
+    """The connection one thread has checked out, and how many checkouts deep it is."""
+    __slots__ = ('conn', 'depth')
+
+    def __init__(self):
+        self.conn = None
+        self.depth = 0
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection whose close() checks it back into its pool."""
+    pool = None
+    hold = None  # The checking-out thread's _Hold while checked out
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def discard(self):
+        """Really close the underlying connection."""
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of up to 'size' connections to one database, opened lazily.
+
+    Thread affinity: a thread that already holds a connection gets the same one back on a
+    nested checkout (a depth count tracks when it is really released), so code that checks
+    out inside another checkout can't deadlock itself against a full pool. A nested
+    checkout is therefore not an independent connection: it shares the outer caller's
+    transaction, and only the outermost connection() context commits or rolls back. Connections
+    are opened with check_same_thread=False because they move between threads - the pool
+    guarantees only one thread holds a given connection at a time. A connection may be
+    released from a thread other than the one that checked it out (SQLAlchemy and worker
+    threads do this); the checking-out thread's hold on it is cleared either way.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0,
+                 pragmas: tuple[str, ...] = default_pragmas, uri: bool = False):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = pragmas
+        self.uri = uri
+        self._idle = queue.LifoQueue()  # Most recently used first - warmest page cache
+        self._all = []
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._closed = False
+        self.connects = self.checkouts = self.nested = self.waits = 0
+        self.wait_seconds = self.max_wait_seconds = 0.0
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, uri=self.uri,
+                               check_same_thread=False, factory=PooledConnection)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        conn.pool = self
+        with self._lock:
+            self.connects += 1
+            self._all.append(conn)
+        return conn
+
+    def checkout(self) -> PooledConnection:
+        """Borrow a connection; close() it (or use connection()) to give it back."""
+        if os.getpid() != self._pid:
+            self._reset_after_fork()
+        hold = self._hold()
+        with self._lock:
+            if hold.conn is not None:
+                hold.depth += 1
+                self.nested += 1
+                return hold.conn
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1  # Reserve the slot before connecting
+            if can_open:
+                try:
+                    conn = self._open()
+                except BaseException:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                with self._lock:
+                    self.waits += 1
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No connection to '{self.db_path}' free after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    ) from None
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            hold.conn, hold.depth = conn, 1
+            conn.hold = hold
+        return conn
+
+    def _hold(self) -> _Hold:
+        hold = getattr(self._local, 'hold', None)
+        if hold is None:
+            hold = self._local.hold = _Hold()
+        return hold
+
+    def release(self, conn: PooledConnection) -> None:
+        """
+        Give back one checkout of 'conn', from any thread. The last one clears the hold of
+        the thread that checked it out and returns the connection to the pool.
+        """
+        with self._lock:
+            hold = conn.hold
+            if hold is None:
+                return  # Already back in the pool
+            hold.depth -= 1
+            if hold.depth > 0:
+                return
+            hold.conn = conn.hold = None
+        if conn.in_transaction:
+            conn.rollback()  # Same as closing a plain connection without committing
+        if self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection; commit on success, roll back on error, then return it.
+        Nested inside another checkout on the same thread, the connection is the outer one
+        and its transaction is left to the outer caller - an error still propagates to it.
+        """
+        conn = self.checkout()
+        outermost = self._hold().depth == 1
+        try:
+            yield conn
+            if outermost and conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if outermost and conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def _reset_after_fork(self) -> None:
+        # Connections must never cross a fork; the child starts with an empty pool
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _discard(self, conn: PooledConnection) -> None:
+        conn.pool = None
+        conn.discard()
+        with self._lock:
+            self._all.remove(conn)
+            self._opened -= 1
+
+    def close(self) -> None:
+        """Close every idle connection; ones still checked out close when returned."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'idle': self._idle.qsize(),
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'nested_checkouts': self.nested,
+                'waits': self.waits,
+                'wait_seconds': self.wait_seconds,
+                'max_wait_seconds': self.max_wait_seconds,
+            }
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = 'kernel_logs.db', **kwargs) -> ConnectionPool:
+    """The shared pool for 'db_path', created with 'kwargs' on first use."""
+    key = db_path if kwargs.get('uri') else os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_path, **kwargs)
+        return _pools[key]
+
+
+def create_engine(db_path: str = 'kernel_logs.db', snapshot: bool = False, **kwargs):
+    """
+    SQLAlchemy engine drawing its DBAPI connections from the shared pool. SQLAlchemy's own
+    pooling is disabled (NullPool), so when it "closes" a connection it goes back here.
+    With 'snapshot', connections come from the in-memory snapshot of the file instead (see
+    snapshot.py); the URL still names the file, which keys the result cache.
+    """
+    from sqlalchemy import create_engine as sqlalchemy_engine
+    from sqlalchemy.pool import NullPool
+
+    if snapshot:
+        from helper_utils.snapshot import get_snapshot
+
+        creator = get_snapshot(db_path, **kwargs).checkout
+    else:
+        creator = get_pool(db_path, **kwargs).checkout
+    return sqlalchemy_engine(f"sqlite:///{db_path}", creator=creator, poolclass=NullPool)
+
+
+if __name__ == "__main__":
+    pool = get_pool()
+    started = time.perf_counter()
+    for _ in range(1000):
+        with pool.connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+    pooled = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(1000):
+        conn = sqlite3.connect('kernel_logs.db')
+        conn.execute("SELECT 1").fetchone()
+        conn.close()
+    fresh = time.perf_counter() - started
+    print(f"1000 queries - pooled {pooled * 1000:.1f} ms, fresh connections {fresh * 1000:.1f} ms")
+    print(pool.stats())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - chunked exporter
+Streams a registered query or a whole table from a cursor into CSV, JSONL or per-column
+NumPy arrays, 'batch_size' rows at a time. Each batch is fetched, written once and dropped,
+so memory stays at one batch however big the result, and no DataFrame is ever built.
+
+    from helper_utils.exporter import export, read_columns
+
+    export(conn, 'memory_events', 'exports/memory_events', fmt='npy')
+    columns = read_columns('exports/memory_events')     # {'mem_id': array([...]), ...}
+
+NumPy output ('npy') is a directory with one .npy file per column, appended to batch by batch:
+  - INTEGER columns are int64 - with '<column>.mask.npy' (True = NULL) if any are NULL
+  - REAL columns are float64, NULL as NaN
+  - TEXT columns are int32 codes into '<column>.categories.npy', NULL as -1 (the
+    'category' layout typed_frames.py uses)
+A column takes the type of its first non-NULL value; CAST in the query if the values mix.
+'npz' zips the same files into one archive for np.load, at the cost of one extra copy.
+
+Usage (from the repository root):
+    python3 -m helper_utils.exporter tier:4.1 boot_logs --format csv --out exports
+    python3 -m helper_utils.exporter memory_events --format npz --batch-size 50000
+    python3 main.py export failed_modules --format jsonl --out -      # to stdout
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import zipfile
+
+formats = ('csv', 'jsonl', 'npy', 'npz')
+extensions = {'csv': '.csv', 'jsonl': '.jsonl', 'npy': '', 'npz': '.npz'}
+
+# Fixed .npy header size, so the real row count can be written over it once known
+NPY_HEADER_SIZE = 128
+COLUMNS_FILE = '__columns__.npy'  # Column order, which a directory listing doesn't keep
+
+
+def source_query(conn: sqlite3.Connection, source: str) -> str:
+    """SQL for a table (or compact-layout view), or for a registered query like 'tier:4.1'."""
+    from helper_utils.index_advisor import registered_queries, resolve_query
+
+    (is_table,) = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+        (source,)
+    ).fetchone()
+    if is_table:
+        return f'SELECT * FROM "{source}"'
+    return registered_queries()[resolve_query(source)]
+
+
+def batches(cursor: sqlite3.Cursor, batch_size: int):
+    while rows := cursor.fetchmany(batch_size):
+        yield rows
+
+
+def _json_default(value):
+    return value.hex() if isinstance(value, bytes) else str(value)
+
+
+def write_csv(cursor: sqlite3.Cursor, out, batch_size: int) -> int:
+    writer = csv.writer(out)
+    writer.writerow([column[0] for column in cursor.description])
+    count = 0
+    for rows in batches(cursor, batch_size):
+        writer.writerows(rows)  # NULL -> empty field
+        count += len(rows)
+    return count
+
+
+def write_jsonl(cursor: sqlite3.Cursor, out, batch_size: int) -> int:
+    names = [column[0] for column in cursor.description]
+    # One encoder for every row - json.dumps with options builds a new one per call
+    encode = json.JSONEncoder(default=_json_default, ensure_ascii=False).encode
+    count = 0
+    for rows in batches(cursor, batch_size):
+        out.write(''.join(encode(dict(zip(names, row))) + '\n' for row in rows))
+        count += len(rows)
+    return count
+
+
+def _npy_header(descr: str, rows: int) -> bytes:
+    """A version 1.0 .npy header for a 1-D array, padded to NPY_HEADER_SIZE bytes."""
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class _NpyAppender:
+    """A 1-D .npy file written batch by batch; the header gets the length on close."""
+
+    def __init__(self, path: str, descr: str):
+        self.descr = descr
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self.file.write(_npy_header(descr, 0))
+
+    def append(self, array) -> None:
+        self.file.write(array.tobytes())
+        self.rows += len(array)
+
+    def close(self) -> None:
+        self.file.seek(0)
+        self.file.write(_npy_header(self.descr, self.rows))
+        self.file.close()
+
+
+class _ColumnWriter:
+    """One result column as <name>.npy (+ .mask.npy / .categories.npy) in 'directory'."""
+
+    kinds = {int: ('int', '<i8'), float: ('float', '<f8'), str: ('text', '<i4')}
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self.kind = None  # Set by the first non-NULL value
+        self.leading_nulls = 0
+        self.values = None
+        self.mask = None  # Opened at an INTEGER column's first NULL
+        self.categories = {}
+
+    def _path(self, suffix: str = '') -> str:
+        return os.path.join(self.directory, f"{self.name}{suffix}.npy")
+
+    def _start(self, kind: str, descr: str) -> None:
+        self.kind = kind
+        self.values = _NpyAppender(self._path(), descr)
+
+    def extend(self, values) -> None:
+        import numpy as np
+
+        if self.kind is None:
+            first = next((v for v in values if v is not None), None)
+            if first is None:
+                self.leading_nulls += len(values)
+                return
+            if type(first) not in self.kinds:
+                raise ValueError(f"Column {self.name!r}: {type(first).__name__} values "
+                                 f"can't be exported as NumPy arrays")
+            self._start(*self.kinds[type(first)])
+            values = (None,) * self.leading_nulls + tuple(values)
+
+        expected = {'int': (int,), 'float': (int, float), 'text': (str,)}[self.kind]
+        for v in values:
+            if v is not None and type(v) not in expected:
+                raise ValueError(f"Column {self.name!r} holds {self.kind} values but got "
+                                 f"{v!r}; CAST it to one type in the query")
+
+        if self.kind == 'int':
+            if self.mask is None and None in values:
+                self.mask = _NpyAppender(self._path('.mask'), '|b1')
+                self.mask.append(np.zeros(self.values.rows, dtype=bool))
+            if self.mask is not None:
+                self.mask.append(np.fromiter((v is None for v in values), bool, len(values)))
+            array = np.fromiter((0 if v is None else v for v in values), np.int64, len(values))
+        elif self.kind == 'float':
+            array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            codes = self.categories
+            array = np.fromiter(
+                (-1 if v is None else codes.setdefault(v, len(codes)) for v in values),
+                np.int32, len(values)
+            )
+        self.values.append(array)
+
+    def close(self) -> None:
+        import numpy as np
+
+        if self.kind is None:  # Nothing but NULLs
+            self._start('float', '<f8')
+            self.values.append(np.full(self.leading_nulls, np.nan))
+        self.values.close()
+        if self.mask is not None:
+            self.mask.close()
+        if self.kind == 'text':
+            np.save(self._path('.categories'), np.array(list(self.categories), dtype=str))
+
+
+def write_npy(cursor: sqlite3.Cursor, directory: str, batch_size: int) -> int:
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    names = [column[0] for column in cursor.description]
+    writers = [_ColumnWriter(directory, name) for name in names]
+    count = 0
+    try:
+        for rows in batches(cursor, batch_size):
+            for writer, values in zip(writers, zip(*rows)):
+                writer.extend(values)
+            count += len(rows)
+    finally:
+        for writer in writers:
+            writer.close()
+    np.save(os.path.join(directory, COLUMNS_FILE), np.array(names, dtype=str))
+    return count
+
+
+def write_npz(cursor: sqlite3.Cursor, path: str, batch_size: int) -> int:
+    staging = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        count = write_npy(cursor, staging, batch_size)
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name in sorted(os.listdir(staging)):
+                archive.write(os.path.join(staging, name), arcname=name)
+    finally:
+        shutil.rmtree(staging)
+    return count
+
+
+def export_cursor(cursor: sqlite3.Cursor, path: str, fmt: str = 'csv',
+                  batch_size: int = 10000) -> int:
+    """Write an executed cursor's rows to 'path' ('-' is stdout for csv/jsonl); returns rows."""
+    if fmt not in formats:
+        raise ValueError(f"fmt must be one of {formats}, not {fmt!r}")
+    if fmt == 'npy':
+        return write_npy(cursor, path, batch_size)
+    if fmt == 'npz':
+        return write_npz(cursor, path, batch_size)
+    write = write_csv if fmt == 'csv' else write_jsonl
+    if path == '-':
+        return write(cursor, sys.stdout, batch_size)
+    with open(path, 'w', newline='' if fmt == 'csv' else None, encoding='utf-8') as out:
+        return write(cursor, out, batch_size)
+
+
+def export(conn: sqlite3.Connection, source: str, path: str, fmt: str = 'csv',
+           batch_size: int = 10000) -> int:
+    """Export a table or registered query ('boot_logs', 'tier:4.1', 'failed_modules')."""
+    cursor = conn.execute(source_query(conn, source))
+    try:
+        return export_cursor(cursor, path, fmt, batch_size)
+    finally:
+        cursor.close()
+
+
+def read_columns(path: str) -> dict:
+    """
+    Load an 'npy' directory or 'npz' file back as {column: array}, in the original column
+    order. TEXT columns come back as object arrays (None for NULL) and INTEGER columns with
+    NULLs as masked arrays.
+    """
+    import numpy as np
+
+    if os.path.isdir(path):
+        arrays = {name[:-4]: np.load(os.path.join(path, name))
+                  for name in os.listdir(path) if name.endswith('.npy')}
+    else:
+        with np.load(path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+    columns = {}
+    for name in arrays.pop(COLUMNS_FILE[:-4]):
+        values = arrays[name]
+        if f"{name}.categories" in arrays:
+            labels = np.append(arrays[f"{name}.categories"].astype(object), None)
+            values = labels[values]  # Code -1 picks the trailing None
+        elif f"{name}.mask" in arrays:
+            values = np.ma.masked_array(values, mask=arrays[f"{name}.mask"])
+        columns[str(name)] = values
+    return columns
+
+
+def output_path(out: str, source: str, fmt: str) -> str:
+    if out == '-':
+        return out
+    return os.path.join(out, source.replace(':', '_').replace('.', '_') + extensions[fmt])
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export tables or query results in batches")
+    parser.add_argument('sources', nargs='+', metavar='SOURCE',
+                        help="Table name or registered query (tier:4.1, 4.1, failed_modules)")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to read")
+    parser.add_argument('--format', choices=formats, default='csv', help="Output format")
+    parser.add_argument('--out', default='exports',
+                        help="Output directory, or '-' for stdout (csv/jsonl, one source)")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Rows fetched at a time")
+    args = parser.parse_args(argv)
+    if args.out == '-' and (args.format in ('npy', 'npz') or len(args.sources) > 1):
+        parser.error("--out - takes a single csv or jsonl export")
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.out != '-':
+        os.makedirs(args.out, exist_ok=True)
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        for source in args.sources:
+            path = output_path(args.out, source, args.format)
+            rows = export(conn, source, path, args.format, args.batch_size)
+            if path != '-':
+                print(f"📤 {source}: {rows:,} rows -> {path}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - federated (scatter-gather) queries
+Runs a registered query over several database files at once - one kernel_logs.db per
+host - as if their tables had been concatenated. Each shard runs a partial query in its
+own process, read-only; the partial rows are gathered into an in-memory table and a final
+query merges them: counts are summed, top-k lists re-ranked over the summed counts,
+DISTINCT sets unioned, and rates recomputed from the summed numerators and denominators.
+
+Row-level joins only ever pair rows from the same shard - ids, timestamps and boot
+sessions are local to the host that logged them - so a module only "failed to load and
+raised a CRITICAL error" if it did both on one host.
+
+    from helper_utils.federated import federated_query
+
+    result = federated_query('tier:4.1', ['hosts/web1.db', 'hosts/web2.db'])
+    for row in result.rows:
+        print(row)
+
+Usage (from the repository root):
+    python3 -m helper_utils.federated tier:4.1 'hosts/*.db'
+    python3 -m helper_utils.federated my:failed_modules hosts/a.db hosts/b.db --workers 2
+    python3 -m helper_utils.federated --all 'hosts/*.db'
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from helper_utils.index_advisor import registered_queries, resolve_query
+
+
+class MergePlan(NamedTuple):
+    """How to split one registered query into per-shard and merge steps."""
+    final: str  # Runs over the gathered partial rows, in a table named 'partials'
+    partial: str | None = None  # Runs on each shard; None runs the registered query itself
+
+
+# Queries whose result is a set (DISTINCT, no aggregates) run unchanged on every shard
+def union_distinct(columns: str = '*', order_by: str | None = None) -> MergePlan:
+    order = f" ORDER BY {order_by}" if order_by else ""
+    return MergePlan(f"SELECT DISTINCT {columns} FROM partials{order}")
+
+
+merge_plans = {
+    'tier:1.1': union_distinct('name'),
+    'tier:1.2': union_distinct(order_by='boot_session'),
+    'tier:2.1': MergePlan(
+        partial="""
+        SELECT module_name, COUNT(*) AS failure_count
+        FROM module_events
+        WHERE status = 'FAILED'
+        GROUP BY module_name
+        """,
+        final="""
+        SELECT module_name, SUM(failure_count) AS failure_count
+        FROM partials
+        GROUP BY module_name
+        ORDER BY SUM(failure_count) DESC
+        LIMIT 10
+        """,
+    ),
+    'tier:2.2': union_distinct(order_by='module_name'),
+    # HAVING is always true on a shard (inner joins), and distinct ids never repeat across
+    # shards, so the per-shard distinct counts just add up
+    'tier:3.1': MergePlan("""
+        SELECT module_name, SUM(failed_loads) AS failed_loads,
+               SUM(critical_errors) AS critical_errors, SUM(memory_failures) AS memory_failures
+        FROM partials
+        GROUP BY module_name
+        ORDER BY (SUM(failed_loads) + SUM(critical_errors) + SUM(memory_failures)) DESC
+    """),
+    'tier:3.2': union_distinct(order_by='module_name'),
+    'tier:4.1': MergePlan(
+        partial="""
+        SELECT requesting_module, COUNT(*) AS total_requests,
+               SUM(CASE WHEN allocation_success = 0 THEN 1 ELSE 0 END) AS failures
+        FROM memory_events
+        GROUP BY requesting_module
+        """,
+        final="""
+        SELECT requesting_module, SUM(total_requests) AS total_requests,
+               SUM(failures) AS failures,
+               ROUND(CAST(SUM(failures) AS REAL) / SUM(total_requests) * 100, 2)
+                   AS failure_rate_pct
+        FROM partials
+        GROUP BY requesting_module
+        HAVING SUM(total_requests) >= 5
+            AND failure_rate_pct > 40
+        ORDER BY failure_rate_pct DESC
+        """,
+    ),
+    'tier:4.2': MergePlan(
+        partial="""
+        SELECT dd.parent_module, COUNT(DISTINCT dd.driver_id) AS failed_drivers
+        FROM device_drivers AS dd
+        INNER JOIN error_codes AS ec
+            ON dd.parent_module = ec.affected_module
+        WHERE dd.driver_name IN ('eth0', 'wlan0')
+            AND dd.initialization_status = 'FAILED'
+            AND ec.subsystem = 'network'
+        GROUP BY dd.parent_module
+        """,
+        final="""
+        SELECT parent_module
+        FROM partials
+        GROUP BY parent_module
+        HAVING SUM(failed_drivers) >= 2
+        """,
+    ),
+    # The fleet's first 20 events by time are among the shards' own first 20s
+    'tier:5.1': MergePlan("SELECT * FROM partials ORDER BY timestamp LIMIT 20"),
+    'tier:5.2': MergePlan(
+        partial="""
+        SELECT module_name AS module, COUNT(*) AS failed_loads, 0 AS critical_errors,
+               0 AS total_allocs, 0 AS failed_allocs, 0 AS net_failures, 0 AS syscall_failures
+        FROM module_events WHERE status = 'FAILED' GROUP BY module_name
+        UNION ALL
+        SELECT affected_module, 0, COUNT(*), 0, 0, 0, 0
+        FROM error_codes WHERE severity = 'CRITICAL' GROUP BY affected_module
+        UNION ALL
+        SELECT requesting_module, 0, 0, COUNT(*),
+               SUM(CASE WHEN allocation_success = 0 THEN 1 ELSE 0 END), 0, 0
+        FROM memory_events GROUP BY requesting_module
+        UNION ALL
+        SELECT parent_module, 0, 0, 0, 0, COUNT(*), 0
+        FROM device_drivers
+        WHERE initialization_status = 'FAILED' AND driver_name IN ('eth0', 'wlan0')
+        GROUP BY parent_module
+        UNION ALL
+        SELECT caller_module, 0, 0, 0, 0, 0, COUNT(*)
+        FROM system_calls WHERE return_code < 0 GROUP BY caller_module
+        """,
+        final="""
+        WITH totals AS (
+            SELECT module, SUM(failed_loads) AS failed_loads,
+                   SUM(critical_errors) AS critical_errors,
+                   CASE WHEN SUM(total_allocs) > 0 THEN ROUND(
+                       CAST(SUM(failed_allocs) AS REAL) / SUM(total_allocs) * 100, 2
+                   ) ELSE 0 END AS mem_failure_pct,
+                   SUM(net_failures) AS network_failures,
+                   SUM(syscall_failures) AS syscall_failures
+            FROM partials
+            WHERE module IS NOT NULL
+            GROUP BY module
+        )
+        SELECT module AS module_name, failed_loads, critical_errors, mem_failure_pct,
+               network_failures, syscall_failures,
+               (failed_loads * 3 + critical_errors * 5 + network_failures * 4 +
+                syscall_failures * 1) AS danger_score
+        FROM totals
+        WHERE failed_loads >= 3
+            AND critical_errors >= 2
+            AND mem_failure_pct > 35
+        ORDER BY danger_score DESC
+        """,
+    ),
+    'my:boot_errors': union_distinct(order_by='sessions_with_errors DESC'),
+    # HAVING failure_count >= 1 holds for every group a shard returns
+    'my:failed_modules': MergePlan("""
+        SELECT module_name, SUM(failure_count) AS failure_count
+        FROM partials
+        GROUP BY module_name
+        HAVING SUM(failure_count) >= 1
+        ORDER BY SUM(failure_count) DESC
+    """),
+    'my:ct_investigation': union_distinct(order_by='error_severity'),
+    'my:triple_threat': MergePlan("""
+        SELECT module_name, SUM(failed_loads) AS failed_loads,
+               SUM(crit_errors) AS crit_errors, SUM(mem_failures) AS mem_failures
+        FROM partials
+        GROUP BY module_name
+        ORDER BY (SUM(failed_loads) + SUM(crit_errors) + SUM(mem_failures)) DESC
+    """),
+    'my:temporal_analysis': union_distinct(order_by='module_name'),
+}
+
+# Queries registered later without a plan just have their rows concatenated, shard by shard
+concatenate = MergePlan("SELECT * FROM partials")
+
+
+class ShardResult(NamedTuple):
+    path: str
+    rows: int
+    ms: float
+
+
+class FederatedResult(NamedTuple):
+    name: str
+    columns: list[str]
+    rows: list[tuple]
+    shards: list[ShardResult]
+    merged: bool  # False if there was no merge plan and the rows were concatenated
+
+
+def run_partial(db_path: str, sql: str) -> tuple[list[str], list[tuple], float]:
+    """Run one shard's partial query over a read-only connection (in a worker process)."""
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        raise sqlite3.Error(f"{db_path}: {e}") from None
+    finally:
+        conn.close()
+    return columns, rows, (time.perf_counter() - started) * 1000
+
+
+def merge(columns: list[str], partials: list[list[tuple]], final: str) -> tuple[list[str], list[tuple]]:
+    """Load the shards' partial rows into an in-memory 'partials' table and run 'final'."""
+    conn = sqlite3.connect(':memory:')
+    try:
+        # No declared types, so every value is kept exactly as the shard returned it
+        conn.execute(f"CREATE TABLE partials ({', '.join(f'[{c}]' for c in columns)})")
+        placeholders = ', '.join('?' * len(columns))
+        for rows in partials:
+            conn.executemany(f"INSERT INTO partials VALUES ({placeholders})", rows)
+        cursor = conn.execute(final)
+        return [column[0] for column in cursor.description], cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def federated_query(name: str, db_paths: list[str], workers: int | None = None,
+                    executor: ProcessPoolExecutor | None = None) -> FederatedResult:
+    """
+    Run the registered query 'name' over every database in 'db_paths', at most 'workers'
+    shards at a time (default: one per shard, capped at the CPU count), and merge the
+    results. Pass an 'executor' to reuse one process pool across queries.
+    """
+    name = resolve_query(name)
+    plan = merge_plans.get(name, concatenate)
+    sql = plan.partial or registered_queries()[name]
+
+    if executor is not None:
+        results = list(executor.map(run_partial, db_paths, [sql] * len(db_paths)))
+    elif len(db_paths) == 1 or workers == 1:
+        results = [run_partial(path, sql) for path in db_paths]
+    else:
+        workers = workers or min(len(db_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_partial, db_paths, [sql] * len(db_paths)))
+
+    columns = results[0][0]
+    columns, rows = merge(columns, [rows for _, rows, _ in results], plan.final)
+    shards = [ShardResult(path, len(shard_rows), ms)
+              for path, (_, shard_rows, ms) in zip(db_paths, results)]
+    return FederatedResult(name, columns, rows, shards, name in merge_plans)
+
+
+def expand(patterns: list[str]) -> list[str]:
+    """Shard paths from file names and glob patterns, in order, without duplicates."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No databases match {pattern!r}")
+        for path in matches:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def print_result(result: FederatedResult) -> None:
+    print(f"\n🌐 {result.name} over {len(result.shards)} shard(s)"
+          + ("" if result.merged else " (no merge plan - rows concatenated)"))
+    for shard in result.shards:
+        print(f"   {shard.path:<40} {shard.rows:>7} partial rows {shard.ms:>9.1f} ms")
+    widths = [max([len(str(c))] + [len(str(row[i])) for row in result.rows])
+              for i, c in enumerate(result.columns)]
+    print("  ".join(f"{c:<{w}}" for c, w in zip(result.columns, widths)))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in result.rows:
+        print("  ".join(f"{str(v):<{w}}" for v, w in zip(row, widths)))
+    print(f"({len(result.rows)} rows)")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a registered query across many databases")
+    parser.add_argument('query', nargs='?', help="Registered query, e.g. tier:4.1 or my:boot_errors")
+    parser.add_argument('shards', nargs='+', help="Database files or glob patterns")
+    parser.add_argument('--all', action='store_true', help="Run every registered query")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Shards queried at once (default: one per shard, up to the CPU count)")
+    args = parser.parse_args(argv)
+    if args.all and args.query:
+        args.shards.insert(0, args.query)  # With --all the first positional is a shard
+        args.query = None
+    elif not args.all and not args.query:
+        parser.error("give a query name or --all")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    db_paths = expand(args.shards)
+    names = list(registered_queries()) if args.all else [args.query]
+    workers = args.workers or min(len(db_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for name in names:
+            print_result(federated_query(name, db_paths, executor=executor))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - FTS5 full-text search
+External-content FTS5 indexes over boot_logs.message and error_codes.description, so text
+searches are index lookups instead of LIKE '%...%' scans. They are opt-in: --rebuild here,
+or generate_ctf_db.py --fulltext, builds them once the data is in (one 'rebuild' rather
+than an update per row), and triggers keep them in sync with every later insert, update or
+delete - append and ingest_dmesg included.
+
+    from helper_utils.fulltext import search
+
+    for hit in search(conn, '"stack corruption"'):
+        print(hit.timestamp, hit.module, hit.text)
+
+Queries use FTS5 syntax: words (AND-ed), "quoted phrases", OR, NOT, prefix*, NEAR(...).
+Words are stemmed, so 'leak' also matches 'leaks' and 'leaking'.
+
+Usage (from the repository root):
+    python3 -m helper_utils.fulltext '"memory leak"'
+    python3 -m helper_utils.fulltext 'unusual AND network' --table boot_logs --limit 5
+    python3 -m helper_utils.fulltext --rebuild          # build (or rebuild) the indexes
+"""
+
+import argparse
+import sqlite3
+from typing import NamedTuple
+
+
+class FullTextSource(NamedTuple):
+    table: str
+    key: str  # INTEGER PRIMARY KEY, the FTS rowid
+    column: str  # Indexed text
+    module: str | None  # Module column to report, if the table has one
+
+
+fulltext_sources = {
+    'boot_logs': FullTextSource('boot_logs', 'log_id', 'message', None),
+    'error_codes': FullTextSource('error_codes', 'error_id', 'description', 'affected_module'),
+}
+
+
+class SearchHit(NamedTuple):
+    table: str
+    row_id: int
+    timestamp: float
+    module: str | None
+    text: str
+    rank: float  # bm25, lower is better
+
+
+def fts_table(table: str) -> str:
+    return f"{table}_fts"
+
+
+def _content_table(cursor: sqlite3.Cursor, table: str) -> str:
+    """The table holding the text - the _data table in the compact layout."""
+    from helper_utils.compact_schema import data_table, is_compact
+
+    return data_table(table) if is_compact(cursor) else table
+
+
+# The AFTER ... triggers on each content table that keep its index in sync
+sync_events = ('insert', 'delete', 'update')
+
+
+def _sync_triggers(source: FullTextSource, content: str) -> list[str]:
+    fts, key, column = fts_table(source.table), source.key, source.column
+    delete = (f"INSERT INTO {fts} ({fts}, rowid, {column}) "
+              f"VALUES ('delete', OLD.{key}, OLD.{column});")
+    insert = f"INSERT INTO {fts} (rowid, {column}) VALUES (NEW.{key}, NEW.{column});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {content} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {content} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {key}, {column} "
+        f"ON {content} BEGIN {delete} {insert} END",
+    ]
+
+
+def is_installed(cursor: sqlite3.Cursor) -> bool:
+    (count,) = cursor.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+        f"AND name IN ({', '.join('?' for _ in fulltext_sources)})",
+        [fts_table(table) for table in fulltext_sources]
+    ).fetchone()
+    return count > 0
+
+
+def install(cursor: sqlite3.Cursor) -> None:
+    """
+    Create any missing full-text index, fill it from its table, and add the sync triggers.
+    Indexes that already exist are left alone (their triggers have kept them current).
+    """
+    for source in fulltext_sources.values():
+        fts = fts_table(source.table)
+        (exists,) = cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = ?", (fts,)
+        ).fetchone()
+        content = _content_table(cursor, source.table)
+        if not exists:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({source.column}, content='{content}', "
+                f"content_rowid='{source.key}', tokenize='porter unicode61')"
+            )
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        for ddl in _sync_triggers(source, content):
+            cursor.execute(ddl)
+
+
+def drop(cursor: sqlite3.Cursor) -> None:
+    """
+    Remove the full-text indexes and their sync triggers. The triggers are on the content
+    tables, not the indexes, so they have to be dropped by name or every later write to
+    boot_logs or error_codes would fail on the missing index.
+    """
+    for table in fulltext_sources:
+        fts = fts_table(table)
+        for event in sync_events:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{event}")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def search(conn: sqlite3.Connection, query: str, table: str | None = None,
+           limit: int = 20) -> list[SearchHit]:
+    """
+    The best 'limit' matches for an FTS5 'query' in one table or both, best first, joined
+    back to each row's timestamp and module.
+    """
+    sources = [fulltext_sources[table]] if table else list(fulltext_sources.values())
+    selects = []
+    for s in sources:
+        fts = fts_table(s.table)
+        module = f"t.{s.module}" if s.module else "NULL"
+        selects.append(
+            f"SELECT '{s.table}', t.{s.key}, t.timestamp, {module}, t.{s.column}, "
+            f"bm25({fts}) AS rank "
+            f"FROM {fts} JOIN {s.table} AS t ON t.{s.key} = {fts}.rowid WHERE {fts} MATCH ?"
+        )
+    sql = ' UNION ALL '.join(selects) + " ORDER BY rank LIMIT ?"
+    return [SearchHit(*row) for row in conn.execute(sql, [query] * len(sources) + [limit])]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Full-text search over log messages")
+    parser.add_argument('query', nargs='?', help="FTS5 query, e.g. '\"stack corruption\"'")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to search")
+    parser.add_argument('--table', choices=sorted(fulltext_sources), default=None,
+                        help="Search one table only")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum hits")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="(Re)build the full-text indexes from the tables")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    if args.rebuild:
+        with conn:
+            drop(conn.cursor())
+            install(conn.cursor())
+        print("✅ Full-text indexes rebuilt.")
+    if args.query and not is_installed(conn.cursor()):
+        print("❌ No full-text indexes - build them with --rebuild")
+    elif args.query:
+        print(f"{'Table':<12} {'Row':>8} {'Timestamp':>15} {'Module':<22} {'Rank':>7}  Text")
+        print("-" * 100)
+        for hit in search(conn, args.query, args.table, args.limit):
+            print(f"{hit.table:<12} {hit.row_id:>8} {hit.timestamp:>15.2f} "
+                  f"{hit.module or '-':<22} {hit.rank:>7.2f}  {hit.text}")
+    conn.close()
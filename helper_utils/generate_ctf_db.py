@@ -3,99 +3,23 @@
 SQL CTF: Kernel Module Detective
 Generates a SQLite database with simulated dmesg logs
 Goal: Find the faulty kernel module across 5 tiers of difficulty
+
+Usage:
+    python3 generate_ctf_db.py                      # ~1500 rows, the classic CTF
+    python3 generate_ctf_db.py --scale 10000 --bulk # ~15M rows for load testing
 """
 
+import argparse
+import os
 import sqlite3
 import random
 import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
-# Database connection
-db_path = 'kernel_logs.db'
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Drop existing tables if they exist
-cursor.execute("DROP TABLE IF EXISTS boot_logs")
-cursor.execute("DROP TABLE IF EXISTS module_events")
-cursor.execute("DROP TABLE IF EXISTS error_codes")
-cursor.execute("DROP TABLE IF EXISTS system_calls")
-cursor.execute("DROP TABLE IF EXISTS device_drivers")
-cursor.execute("DROP TABLE IF EXISTS memory_events")
-
-# Table 1: Boot Logs - Main log entries
-cursor.execute("""
-CREATE TABLE boot_logs (
-    log_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    log_level TEXT,
-    subsystem TEXT,
-    message TEXT,
-    boot_session INTEGER
-)
-""")
-
-# Table 2: Module Events - Module loading/unloading
-cursor.execute("""
-CREATE TABLE module_events (
-    event_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    module_name TEXT,
-    action TEXT,
-    status TEXT,
-    load_address TEXT,
-    boot_session INTEGER
-)
-""")
-
-# Table 3: Error Codes - Detailed error information
-cursor.execute("""
-CREATE TABLE error_codes (
-    error_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    error_code TEXT,
-    severity TEXT,
-    subsystem TEXT,
-    affected_module TEXT,
-    description TEXT
-)
-""")
-
-# Table 4: System Calls - System call failures
-cursor.execute("""
-CREATE TABLE system_calls (
-    call_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    syscall_name TEXT,
-    return_code INTEGER,
-    caller_module TEXT,
-    process_name TEXT
-)
-""")
-
-# Table 5: Device Drivers - Device initialization
-cursor.execute("""
-CREATE TABLE device_drivers (
-    driver_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    driver_name TEXT,
-    device_id TEXT,
-    initialization_status TEXT,
-    parent_module TEXT
-)
-""")
-
-# Table 6: Memory Events - Memory allocation issues
-cursor.execute("""
-CREATE TABLE memory_events (
-    mem_id INTEGER PRIMARY KEY,
-    timestamp REAL,
-    event_type TEXT,
-    allocated_bytes INTEGER,
-    requesting_module TEXT,
-    allocation_success BOOLEAN
-)
-""")
+import numpy as np
 
 # Kernel modules (the culprit is 'corrupted_netfilter')
 legitimate_modules = [
@@ -115,23 +39,243 @@ log_levels = ['INFO', 'WARN', 'ERROR', 'CRIT', 'DEBUG']
 # Generate base timestamp
 base_time = datetime(2024, 1, 15, 10, 0, 0).timestamp()
 
+# Rows generated per boot session at scale factor 1
+rows_per_session = {
+    'boot_logs': 200,
+    'module_events': 50,
+    'error_codes': 30,
+    'system_calls': 40,
+    'device_drivers': 25,
+    'memory_events': 35,
+}
+
+# Table definitions - insert columns are everything but the INTEGER PRIMARY KEY
+schema = {
+    # Table 1: Boot Logs - Main log entries
+    'boot_logs': """
+    CREATE TABLE boot_logs (
+        log_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        log_level TEXT,
+        subsystem TEXT,
+        message TEXT,
+        boot_session INTEGER
+    )
+    """,
+    # Table 2: Module Events - Module loading/unloading
+    'module_events': """
+    CREATE TABLE module_events (
+        event_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        module_name TEXT,
+        action TEXT,
+        status TEXT,
+        load_address TEXT,
+        boot_session INTEGER
+    )
+    """,
+    # Table 3: Error Codes - Detailed error information
+    'error_codes': """
+    CREATE TABLE error_codes (
+        error_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        error_code TEXT,
+        severity TEXT,
+        subsystem TEXT,
+        affected_module TEXT,
+        description TEXT
+    )
+    """,
+    # Table 4: System Calls - System call failures
+    'system_calls': """
+    CREATE TABLE system_calls (
+        call_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        syscall_name TEXT,
+        return_code INTEGER,
+        caller_module TEXT,
+        process_name TEXT
+    )
+    """,
+    # Table 5: Device Drivers - Device initialization
+    'device_drivers': """
+    CREATE TABLE device_drivers (
+        driver_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        driver_name TEXT,
+        device_id TEXT,
+        initialization_status TEXT,
+        parent_module TEXT
+    )
+    """,
+    # Table 6: Memory Events - Memory allocation issues
+    'memory_events': """
+    CREATE TABLE memory_events (
+        mem_id INTEGER PRIMARY KEY,
+        timestamp REAL,
+        event_type TEXT,
+        allocated_bytes INTEGER,
+        requesting_module TEXT,
+        allocation_success BOOLEAN
+    )
+    """,
+}
+
+insert_columns = {
+    'boot_logs': ('timestamp', 'log_level', 'subsystem', 'message', 'boot_session'),
+    'module_events': (
+        'timestamp', 'module_name', 'action', 'status', 'load_address', 'boot_session'
+    ),
+    'error_codes': (
+        'timestamp', 'error_code', 'severity', 'subsystem', 'affected_module', 'description'
+    ),
+    'system_calls': (
+        'timestamp', 'syscall_name', 'return_code', 'caller_module', 'process_name'
+    ),
+    'device_drivers': (
+        'timestamp', 'driver_name', 'device_id', 'initialization_status', 'parent_module'
+    ),
+    'memory_events': (
+        'timestamp', 'event_type', 'allocated_bytes', 'requesting_module', 'allocation_success'
+    ),
+}
+
+# INTEGER PRIMARY KEY of each table - the rowid, under a name views can expose too
+primary_keys = {
+    'boot_logs': 'log_id',
+    'module_events': 'event_id',
+    'error_codes': 'error_id',
+    'system_calls': 'call_id',
+    'device_drivers': 'driver_id',
+    'memory_events': 'mem_id',
+}
+
+# Create indices for better query performance
+indexes = [
+    "CREATE INDEX IF NOT EXISTS idx_boot_logs_session ON boot_logs(boot_session)",
+    "CREATE INDEX IF NOT EXISTS idx_module_events_module ON module_events(module_name)",
+    "CREATE INDEX IF NOT EXISTS idx_error_codes_module ON error_codes(affected_module)",
+    "CREATE INDEX IF NOT EXISTS idx_system_calls_module ON system_calls(caller_module)",
+    "CREATE INDEX IF NOT EXISTS idx_device_drivers_module ON device_drivers(parent_module)",
+    "CREATE INDEX IF NOT EXISTS idx_memory_events_module ON memory_events(requesting_module)",
+]
+
+# Per-table high-water marks, so appends only ever look at rows past the last mark
+ingest_state_ddl = """
+CREATE TABLE IF NOT EXISTS ingest_state (
+    table_name TEXT PRIMARY KEY,
+    max_rowid INTEGER,
+    max_timestamp REAL,
+    updated_at REAL
+)
+"""
+
+# Settings for a throwaway bulk load - durability is traded for speed, the file is
+# regenerated from scratch if the load is interrupted
+bulk_pragmas = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",  # 256 MiB, negative values are KiB
+]
+
+
 # Helper functions
-def random_hex_address():
-    return '0x' + ''.join(random.choices('0123456789abcdef', k=16))
+def random_hex_address(rng=random):
+    return '0x' + ''.join(rng.choices('0123456789abcdef', k=16))
+
+
+def random_error_code(rng=random):
+    return f"ERR_{rng.randint(1000, 9999)}"
+
+
+def insert_sql(table: str) -> str:
+    columns = insert_columns[table]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+
+
+def _session_range(table: str, scale: int, start: int, stop: int | None) -> tuple[int, int]:
+    count = rows_per_session[table] * scale
+    stop = count if stop is None else min(stop, count)
+    return start, stop
+
+
+def create_tables(cursor: sqlite3.Cursor) -> None:
+    """Drop existing tables (or a compact layout) if they exist, then recreate all six."""
+    from helper_utils.compact_schema import drop_compact
+    from helper_utils.fulltext import drop as drop_fulltext
+    from helper_utils.module_flags import drop as drop_flags
+
+    drop_compact(cursor)
+    drop_fulltext(cursor)
+    drop_flags(cursor)
+    for table in schema:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute("DROP TABLE IF EXISTS ingest_state")
+    for ddl in schema.values():
+        cursor.execute(ddl)
+
+
+def create_indexes(cursor: sqlite3.Cursor) -> None:
+    """B-tree indexes; the FTS5 text indexes are opt-in (--fulltext, see fulltext.py)."""
+    from helper_utils.compact_schema import compact_indexes, is_compact
+
+    for ddl in compact_indexes if is_compact(cursor) else indexes:
+        cursor.execute(ddl)
+
+
+def high_water_marks(cursor: sqlite3.Cursor) -> dict[str, tuple[int, float | None]]:
+    """Return the recorded {table: (max_rowid, max_timestamp)}, zeros for untracked tables."""
+    cursor.execute(ingest_state_ddl)
+    marks = {table: (0, None) for table in schema}
+    for table, max_rowid, max_timestamp in cursor.execute(
+        "SELECT table_name, max_rowid, max_timestamp FROM ingest_state"
+    ):
+        marks[table] = (max_rowid, max_timestamp)
+    return marks
+
 
-def random_error_code():
-    return f"ERR_{random.randint(1000, 9999)}"
+def record_high_water_marks(cursor: sqlite3.Cursor) -> dict[str, tuple[int, float | None]]:
+    """
+    Advance each table's mark past the rows inserted since the last one. Only rows with a
+    rowid (primary key) beyond the previous mark are scanned, so the cost follows the size
+    of the append rather than the size of the table.
+    """
+    marks = high_water_marks(cursor)
+    for table, (max_rowid, max_timestamp) in marks.items():
+        key = primary_keys[table]
+        new_rowid, new_timestamp = cursor.execute(
+            f"SELECT MAX({key}), MAX(timestamp) FROM {table} WHERE {key} > ?", (max_rowid,)
+        ).fetchone()
+        if new_rowid is None:
+            continue
+        if max_timestamp is not None and new_timestamp is not None:
+            new_timestamp = max(max_timestamp, new_timestamp)
+        marks[table] = (new_rowid, new_timestamp)
+        cursor.execute(
+            "INSERT OR REPLACE INTO ingest_state VALUES (?, ?, ?, ?)",
+            (table, new_rowid, new_timestamp, time.time()),
+        )
+    return marks
 
-# Generate data for 3 boot sessions
-for boot_session in range(1, 4):
+
+# ============================================================================
+# ROW GENERATORS - one per table, yielding insert tuples for a single session
+# ============================================================================
+def boot_log_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                  start: int = 0, stop: int | None = None):
     session_offset = (boot_session - 1) * 3600  # 1 hour apart
-    
-    # Generate boot logs (200 per session)
-    for i in range(200):
-        timestamp = base_time + session_offset + i * 2.5
-        log_level = random.choice(log_levels) if random.random() > 0.3 else 'INFO'
-        subsystem = random.choice(subsystems)
-        
+    start, stop = _session_range('boot_logs', scale, start, stop)
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + i * 2.5 / scale
+        log_level = rng.choice(log_levels) if rng.random() > 0.3 else 'INFO'
+        subsystem = rng.choice(subsystems)
+
         messages = [
             f"Initializing {subsystem} subsystem",
             f"{subsystem.upper()} device detected",
@@ -139,46 +283,48 @@ for boot_session in range(1, 4):
             f"{subsystem} ready",
             f"Processing {subsystem} requests"
         ]
-        
+
         # Inject anomalies for the faulty module in session 2 and 3
-        if boot_session >= 2 and random.random() < 0.05 and subsystem == 'network':
-            messages.append(f"Unusual activity in network stack")
+        if boot_session >= 2 and rng.random() < 0.05 and subsystem == 'network':
+            messages.append("Unusual activity in network stack")
             log_level = 'WARN'
-        
-        message = random.choice(messages)
-        
-        cursor.execute("""
-            INSERT INTO boot_logs (timestamp, log_level, subsystem, message, boot_session)
-            VALUES (?, ?, ?, ?, ?)
-        """, (timestamp, log_level, subsystem, message, boot_session))
-    
-    # Generate module events (50 per session)
-    for i in range(50):
-        timestamp = base_time + session_offset + i * 10
-        module_name = random.choice(all_modules)
-        action = random.choice(['LOAD', 'LOAD', 'LOAD', 'UNLOAD'])  # More loads than unloads
-        
+
+        message = rng.choice(messages)
+        yield (timestamp, log_level, subsystem, message, boot_session)
+
+
+def module_event_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                      start: int = 0, stop: int | None = None):
+    session_offset = (boot_session - 1) * 3600
+    start, stop = _session_range('module_events', scale, start, stop)
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + i * 10 / scale
+        module_name = rng.choice(all_modules)
+        action = rng.choice(['LOAD', 'LOAD', 'LOAD', 'UNLOAD'])  # More loads than unloads
+
         # The faulty module has issues in sessions 2 and 3
         if module_name == faulty_module and boot_session >= 2:
-            status = 'FAILED' if random.random() < 0.4 else 'SUCCESS'
+            status = 'FAILED' if rng.random() < 0.4 else 'SUCCESS'
         else:
-            status = 'SUCCESS' if random.random() > 0.05 else 'FAILED'
-        
-        load_address = random_hex_address()
-        
-        cursor.execute("""
-            INSERT INTO module_events (timestamp, module_name, action, status, load_address, boot_session)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (timestamp, module_name, action, status, load_address, boot_session))
-    
-    # Generate error codes (30 per session)
-    for i in range(30):
-        timestamp = base_time + session_offset + random.uniform(0, 3600)
-        error_code = random_error_code()
-        severity = random.choice(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
-        subsystem = random.choice(subsystems)
-        affected_module = random.choice(all_modules)
-        
+            status = 'SUCCESS' if rng.random() > 0.05 else 'FAILED'
+
+        load_address = random_hex_address(rng)
+        yield (timestamp, module_name, action, status, load_address, boot_session)
+
+
+def error_code_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                    start: int = 0, stop: int | None = None):
+    session_offset = (boot_session - 1) * 3600
+    start, stop = _session_range('error_codes', scale, start, stop)
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + rng.uniform(0, 3600)
+        error_code = random_error_code(rng)
+        severity = rng.choice(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+        subsystem = rng.choice(subsystems)
+        affected_module = rng.choice(all_modules)
+
         descriptions = [
             "Resource temporarily unavailable",
             "Invalid memory access",
@@ -189,96 +335,614 @@ for boot_session in range(1, 4):
             "Permission denied",
             "Device not responding"
         ]
-        
+
         # Faulty module generates more critical errors
         if affected_module == faulty_module and boot_session >= 2:
-            severity = random.choice(['HIGH', 'CRITICAL'])
+            severity = rng.choice(['HIGH', 'CRITICAL'])
             descriptions.append("Kernel panic avoided")
             descriptions.append("Stack corruption detected")
             descriptions.append("Memory leak pattern detected")
-        
-        description = random.choice(descriptions)
-        
-        cursor.execute("""
-            INSERT INTO error_codes (timestamp, error_code, severity, subsystem, affected_module, description)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (timestamp, error_code, severity, subsystem, affected_module, description))
-    
-    # Generate system calls (40 per session)
-    for i in range(40):
-        timestamp = base_time + session_offset + random.uniform(0, 3600)
-        syscalls = ['open', 'read', 'write', 'ioctl', 'mmap', 'socket', 'connect', 'bind']
-        syscall_name = random.choice(syscalls)
-        return_code = 0 if random.random() > 0.2 else random.choice([-1, -2, -11, -22])
-        caller_module = random.choice(all_modules)
-        
-        processes = ['systemd', 'NetworkManager', 'pulseaudio', 'Xorg', 'firefox', 'chrome']
-        process_name = random.choice(processes)
-        
+
+        description = rng.choice(descriptions)
+        yield (timestamp, error_code, severity, subsystem, affected_module, description)
+
+
+def system_call_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                     start: int = 0, stop: int | None = None):
+    session_offset = (boot_session - 1) * 3600
+    start, stop = _session_range('system_calls', scale, start, stop)
+    syscalls = ['open', 'read', 'write', 'ioctl', 'mmap', 'socket', 'connect', 'bind']
+    processes = ['systemd', 'NetworkManager', 'pulseaudio', 'Xorg', 'firefox', 'chrome']
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + rng.uniform(0, 3600)
+        syscall_name = rng.choice(syscalls)
+        return_code = 0 if rng.random() > 0.2 else rng.choice([-1, -2, -11, -22])
+        caller_module = rng.choice(all_modules)
+        process_name = rng.choice(processes)
+
         # Faulty module causes syscall failures
         if caller_module == faulty_module and boot_session >= 2:
-            return_code = random.choice([-1, -11, -22])
-        
-        cursor.execute("""
-            INSERT INTO system_calls (timestamp, syscall_name, return_code, caller_module, process_name)
-            VALUES (?, ?, ?, ?, ?)
-        """, (timestamp, syscall_name, return_code, caller_module, process_name))
-    
-    # Generate device drivers (25 per session)
-    for i in range(25):
-        timestamp = base_time + session_offset + i * 20
-        drivers = ['eth0', 'wlan0', 'sda', 'nvidia0', 'audio0', 'usb1', 'bluetooth0']
-        driver_name = random.choice(drivers)
-        device_id = f"{random.randint(1000, 9999)}:{random.randint(1000, 9999)}"
-        initialization_status = 'SUCCESS' if random.random() > 0.1 else 'FAILED'
-        parent_module = random.choice(all_modules)
-        
+            return_code = rng.choice([-1, -11, -22])
+
+        yield (timestamp, syscall_name, return_code, caller_module, process_name)
+
+
+def device_driver_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                       start: int = 0, stop: int | None = None):
+    session_offset = (boot_session - 1) * 3600
+    start, stop = _session_range('device_drivers', scale, start, stop)
+    drivers = ['eth0', 'wlan0', 'sda', 'nvidia0', 'audio0', 'usb1', 'bluetooth0']
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + i * 20 / scale
+        driver_name = rng.choice(drivers)
+        device_id = f"{rng.randint(1000, 9999)}:{rng.randint(1000, 9999)}"
+        initialization_status = 'SUCCESS' if rng.random() > 0.1 else 'FAILED'
+        parent_module = rng.choice(all_modules)
+
         # Network devices fail when faulty module is involved
         if parent_module == faulty_module and driver_name in ['eth0', 'wlan0'] and boot_session >= 2:
             initialization_status = 'FAILED'
-        
-        cursor.execute("""
-            INSERT INTO device_drivers (timestamp, driver_name, device_id, initialization_status, parent_module)
-            VALUES (?, ?, ?, ?, ?)
-        """, (timestamp, driver_name, device_id, initialization_status, parent_module))
-    
-    # Generate memory events (35 per session)
-    for i in range(35):
-        timestamp = base_time + session_offset + random.uniform(0, 3600)
-        event_types = ['ALLOC', 'FREE', 'REALLOC', 'MMAP']
-        event_type = random.choice(event_types)
-        allocated_bytes = random.randint(1024, 1048576)
-        requesting_module = random.choice(all_modules)
-        allocation_success = True if random.random() > 0.15 else False
-        
+
+        yield (timestamp, driver_name, device_id, initialization_status, parent_module)
+
+
+def memory_event_rows(rng: random.Random, boot_session: int, scale: int = 1,
+                      start: int = 0, stop: int | None = None):
+    session_offset = (boot_session - 1) * 3600
+    start, stop = _session_range('memory_events', scale, start, stop)
+    event_types = ['ALLOC', 'FREE', 'REALLOC', 'MMAP']
+
+    for i in range(start, stop):
+        timestamp = base_time + session_offset + rng.uniform(0, 3600)
+        event_type = rng.choice(event_types)
+        allocated_bytes = rng.randint(1024, 1048576)
+        requesting_module = rng.choice(all_modules)
+        allocation_success = True if rng.random() > 0.15 else False
+
         # Faulty module has memory allocation issues
         if requesting_module == faulty_module and boot_session >= 2:
-            allocation_success = False if random.random() < 0.5 else True
-            allocated_bytes = random.randint(10485760, 104857600)  # Larger allocations
-        
-        cursor.execute("""
-            INSERT INTO memory_events (timestamp, event_type, allocated_bytes, requesting_module, allocation_success)
-            VALUES (?, ?, ?, ?, ?)
-        """, (timestamp, event_type, allocated_bytes, requesting_module, allocation_success))
+            allocation_success = False if rng.random() < 0.5 else True
+            allocated_bytes = rng.randint(10485760, 104857600)  # Larger allocations
 
-# Create indices for better query performance
-cursor.execute("CREATE INDEX idx_boot_logs_session ON boot_logs(boot_session)")
-cursor.execute("CREATE INDEX idx_module_events_module ON module_events(module_name)")
-cursor.execute("CREATE INDEX idx_error_codes_module ON error_codes(affected_module)")
-cursor.execute("CREATE INDEX idx_system_calls_module ON system_calls(caller_module)")
-cursor.execute("CREATE INDEX idx_device_drivers_module ON device_drivers(parent_module)")
-cursor.execute("CREATE INDEX idx_memory_events_module ON memory_events(requesting_module)")
-
-conn.commit()
-conn.close()
-
-print(f"✅ Database '{db_path}' generated successfully!")
-print(f"📊 Total records: ~1500 across 6 tables")
-print(f"🎯 Hidden faulty module: '{faulty_module}'")
-print(f"🔍 Decoy modules: {suspicious_modules}")
-print(f"\n🚀 Ready to start the CTF challenge!")
-print(f"\nTo begin:")
-print(f"1. python3 generate_ctf_db.py  # (you just did this)")
-print(f"2. Read challenges.md for the 5 tiers")
-print(f"3. Consult sql_reference.pdf when needed")
-print(f"4. Query the database using Python sqlite3 or CLI")
+        yield (timestamp, event_type, allocated_bytes, requesting_module, allocation_success)
+
+
+row_generators = {
+    'boot_logs': boot_log_rows,
+    'module_events': module_event_rows,
+    'error_codes': error_code_rows,
+    'system_calls': system_call_rows,
+    'device_drivers': device_driver_rows,
+    'memory_events': memory_event_rows,
+}
+
+
+# ============================================================================
+# VECTORIZED COLUMN GENERATORS - NumPy equivalents of the row generators above.
+# Each returns the insert columns for rows [start, stop) of one session. The RNG
+# stream differs from the row path, but every choice, probability and injection
+# rule is the same, so a given seed produces the same statistical shape.
+# ============================================================================
+_hex_pairs = np.array([f"{b:02x}".encode() for b in range(256)], dtype='S2')
+
+
+def _pick(gen: np.random.Generator, options, n: int) -> np.ndarray:
+    return np.asarray(options)[gen.integers(0, len(options), n)]
+
+
+def random_hex_addresses(gen: np.random.Generator, n: int) -> np.ndarray:
+    """Vectorized random_hex_address: n '0x' + 16 hex digit strings."""
+    raw = gen.integers(0, 2 ** 64, n, dtype=np.uint64, endpoint=False)
+    octets = raw.astype('>u8').view(np.uint8).reshape(n, 8)
+    digits = np.ascontiguousarray(_hex_pairs[octets]).view('S16').ravel()
+    return np.char.add(b'0x', digits).astype('U18')
+
+
+def boot_log_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                     start: int = 0, stop: int | None = None):
+    start, stop = _session_range('boot_logs', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + np.arange(start, stop) * 2.5 / scale
+    log_level = np.where(gen.random(n) > 0.3, _pick(gen, log_levels, n), 'INFO')
+    subsystem_idx = gen.integers(0, len(subsystems), n)
+    subsystem = np.asarray(subsystems)[subsystem_idx]
+
+    # One row of message templates per subsystem, plus the injected anomaly column
+    templates = np.array([
+        [f"Initializing {s} subsystem", f"{s.upper()} device detected",
+         f"Loading {s} configuration", f"{s} ready", f"Processing {s} requests",
+         "Unusual activity in network stack"]
+        for s in subsystems
+    ])
+    anomaly = (boot_session >= 2) & (gen.random(n) < 0.05) & (subsystem == 'network')
+    template_idx = np.where(anomaly, gen.integers(0, 6, n), gen.integers(0, 5, n))
+    log_level = np.where(anomaly, 'WARN', log_level)
+    message = templates[subsystem_idx, template_idx]
+    return (timestamp, log_level, subsystem, message, np.full(n, boot_session))
+
+
+def module_event_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                         start: int = 0, stop: int | None = None):
+    start, stop = _session_range('module_events', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + np.arange(start, stop) * 10 / scale
+    module_name = _pick(gen, all_modules, n)
+    action = _pick(gen, ['LOAD', 'LOAD', 'LOAD', 'UNLOAD'], n)
+
+    roll = gen.random(n)
+    faulty = (module_name == faulty_module) & (boot_session >= 2)
+    failed = np.where(faulty, roll < 0.4, roll <= 0.05)
+    status = np.where(failed, 'FAILED', 'SUCCESS')
+    load_address = random_hex_addresses(gen, n)
+    return (timestamp, module_name, action, status, load_address, np.full(n, boot_session))
+
+
+def error_code_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                       start: int = 0, stop: int | None = None):
+    start, stop = _session_range('error_codes', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + gen.uniform(0, 3600, n)
+    error_code = np.char.add('ERR_', gen.integers(1000, 10000, n).astype(str))
+    severity = _pick(gen, ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'], n)
+    subsystem = _pick(gen, subsystems, n)
+    affected_module = _pick(gen, all_modules, n)
+
+    descriptions = np.array([
+        "Resource temporarily unavailable",
+        "Invalid memory access",
+        "Timeout waiting for resource",
+        "Buffer overflow detected",
+        "Null pointer dereference",
+        "Segmentation fault",
+        "Permission denied",
+        "Device not responding",
+        # Only reachable by the faulty module
+        "Kernel panic avoided",
+        "Stack corruption detected",
+        "Memory leak pattern detected",
+    ])
+    faulty = (affected_module == faulty_module) & (boot_session >= 2)
+    severity = np.where(faulty, _pick(gen, ['HIGH', 'CRITICAL'], n), severity)
+    description_idx = np.where(faulty, gen.integers(0, 11, n), gen.integers(0, 8, n))
+    description = descriptions[description_idx]
+    return (timestamp, error_code, severity, subsystem, affected_module, description)
+
+
+def system_call_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                        start: int = 0, stop: int | None = None):
+    start, stop = _session_range('system_calls', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + gen.uniform(0, 3600, n)
+    syscall_name = _pick(
+        gen, ['open', 'read', 'write', 'ioctl', 'mmap', 'socket', 'connect', 'bind'], n
+    )
+    return_code = np.where(gen.random(n) > 0.2, 0, _pick(gen, [-1, -2, -11, -22], n))
+    caller_module = _pick(gen, all_modules, n)
+    process_name = _pick(
+        gen, ['systemd', 'NetworkManager', 'pulseaudio', 'Xorg', 'firefox', 'chrome'], n
+    )
+
+    faulty = (caller_module == faulty_module) & (boot_session >= 2)
+    return_code = np.where(faulty, _pick(gen, [-1, -11, -22], n), return_code)
+    return (timestamp, syscall_name, return_code, caller_module, process_name)
+
+
+def device_driver_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                          start: int = 0, stop: int | None = None):
+    start, stop = _session_range('device_drivers', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + np.arange(start, stop) * 20 / scale
+    driver_name = _pick(gen, ['eth0', 'wlan0', 'sda', 'nvidia0', 'audio0', 'usb1', 'bluetooth0'], n)
+    device_id = np.char.add(
+        np.char.add(gen.integers(1000, 10000, n).astype(str), ':'),
+        gen.integers(1000, 10000, n).astype(str),
+    )
+    initialization_status = np.where(gen.random(n) > 0.1, 'SUCCESS', 'FAILED')
+    parent_module = _pick(gen, all_modules, n)
+
+    faulty = (
+        (parent_module == faulty_module)
+        & np.isin(driver_name, ['eth0', 'wlan0'])
+        & (boot_session >= 2)
+    )
+    initialization_status = np.where(faulty, 'FAILED', initialization_status)
+    return (timestamp, driver_name, device_id, initialization_status, parent_module)
+
+
+def memory_event_columns(gen: np.random.Generator, boot_session: int, scale: int = 1,
+                         start: int = 0, stop: int | None = None):
+    start, stop = _session_range('memory_events', scale, start, stop)
+    n = stop - start
+    session_offset = (boot_session - 1) * 3600
+    timestamp = base_time + session_offset + gen.uniform(0, 3600, n)
+    event_type = _pick(gen, ['ALLOC', 'FREE', 'REALLOC', 'MMAP'], n)
+    allocated_bytes = gen.integers(1024, 1048577, n)
+    requesting_module = _pick(gen, all_modules, n)
+    allocation_success = gen.random(n) > 0.15
+
+    faulty = (requesting_module == faulty_module) & (boot_session >= 2)
+    allocation_success = np.where(faulty, gen.random(n) >= 0.5, allocation_success)
+    allocated_bytes = np.where(
+        faulty, gen.integers(10485760, 104857601, n), allocated_bytes  # Larger allocations
+    )
+    return (timestamp, event_type, allocated_bytes, requesting_module, allocation_success)
+
+
+column_generators = {
+    'boot_logs': boot_log_columns,
+    'module_events': module_event_columns,
+    'error_codes': error_code_columns,
+    'system_calls': system_call_columns,
+    'device_drivers': device_driver_columns,
+    'memory_events': memory_event_columns,
+}
+
+
+def vectorized_rows(table: str, gen: np.random.Generator, boot_session: int,
+                    scale: int = 1, start: int = 0, stop: int | None = None,
+                    chunk_size: int = 50000):
+    """Yield insert tuples for one session, generating chunk_size rows at a time."""
+    start, stop = _session_range(table, scale, start, stop)
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        columns = column_generators[table](gen, boot_session, scale, chunk_start, chunk_stop)
+        yield from zip(*(column.tolist() for column in columns))
+
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def batched(rows, size: int):
+    """Group an iterable of rows into lists of at most 'size' rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_rows(conn: sqlite3.Connection, table: str, rows, bulk: bool = False,
+              batch_size: int = 50000) -> int:
+    """
+    Insert generated rows into 'table' and return how many were written.
+    The default path mirrors the original one-execute-per-row loop; bulk mode hands
+    whole batches to executemany and commits once per batch.
+    """
+    sql = insert_sql(table)
+    cursor = conn.cursor()
+    count = 0
+    if not bulk:
+        for row in rows:
+            cursor.execute(sql, row)
+            count += 1
+        return count
+    for batch in batched(rows, batch_size):
+        cursor.executemany(sql, batch)
+        conn.commit()
+        count += len(batch)
+    return count
+
+
+def report_throughput(stats: dict[str, list[float]]) -> None:
+    """Print per-table row counts and insert throughput."""
+    print(f"{'Table':<16} {'Rows':>12} {'Seconds':>9} {'Rows/sec':>12}")
+    print("-" * 52)
+    for table, (rows, seconds) in stats.items():
+        rate = rows / seconds if seconds > 0 else float('inf')
+        print(f"{table:<16} {int(rows):>12,} {seconds:>9.2f} {rate:>12,.0f}")
+
+
+def populate_session(conn: sqlite3.Connection, boot_session: int, stats: dict[str, list[float]],
+                     rng: random.Random, gen: np.random.Generator, scale: int = 1,
+                     bulk: bool = False, batch_size: int = 50000, vectorized: bool = False,
+                     part: int = 0, parts: int = 1) -> None:
+    """
+    Load one boot session into every table, accumulating {table: [rows, seconds]} in 'stats'.
+    'part' of 'parts' restricts each table to that slice of the session's rows, which lets
+    a single session be spread over several workers.
+    """
+    for table, rows in row_generators.items():
+        count = rows_per_session[table] * scale
+        first, last = count * part // parts, count * (part + 1) // parts
+        start = time.perf_counter()
+        if vectorized:
+            generated = vectorized_rows(table, gen, boot_session, scale, first, last, batch_size)
+        else:
+            generated = rows(rng, boot_session, scale, first, last)
+        stats[table][0] += load_rows(conn, table, generated, bulk, batch_size)
+        stats[table][1] += time.perf_counter() - start
+
+
+def generate(db_path: str = 'kernel_logs.db', scale: int = 1, sessions: int = 3,
+             bulk: bool = False, batch_size: int = 50000, seed: int | None = None,
+             vectorized: bool = False, verbose: bool = True) -> dict[str, list[float]]:
+    """
+    Build a fresh database at 'db_path' and return {table: [rows, seconds]}.
+    'scale' multiplies the per-session row counts while keeping each session an hour long;
+    'vectorized' swaps the row generators for the NumPy column generators.
+    """
+    rng = random.Random(seed)
+    gen = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if bulk:
+        for pragma in bulk_pragmas:
+            cursor.execute(pragma)
+
+    create_tables(cursor)
+    if bulk:
+        conn.commit()
+
+    stats = {table: [0, 0.0] for table in schema}
+    # Generate data for each boot session
+    for boot_session in range(1, sessions + 1):
+        populate_session(conn, boot_session, stats, rng, gen, scale, bulk, batch_size, vectorized)
+
+    # Indexes are built only once the data is in - one sort per index rather than
+    # a B-tree update per inserted row
+    start = time.perf_counter()
+    create_indexes(cursor)
+    record_high_water_marks(cursor)
+    conn.commit()
+    index_seconds = time.perf_counter() - start
+    conn.close()
+
+    if verbose:
+        report_throughput(stats)
+        print(f"Index build: {index_seconds:.2f}s")
+    return stats
+
+
+# ============================================================================
+# PARALLEL GENERATION - one shard file per work unit, merged with ATTACH
+# ============================================================================
+def plan_work_units(sessions: int, workers: int) -> list[tuple[list[int], int, int]]:
+    """
+    Split the boot sessions into (session_ids, part, parts) units for 'workers' processes.
+    With at least as many sessions as workers, each unit is a contiguous chunk of whole
+    sessions; otherwise every session is sliced into enough parts to keep all workers busy.
+    Units are returned in session/row order, which is the order they are merged in.
+    """
+    if sessions >= workers:
+        chunks = [list(ids) for ids in np.array_split(np.arange(1, sessions + 1), workers)]
+        return [([int(i) for i in ids], 0, 1) for ids in chunks]
+    parts = -(-workers // sessions)  # ceil
+    return [([boot_session], part, parts)
+            for boot_session in range(1, sessions + 1) for part in range(parts)]
+
+
+def generate_shard(shard_path: str, session_ids: list[int], part: int, parts: int,
+                   scale: int, batch_size: int, seed: int, vectorized: bool) -> dict:
+    """Worker entry point: write one work unit into its own bulk-loaded, unindexed shard."""
+    rng = random.Random(seed)
+    gen = np.random.default_rng(seed)
+    conn = sqlite3.connect(shard_path)
+    cursor = conn.cursor()
+    for pragma in bulk_pragmas:
+        cursor.execute(pragma)
+    create_tables(cursor)
+    conn.commit()
+
+    stats = {table: [0, 0.0] for table in schema}
+    for boot_session in session_ids:
+        populate_session(conn, boot_session, stats, rng, gen, scale, True, batch_size,
+                         vectorized, part, parts)
+    conn.commit()
+    conn.close()
+    return stats
+
+
+def merge_shards(db_path: str, shard_paths: list[str]) -> None:
+    """Copy every shard into a fresh 'db_path' with INSERT...SELECT, then index once."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for pragma in bulk_pragmas:
+        cursor.execute(pragma)
+    create_tables(cursor)
+    conn.commit()
+
+    for shard_path in shard_paths:
+        cursor.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+        for table, columns in insert_columns.items():
+            column_list = ', '.join(columns)
+            cursor.execute(
+                f"INSERT INTO main.{table} ({column_list}) "
+                f"SELECT {column_list} FROM shard.{table} ORDER BY rowid"
+            )
+        conn.commit()
+        cursor.execute("DETACH DATABASE shard")
+
+    create_indexes(cursor)
+    record_high_water_marks(cursor)
+    conn.commit()
+    conn.close()
+
+
+def generate_parallel(db_path: str = 'kernel_logs.db', scale: int = 1, sessions: int = 3,
+                      workers: int | None = None, batch_size: int = 50000,
+                      seed: int | None = None, vectorized: bool = False,
+                      verbose: bool = True) -> dict[str, list[float]]:
+    """
+    Generate work units in separate processes, each into '<db_path>.shard<N>', then merge.
+    Every unit gets its own child seed, so a given seed and worker count is reproducible.
+    Returned seconds are summed worker time; the wall-clock total is printed when verbose.
+    """
+    workers = workers or os.cpu_count() or 1
+    units = plan_work_units(sessions, workers)
+    seeds = [int(child.generate_state(1)[0])
+             for child in np.random.SeedSequence(seed).spawn(len(units))]
+    shard_paths = [f"{db_path}.shard{n}" for n in range(len(units))]
+    for shard_path in [db_path] + shard_paths:
+        if os.path.exists(shard_path):
+            os.remove(shard_path)
+
+    started = time.perf_counter()
+    stats = {table: [0, 0.0] for table in schema}
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(units))) as pool:
+            futures = [
+                pool.submit(generate_shard, shard_path, ids, part, parts, scale, batch_size,
+                            unit_seed, vectorized)
+                for shard_path, (ids, part, parts), unit_seed in zip(shard_paths, units, seeds)
+            ]
+            for future in futures:
+                for table, (rows, seconds) in future.result().items():
+                    stats[table][0] += rows
+                    stats[table][1] += seconds
+        generated = time.perf_counter()
+        merge_shards(db_path, shard_paths)
+    finally:
+        for shard_path in shard_paths:
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+
+    if verbose:
+        report_throughput(stats)
+        merged = time.perf_counter()
+        print(f"{len(units)} shards on {min(workers, len(units))} workers: "
+              f"generate {generated - started:.2f}s, merge + index {merged - generated:.2f}s")
+    return stats
+
+
+# ============================================================================
+# APPEND MODE - grow an existing database in place
+# ============================================================================
+def append(db_path: str = 'kernel_logs.db', scale: int = 1, sessions: int = 1,
+           boot_session: int | None = None, batch_size: int = 50000,
+           seed: int | None = None, vectorized: bool = False,
+           verbose: bool = True) -> dict[str, list[float]]:
+    """
+    Add rows to an existing database without dropping anything and return
+    {table: [rows, seconds]}. By default 'sessions' new boot sessions are numbered on from
+    the highest existing one; passing 'boot_session' adds another 'scale' worth of rows to
+    that session instead. Existing indexes are kept and maintained by the inserts, rows are
+    committed every 'batch_size', and the ingest_state high-water marks are advanced, as is
+    the module_flags index if one is installed.
+    """
+    from helper_utils.module_flags import is_installed, refresh as refresh_flags
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    existing = {name for (name,) in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+    )}
+    missing = [table for table in schema if table not in existing]
+    if missing:
+        conn.close()
+        raise sqlite3.OperationalError(
+            f"'{db_path}' is missing {missing} - generate it before appending"
+        )
+    create_indexes(cursor)  # No-op unless an index was dropped
+    before = record_high_water_marks(cursor)  # Picks up rows written outside append()
+    conn.commit()
+
+    if boot_session is None:
+        (latest,) = cursor.execute("SELECT MAX(boot_session) FROM boot_logs").fetchone()
+        session_ids = range((latest or 0) + 1, (latest or 0) + 1 + sessions)
+    else:
+        session_ids = [boot_session]
+
+    rng = random.Random(seed)
+    gen = np.random.default_rng(seed)
+    stats = {table: [0, 0.0] for table in schema}
+    for session_id in session_ids:
+        populate_session(conn, session_id, stats, rng, gen, scale, True, batch_size, vectorized)
+    after = record_high_water_marks(cursor)
+    conn.commit()
+    if is_installed(conn):
+        refresh_flags(conn)  # Already current if its triggers are installed
+    conn.close()
+
+    if verbose:
+        report_throughput(stats)
+        print(f"Appended boot session(s) {list(session_ids)}")
+        for table in schema:
+            print(f"  {table:<16} high-water rowid {before[table][0]:>12,} -> {after[table][0]:>12,}")
+    return stats
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the kernel_logs CTF database")
+    parser.add_argument('--db', default='kernel_logs.db', help="Output database path")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Multiply the per-session row counts (1 = ~1500 rows total)")
+    parser.add_argument('--sessions', type=int, default=None,
+                        help="Number of boot sessions (default 3, or 1 new one with --append)")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Batched executemany transactions with load-tuned PRAGMAs")
+    parser.add_argument('--batch-size', type=int, default=50000,
+                        help="Rows per executemany batch in bulk mode")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible data")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Generate whole columns with NumPy instead of row by row")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Generate shards in this many processes and merge them "
+                             "(0 = one per CPU); implies bulk loading")
+    parser.add_argument('--append', action='store_true',
+                        help="Add boot sessions to an existing database instead of rebuilding it")
+    parser.add_argument('--session', type=int, default=None,
+                        help="With --append, add rows to this existing boot session")
+    parser.add_argument('--fulltext', action='store_true',
+                        help="Also build the FTS5 message indexes (see fulltext.py)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Store in the dictionary-encoded layout (see compact_schema.py)")
+    args = parser.parse_args(argv)
+    if args.append and args.workers is not None:
+        parser.error("--append and --workers cannot be combined")
+    if args.session is not None and not args.append:
+        parser.error("--session requires --append")
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.append:
+        stats = append(args.db, args.scale, args.sessions or 1, args.session, args.batch_size,
+                       args.seed, args.vectorized)
+    elif args.workers is None:
+        stats = generate(args.db, args.scale, args.sessions or 3, args.bulk, args.batch_size,
+                         args.seed, args.vectorized)
+    else:
+        stats = generate_parallel(args.db, args.scale, args.sessions or 3, args.workers,
+                                  args.batch_size, args.seed, args.vectorized)
+    if args.compact:
+        from helper_utils.compact_schema import compact
+
+        compact(args.db)
+    if args.fulltext:
+        from helper_utils.fulltext import install as install_fulltext
+
+        conn = sqlite3.connect(args.db)
+        with conn:
+            install_fulltext(conn.cursor())  # Kept in sync by triggers from here on
+        conn.close()
+    total = sum(int(rows) for rows, _ in stats.values())
+    db_path = args.db
+
+    print(f"✅ Database '{db_path}' {'updated' if args.append else 'generated'} successfully!")
+    print(f"📊 Total records: {total:,} across 6 tables")
+    print(f"🎯 Hidden faulty module: '{faulty_module}'")
+    print(f"🔍 Decoy modules: {suspicious_modules}")
+    print(f"\n🚀 Ready to start the CTF challenge!")
+    print(f"\nTo begin:")
+    print(f"1. python3 generate_ctf_db.py  # (you just did this)")
+    print(f"2. Read challenges.md for the 5 tiers")
+    print(f"3. Consult sql_reference.pdf when needed")
+    print(f"4. Query the database using Python sqlite3 or CLI")
+
+
+if __name__ == "__main__":
+    # Run as a script (python3 helper_utils/generate_ctf_db.py) only this file's directory is
+    # on sys.path; the repository root makes the helper_utils imports above resolve
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
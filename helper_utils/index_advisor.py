@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - index advisor
+Runs EXPLAIN QUERY PLAN over every registered query (the 'queries' dict in
+solutions/queries.py and the tier queries in helper_utils/solutions.py), flags full
+table scans, and trials a workload-derived set of composite/covering indexes against them.
+
+Usage (from the repository root):
+    python3 -m helper_utils.index_advisor                 # report only, database unchanged
+    python3 -m helper_utils.index_advisor --apply         # keep the useful indexes + ANALYZE
+"""
+
+import argparse
+import re
+import sqlite3
+import statistics
+import time
+
+from helper_utils.compact_schema import compact_index, is_compact
+from helper_utils.generate_ctf_db import schema
+from helper_utils.solutions import tier_queries
+
+# Candidate indexes, one per filter/join/group shape in the registered queries.
+# Leading columns are the equality filters, trailing ones make the index covering.
+candidate_indexes = {
+    # boot_errors, 1.2 - log_level IN (...) -> DISTINCT boot_session
+    'idx_boot_logs_level_session': "boot_logs(log_level, boot_session)",
+    # failed_modules, 2.1, 5.2 failed_loads - status = 'FAILED' GROUP BY module_name
+    'idx_module_events_status_module': "module_events(status, module_name)",
+    # temporal_analysis, 3.2, 5.1 - per-module lookups by session and time
+    'idx_module_events_module_session_ts': "module_events(module_name, boot_session, timestamp)",
+    # ct_investigation, triple_threat, 2.2, 3.1 - join on module, filter on severity
+    'idx_error_codes_module_severity': "error_codes(affected_module, severity)",
+    # 5.2 critical_errors - severity = 'CRITICAL' GROUP BY affected_module
+    'idx_error_codes_severity_module': "error_codes(severity, affected_module)",
+    # 4.2 - subsystem = 'network' joined on module
+    'idx_error_codes_subsystem_module': "error_codes(subsystem, affected_module)",
+    # temporal_analysis, 3.2, 5.2 syscall_failures - module join, return_code < 0, time window
+    'idx_system_calls_module_rc_ts': "system_calls(caller_module, return_code, timestamp)",
+    # triple_threat, 3.1, 4.1, 5.2 memory_stats - per-module success ratios
+    'idx_memory_events_module_success': "memory_events(requesting_module, allocation_success)",
+    # 4.2, 5.2 network_failures - status + driver filter, grouped by module
+    'idx_device_drivers_status_driver_module':
+        "device_drivers(initialization_status, driver_name, parent_module)",
+}
+
+base_tables = tuple(schema)
+SCAN_STEP = re.compile(r'^SCAN (?P<name>\w+)(?P<rest>.*)$')
+TABLE_REFERENCE = re.compile(
+    r'\b(?:FROM|JOIN)\s+(?P<table>\w+)(?:\s+(?:AS\s+)?'
+    r'(?!(?:ON|WHERE|INNER|LEFT|JOIN|GROUP|ORDER|UNION|LIMIT)\b)(?P<alias>\w+))?', re.I
+)
+USED_INDEX = re.compile(r'USING (?:COVERING )?INDEX (?P<index>\w+)')
+
+
+def registered_queries() -> dict[str, str]:
+    """Every query the repo knows about, named 'my:<key>' and 'tier:<n.n>'."""
+    from solutions.queries import queries
+
+    workload = {f"my:{name}": sql for name, sql in queries.items()}
+    workload.update({f"tier:{name}": sql for name, sql in tier_queries.items()})
+    return workload
+
+
+def resolve_query(name: str) -> str:
+    """The registered name for 'tier:4.1' / 'my:boot_errors' or a bare '4.1' / 'boot_errors'."""
+    workload = registered_queries()
+    for candidate in (name, f"tier:{name}", f"my:{name}"):
+        if candidate in workload:
+            return candidate
+    raise KeyError(f"No registered query named {name!r}")
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN detail column, one string per plan step."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def table_aliases(sql: str) -> dict[str, str]:
+    """Map every alias (and bare name) used in FROM/JOIN clauses onto its table."""
+    aliases = {}
+    for match in TABLE_REFERENCE.finditer(sql):
+        aliases[match.group('table')] = match.group('table')
+        if match.group('alias'):
+            aliases[match.group('alias')] = match.group('table')
+    return aliases
+
+
+def scan_steps(plan: list[str], sql: str) -> list[str]:
+    """
+    Plan steps that walk a whole base table - either the table itself or a non-covering
+    index over all of it. Steps scanning CTEs or subqueries are ignored.
+    """
+    aliases = table_aliases(sql)
+    flagged = []
+    for step in plan:
+        match = SCAN_STEP.match(step)
+        if not match or 'COVERING INDEX' in match.group('rest'):
+            continue
+        if aliases.get(match.group('name'), match.group('name')) in base_tables:
+            flagged.append(step)
+    return flagged
+
+
+def time_query(conn: sqlite3.Connection, sql: str, repeat: int = 3) -> float:
+    """Median wall time in seconds over 'repeat' full executions."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def profile(conn: sqlite3.Connection, workload: dict[str, str],
+            repeat: int) -> dict[str, dict]:
+    report = {}
+    for name, sql in workload.items():
+        plan = explain(conn, sql)
+        report[name] = {
+            'plan': plan,
+            'scans': scan_steps(plan, sql),
+            'indexes': sorted({m.group('index') for step in plan
+                               for m in [USED_INDEX.search(step)] if m}),
+            'seconds': time_query(conn, sql, repeat),
+        }
+    return report
+
+
+def advise(db_path: str = 'kernel_logs.db', apply: bool = False, repeat: int = 3,
+           verbose: bool = True) -> dict[str, list[str]]:
+    """
+    Profile the workload, create every candidate index, profile again, and report per query.
+    Without 'apply' the candidates are created inside a transaction that is rolled back, so
+    the database is left untouched; with it, candidates no query used are dropped and the
+    rest are kept and ANALYZEd. Returns {'used': [...], 'unused': [...]} index names.
+    In the compact layout the candidates go on the _data tables' stored columns.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    compact = is_compact(conn.cursor())
+    statements = {name: f"CREATE INDEX IF NOT EXISTS {name} ON {target}"
+                  for name, target in candidate_indexes.items()}
+    if compact:
+        statements = {name: compact_index(ddl) for name, ddl in statements.items()}
+    workload = registered_queries()
+    before = profile(conn, workload, repeat)
+
+    conn.execute("BEGIN")
+    existing = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index'"
+    )}
+    for ddl in statements.values():
+        conn.execute(ddl)
+    conn.execute("ANALYZE")
+    after = profile(conn, workload, repeat)
+
+    used = sorted({index for stats in after.values() for index in stats['indexes']}
+                  & set(candidate_indexes))
+    unused = sorted(set(candidate_indexes) - set(used) - existing)
+    if apply:
+        for name in unused:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute("COMMIT")
+    else:
+        conn.execute("ROLLBACK")
+    conn.close()
+
+    if verbose:
+        print_report(before, after, used, unused, apply, statements)
+    return {'used': used, 'unused': unused}
+
+
+def print_report(before: dict, after: dict, used: list[str], unused: list[str],
+                 applied: bool, statements: dict[str, str]) -> None:
+    print(f"{'Query':<26} {'Scans':>9} {'Before ms':>11} {'After ms':>10} {'Speedup':>8}")
+    print("-" * 68)
+    for name in before:
+        old, new = before[name], after[name]
+        speedup = old['seconds'] / new['seconds'] if new['seconds'] else float('inf')
+        print(f"{name:<26} {len(old['scans']):>4} -> {len(new['scans']):<2} "
+              f"{old['seconds'] * 1000:>10.2f} {new['seconds'] * 1000:>10.2f} {speedup:>7.1f}x")
+        for step in new['scans']:
+            print(f"    still scanning: {step}")
+
+    print("\nRecommended indexes (used by at least one query plan):")
+    for name in used:
+        print(f"  {statements[name].replace(' IF NOT EXISTS', '')};")
+    if unused:
+        print(f"Not picked by the planner: {', '.join(unused)}")
+    print("\n✅ Applied and ANALYZEd." if applied else "\nDry run - rerun with --apply to keep them.")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Suggest indexes for the registered queries")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to analyse")
+    parser.add_argument('--apply', action='store_true',
+                        help="Keep the indexes the planner uses and run ANALYZE")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per query")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    advise(args.db, args.apply, args.repeat)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - real log ingester
+Streams dmesg / journalctl -k text into the same six-table schema the generator builds,
+so every challenge query can be pointed at logs from a real machine.
+
+Usage (from the repository root):
+    python3 -m helper_utils.ingest_dmesg dmesg.txt --db kernel_logs.db
+    python3 -m helper_utils.ingest_dmesg /var/log/kern.log --follow
+    dmesg -x | python3 -m helper_utils.ingest_dmesg -
+
+Supported line formats (an optional '<N>' priority prefix or 'kern  :err   : ' facility/level
+prefix from 'dmesg -x' is accepted on any of them):
+    [   12.345678] message                   dmesg, seconds since boot
+    [Mon Jan 15 10:00:00 2024] message        dmesg -T
+    2024-01-15T10:00:00+0000 host kernel: msg journalctl -k -o short-iso
+    Jan 15 10:00:00 host kernel: message      syslog / journalctl -k
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from datetime import datetime
+
+from helper_utils.generate_ctf_db import (
+    create_indexes, insert_columns, insert_sql, record_high_water_marks, schema
+)
+
+# ============================================================================
+# LINE FORMATS
+# ============================================================================
+PREFIX = re.compile(r'^(?:<(?P<priority>\d)>)?(?:\w+\s*:(?P<level>\w+)\s*:\s*)?')
+MONOTONIC = re.compile(r'^\[\s*(?P<seconds>\d+\.\d+)\]\s?(?P<message>.*)$')
+CTIME = re.compile(r'^\[(?P<stamp>\w{3} \w{3} +\d+ \d\d:\d\d:\d\d \d{4})\]\s?(?P<message>.*)$')
+ISO = re.compile(
+    r'^(?P<stamp>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:[+-]\d{2}:?\d{2}|Z)?)'
+    r'\s+\S+\s+kernel:\s?(?P<message>.*)$'
+)
+SYSLOG = re.compile(
+    r'^(?P<stamp>\w{3} +\d+ \d\d:\d\d:\d\d)\s+\S+\s+kernel:\s?'
+    r'(?:\[\s*\d+\.\d+\]\s?)?(?P<message>.*)$'
+)
+
+# syslog priorities 0-7 and 'dmesg -x' level names onto the schema's log_level values
+PRIORITY_LEVELS = ['CRIT', 'CRIT', 'CRIT', 'ERROR', 'WARN', 'INFO', 'INFO', 'DEBUG']
+NAMED_LEVELS = {
+    'emerg': 'CRIT', 'alert': 'CRIT', 'crit': 'CRIT', 'err': 'ERROR',
+    'warn': 'WARN', 'notice': 'INFO', 'info': 'INFO', 'debug': 'DEBUG',
+}
+
+# ============================================================================
+# CLASSIFICATION PATTERNS - every line lands in boot_logs, these add detail rows
+# ============================================================================
+BOOT_START = re.compile(r'^Linux version ')
+CRITICAL_TEXT = re.compile(r'Kernel panic|\bBUG\b|\bOops\b|general protection fault|Call Trace')
+ERROR_TEXT = re.compile(
+    r'\b(?:error|fail(?:ed|ure)?|unable|timeout|timed out|unknown symbol)\b', re.I
+)
+WARN_TEXT = re.compile(r'\bwarn(?:ing)?\b|\btaint', re.I)
+
+MODULE_LOAD = re.compile(
+    r'^(?:(?P<module>\w+): loading out-of-tree module'
+    r'|(?:Loading|Loaded) module (?P<named>\w+)(?: at (?P<address>0x[0-9a-f]+))?)'
+)
+MODULE_UNLOAD = re.compile(r'^(?:Unloading module (?P<named>\w+)|(?P<module>\w+): module unloaded)')
+MODULE_FAILED = re.compile(
+    r'^(?:(?P<module>\w+): (?:Unknown symbol|disagrees about version|module verification failed)'
+    r'|(?:failed to load|could not insert) module (?P<named>\w+))'
+)
+TRACE_MODULE = re.compile(r'\[(?P<module>\w+)\]\s*$')
+ERROR_NUMBER = re.compile(r'\b(?:error|err|ret|returned|exit)[ =:]*(?P<code>-\d+)', re.I)
+AUDIT_SYSCALL = re.compile(
+    r'audit: type=1300 .*?\bsyscall=(?P<syscall>\w+).*?\bexit=(?P<exit>-?\d+)'
+    r'.*?\bcomm="(?P<comm>[^"]*)"'
+)
+DRIVER_LINE = re.compile(
+    r'^(?P<module>\w+) (?P<device_id>[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-7])'
+    r'(?::| (?P<name>(?:eth|wlan|wlp|enp|eno|sd|nvme|card|hci)\w*):)'
+    r' (?P<detail>.*(?:probe|init|registered|enabled|failed|error).*)$', re.I
+)
+PAGE_ALLOC_FAILURE = re.compile(r'^(?P<comm>\S+): page allocation failure: order:(?P<order>\d+)')
+VMALLOC_FAILURE = re.compile(r'^(?P<comm>\S+): vmalloc(?: error)?: size (?P<size>\d+)')
+OOM_KILL = re.compile(r'^Out of memory: Killed process \d+ \((?P<comm>[^)]*)\)')
+
+# First matching keyword wins; falls back to 'kernel' for anything unrecognised
+SUBSYSTEM_KEYWORDS = [
+    ('network', re.compile(r'\b(?:eth\d|wlan\d|enp\w+|wlp\w+|net\w*|iwlwifi|e1000e?|r8169|'
+                           r'nf_\w+|netfilter|ipv[46]|tcp|udp)\b', re.I)),
+    ('audio', re.compile(r'\b(?:snd\w*|audio|hda\w*|alsa)\b', re.I)),
+    ('video', re.compile(r'\b(?:drm|i915|amdgpu|radeon|nouveau|nvidia\w*|fb\d?|uvcvideo)\b', re.I)),
+    ('usb', re.compile(r'\b(?:usb\w*|xhci\w*|ehci\w*|hub)\b', re.I)),
+    ('pci', re.compile(r'\b(?:pci\w*|acpi)\b', re.I)),
+    ('disk', re.compile(r'\b(?:ata\d*|sd[a-z]\d*|nvme\w*|scsi|ext4|xfs|btrfs|dm-\d+|md\d+)\b', re.I)),
+    ('memory', re.compile(r'\b(?:memory|oom|page allocation|vmalloc|slab|swap)\b', re.I)),
+    ('cpu', re.compile(r'\b(?:cpu\d*|smp|microcode|mce|thermal)\b', re.I)),
+]
+
+
+def detect_subsystem(message: str) -> str:
+    for subsystem, pattern in SUBSYSTEM_KEYWORDS:
+        if pattern.search(message):
+            return subsystem
+    return 'kernel'
+
+
+def detect_level(message: str, priority: str | None, level: str | None) -> str:
+    if priority is not None:
+        return PRIORITY_LEVELS[int(priority)]
+    if level is not None and level.lower() in NAMED_LEVELS:
+        return NAMED_LEVELS[level.lower()]
+    if CRITICAL_TEXT.search(message):
+        return 'CRIT'
+    if ERROR_TEXT.search(message):
+        return 'ERROR'
+    if WARN_TEXT.search(message):
+        return 'WARN'
+    return 'INFO'
+
+
+def parse_line(line: str, year: int, boot_time: float) -> tuple[float, bool, str, str] | None:
+    """
+    Split a raw log line into (timestamp, is_monotonic, log_level, message).
+    Monotonic dmesg stamps are offset by 'boot_time'; returns None for unparseable lines.
+    """
+    prefix = PREFIX.match(line)
+    priority, level = prefix.group('priority'), prefix.group('level')
+    body = line[prefix.end():]
+
+    if match := MONOTONIC.match(body):
+        timestamp, monotonic = boot_time + float(match.group('seconds')), True
+    elif match := CTIME.match(body):
+        stamp = datetime.strptime(match.group('stamp'), '%a %b %d %H:%M:%S %Y')
+        timestamp, monotonic = stamp.timestamp(), False
+    elif match := ISO.match(body):
+        timestamp, monotonic = datetime.fromisoformat(match.group('stamp')).timestamp(), False
+    elif match := SYSLOG.match(body):
+        stamp = datetime.strptime(f"{year} {match.group('stamp')}", '%Y %b %d %H:%M:%S')
+        timestamp, monotonic = stamp.timestamp(), False
+    else:
+        return None
+    message = match.group('message').strip()
+    return timestamp, monotonic, detect_level(message, priority, level), message
+
+
+def classify(timestamp: float, log_level: str, message: str,
+             boot_session: int) -> list[tuple[str, tuple]]:
+    """Map one parsed line onto insert rows, always including its boot_logs row."""
+    subsystem = detect_subsystem(message)
+    rows = [('boot_logs', (timestamp, log_level, subsystem, message, boot_session))]
+    trace = TRACE_MODULE.search(message)
+    culprit = trace.group('module') if trace else None
+
+    for pattern, action, status in ((MODULE_FAILED, 'LOAD', 'FAILED'),
+                                    (MODULE_LOAD, 'LOAD', 'SUCCESS'),
+                                    (MODULE_UNLOAD, 'UNLOAD', 'SUCCESS')):
+        if match := pattern.match(message):
+            module_name = match.group('module') or match.group('named')
+            address = match.groupdict().get('address')
+            rows.append(('module_events',
+                         (timestamp, module_name, action, status, address, boot_session)))
+            culprit = culprit or module_name
+            break
+
+    if match := AUDIT_SYSCALL.search(message):
+        rows.append(('system_calls', (timestamp, match.group('syscall'),
+                                      int(match.group('exit')), culprit, match.group('comm'))))
+    elif match := DRIVER_LINE.match(message):
+        failed = ERROR_TEXT.search(match.group('detail')) is not None
+        rows.append(('device_drivers', (
+            timestamp, match.group('name') or match.group('module'), match.group('device_id'),
+            'FAILED' if failed else 'SUCCESS', match.group('module'),
+        )))
+        culprit = culprit or match.group('module')
+
+    if match := PAGE_ALLOC_FAILURE.match(message):
+        rows.append(('memory_events', (timestamp, 'ALLOC', 4096 << int(match.group('order')),
+                                       culprit or match.group('comm'), False)))
+    elif match := VMALLOC_FAILURE.match(message):
+        rows.append(('memory_events', (timestamp, 'ALLOC', int(match.group('size')),
+                                       culprit or match.group('comm'), False)))
+    elif match := OOM_KILL.match(message):
+        rows.append(('memory_events', (timestamp, 'OOM', None,
+                                       culprit or match.group('comm'), False)))
+
+    if log_level in ('CRIT', 'ERROR'):
+        number = ERROR_NUMBER.search(message)
+        error_code = f"ERR_{abs(int(number.group('code')))}" if number else 'ERR_KERNEL'
+        severity = 'CRITICAL' if log_level == 'CRIT' else 'HIGH'
+        rows.append(('error_codes',
+                     (timestamp, error_code, severity, subsystem, culprit, message)))
+    return rows
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+def open_log(path: str):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, errors='replace')
+
+
+def read_lines(path: str):
+    """Yield the lines of one log (or stdin), closing the file once it is read."""
+    if path == '-':
+        yield from sys.stdin
+        return
+    with open_log(path) as handle:
+        yield from handle
+
+
+def follow_lines(path: str, poll_interval: float = 0.5):
+    """
+    Yield lines forever like 'tail -F', reopening the file if it is truncated or rotated.
+    Every poll that finds nothing new yields None, so the caller can act on its timers
+    while the file is quiet.
+    """
+    handle = open_log(path)
+    try:
+        inode = os.fstat(handle.fileno()).st_ino
+        while True:
+            line = handle.readline()
+            if line:
+                yield line
+                continue
+            time.sleep(poll_interval)
+            yield None
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Mid-rotation
+            if stat.st_ino != inode or stat.st_size < handle.tell():
+                handle.close()
+                handle = open_log(path)
+                inode = os.fstat(handle.fileno()).st_ino
+    finally:
+        handle.close()
+
+
+def ensure_schema(cursor: sqlite3.Cursor) -> None:
+    """Create whichever of the six tables are missing; existing data is left alone."""
+    existing = {name for (name,) in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"  # Views: compact layout
+    )}
+    for table, ddl in schema.items():
+        if table not in existing:
+            cursor.execute(ddl)
+    create_indexes(cursor)
+
+
+def ingest(paths: list[str], db_path: str = 'kernel_logs.db', batch_size: int = 50000,
+           follow: bool = False, year: int | None = None, boot_time: float = 0.0,
+           report_every: float = 10.0, poll_interval: float = 0.5) -> dict[str, int]:
+    """
+    Stream log lines from each path into 'db_path' and return {table: rows inserted}.
+    Memory is bounded by one batch per table: rows are flushed with executemany and
+    committed whenever the buffered line count reaches 'batch_size'. Boot sessions are
+    numbered on from the database's latest one and advance at every 'Linux version'
+    banner or whenever dmesg's seconds-since-boot counter goes backwards. With 'follow'
+    the last path is tailed until interrupted, and its buffered rows are also committed
+    every 'report_every' seconds - while the log is idle too.
+    """
+    year = year or datetime.now().year
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    ensure_schema(cursor)
+    conn.commit()
+    (latest,) = cursor.execute("SELECT MAX(boot_session) FROM boot_logs").fetchone()
+    start_session = boot_session = latest or 0
+    session_lines = 0
+    statements = {table: insert_sql(table) for table in insert_columns}
+
+    buffers = {table: [] for table in schema}
+    inserted = {table: 0 for table in schema}
+    lines = skipped = 0
+    buffered = 0
+    last_seconds = None
+    started = last_report = time.perf_counter()
+
+    def flush():
+        for table, rows in buffers.items():
+            if rows:
+                cursor.executemany(statements[table], rows)
+                inserted[table] += len(rows)
+                rows.clear()
+        conn.commit()
+
+    def on_timer(tail: bool):
+        nonlocal buffered, last_report
+        if time.perf_counter() - last_report < report_every:
+            return
+        report()
+        last_report = time.perf_counter()
+        if tail:
+            flush()  # A slow trickle, or an idle log, still reaches the database
+            buffered = 0
+
+    def report(final: bool = False):
+        elapsed = time.perf_counter() - started
+        rate = lines / elapsed if elapsed > 0 else 0.0
+        label = "Ingested" if final else "..."
+        print(f"{label} {lines:,} lines ({skipped:,} unparsed) in {elapsed:.1f}s - "
+              f"{rate:,.0f} lines/sec", file=sys.stderr)
+
+    try:
+        for index, path in enumerate(paths):
+            tail = follow and index == len(paths) - 1 and path != '-'
+            source = follow_lines(path, poll_interval) if tail else read_lines(path)
+            with closing(source):
+                for line in source:
+                    if line is None:  # follow_lines' idle tick
+                        on_timer(tail)
+                        continue
+                    lines += 1
+                    parsed = parse_line(line.rstrip('\n'), year, boot_time)
+                    if parsed is None:
+                        skipped += 1
+                        continue
+                    timestamp, monotonic, log_level, message = parsed
+                    seconds = timestamp - boot_time if monotonic else None
+                    rebooted = seconds is not None and last_seconds is not None and \
+                        seconds < last_seconds
+                    banner = session_lines > 0 and BOOT_START.match(message) is not None
+                    if session_lines == 0 and boot_session == start_session or rebooted or banner:
+                        boot_session += 1
+                        session_lines = 0
+                    session_lines += 1
+                    last_seconds = seconds
+
+                    for table, row in classify(timestamp, log_level, message, boot_session):
+                        buffers[table].append(row)
+                    buffered += 1
+                    if buffered >= batch_size:
+                        flush()
+                        buffered = 0
+                    on_timer(tail)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        flush()
+        record_high_water_marks(cursor)
+        conn.commit()
+        conn.close()
+        report(final=True)
+    return inserted
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream dmesg/journal text into the CTF schema")
+    parser.add_argument('paths', nargs='+', help="Log files to ingest ('-' for stdin, .gz ok)")
+    parser.add_argument('--db', default='kernel_logs.db', help="Target database path")
+    parser.add_argument('--batch-size', type=int, default=50000,
+                        help="Lines buffered per executemany/commit")
+    parser.add_argument('--follow', '-f', action='store_true',
+                        help="Keep tailing the last file as it grows")
+    parser.add_argument('--year', type=int, default=None,
+                        help="Year for syslog-style stamps that omit it (default: current)")
+    parser.add_argument('--boot-time', type=float, default=0.0,
+                        help="Epoch seconds added to dmesg's seconds-since-boot stamps")
+    parser.add_argument('--report-every', type=float, default=10.0,
+                        help="Seconds between throughput reports")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    inserted = ingest(args.paths, args.db, args.batch_size, args.follow, args.year,
+                      args.boot_time, args.report_every)
+    print(f"{'Table':<16} {'Rows':>12}")
+    print("-" * 29)
+    for table, rows in inserted.items():
+        print(f"{table:<16} {rows:>12,}")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - per-module condition bitmap index
+Keeps one row per module in a module_flags table: a bitset of the suspicious conditions the
+module has shown in any table, plus how many rows showed each one. "Which modules satisfy
+A in table X and B in table Y" then becomes 'flags & mask = mask' over one row per module,
+instead of an INNER JOIN whose row fan-out has to be undone with COUNT(DISTINCT ...).
+
+    from helper_utils.module_flags import flag_queries, suspects
+
+    suspects(conn, 'failed_loads', 'critical_errors', 'failed_allocs')   # ['corrupted_...']
+    conn.execute(flag_queries['3.1']).fetchall()                         # tier 3.1's rows
+
+The index is a rollup.Rollup like module_risk.py: built with one GROUP BY pass per source
+table and kept current one of two ways:
+    triggers - AFTER INSERT triggers set bits and bump counts as rows arrive (in the
+               compact layout they go on the _data tables)
+    batch    - refresh() folds in rows past each table's rowid high-water mark
+               (generate_ctf_db.py --append calls it when the index is installed)
+
+Usage (from the repository root):
+    python3 -m helper_utils.module_flags --install --triggers
+    python3 -m helper_utils.module_flags failed_loads critical_errors failed_allocs
+    python3 -m helper_utils.module_flags --tier 4.2
+    python3 -m helper_utils.module_flags --refresh
+"""
+
+import argparse
+import sqlite3
+
+from helper_utils.rollup import Rollup
+
+# Per source table: the module column and the conditions it sets, as 0/1 expressions
+flag_sources = {
+    'module_events': ('module_name', {
+        'failed_loads': "CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END",
+    }),
+    'error_codes': ('affected_module', {
+        'critical_errors': "CASE WHEN severity = 'CRITICAL' THEN 1 ELSE 0 END",
+        'high_errors': "CASE WHEN severity = 'HIGH' THEN 1 ELSE 0 END",
+        'network_errors': "CASE WHEN subsystem = 'network' THEN 1 ELSE 0 END",
+    }),
+    'memory_events': ('requesting_module', {
+        'failed_allocs': "CASE WHEN allocation_success = 0 THEN 1 ELSE 0 END",
+    }),
+    'device_drivers': ('parent_module', {
+        'net_init_failures': "CASE WHEN initialization_status = 'FAILED' "
+                             "AND driver_name IN ('eth0', 'wlan0') THEN 1 ELSE 0 END",
+    }),
+    'system_calls': ('caller_module', {
+        'syscall_failures': "CASE WHEN return_code < 0 THEN 1 ELSE 0 END",
+    }),
+}
+
+conditions = [name for _, columns in flag_sources.values() for name in columns]
+flag_bits = {name: 1 << bit for bit, name in enumerate(conditions)}
+
+
+def mask(*names: str) -> int:
+    """The bits of the named conditions, OR-ed together."""
+    unknown = set(names) - set(flag_bits)
+    if unknown:
+        raise ValueError(f"Unknown condition(s) {sorted(unknown)}; choose from {conditions}")
+    bits = 0
+    for name in names:
+        bits |= flag_bits[name]
+    return bits
+
+
+# The join-based tier queries in helper_utils/solutions.py, answered from the index
+flag_queries = {
+    '2.2': f"""
+    SELECT module_name
+    FROM module_flags
+    WHERE flags & {mask('failed_loads')} != 0
+        AND flags & {mask('critical_errors', 'high_errors')} != 0
+    ORDER BY module_name
+""",
+    '3.1': f"""
+    SELECT
+        module_name,
+        failed_loads,
+        critical_errors,
+        failed_allocs AS memory_failures
+    FROM module_flags
+    WHERE flags & {mask('failed_loads', 'critical_errors', 'failed_allocs')}
+        = {mask('failed_loads', 'critical_errors', 'failed_allocs')}
+    ORDER BY (failed_loads + critical_errors + failed_allocs) DESC
+""",
+    '4.2': f"""
+    SELECT module_name AS parent_module
+    FROM module_flags
+    WHERE flags & {mask('net_init_failures', 'network_errors')}
+        = {mask('net_init_failures', 'network_errors')}
+        AND net_init_failures >= 2
+    ORDER BY module_name
+""",
+}
+
+
+def _flags(expressions) -> str:
+    """SQL for the bitset of a group of 0/1 condition expressions."""
+    return ' | '.join(f"(({expression}) > 0) * {flag_bits[name]}"
+                      for name, expression in expressions.items())
+
+
+class FlagRollup(Rollup):
+    """The condition counts, plus a 'flags' column OR-ing together the bits they set."""
+
+    extra_columns = ('flags',)
+
+    def values(self, expressions: dict[str, str]) -> dict[str, str]:
+        return {**expressions, 'flags': _flags(expressions)}
+
+    def merge(self, column: str) -> str:
+        if column == 'flags':
+            return "flags = flags | excluded.flags"
+        return super().merge(column)
+
+
+rollup = FlagRollup('module_flags', flag_sources, row_columns=(
+    'status', 'severity', 'subsystem', 'allocation_success', 'initialization_status',
+    'driver_name', 'return_code',
+))
+install, drop, refresh = rollup.install, rollup.drop, rollup.refresh
+is_installed = rollup.is_installed
+
+
+def suspects(conn: sqlite3.Connection, *names: str) -> list[str]:
+    """Modules showing every one of the named conditions, in name order."""
+    bits = mask(*names)
+    return [module for (module,) in conn.execute(
+        "SELECT module_name FROM module_flags WHERE flags & ? = ? ORDER BY module_name",
+        (bits, bits)
+    )]
+
+
+def counts(conn: sqlite3.Connection, *names: str) -> list[tuple]:
+    """(module_name, count per named condition...) for the modules showing all of them."""
+    bits = mask(*names)
+    return conn.execute(
+        f"SELECT module_name, {', '.join(names)} FROM module_flags "
+        f"WHERE flags & ? = ? ORDER BY module_name", (bits, bits)
+    ).fetchall()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-module condition bitmap index")
+    parser.add_argument('conditions', nargs='*', choices=conditions, metavar='CONDITION',
+                        help=f"Show modules with all of these: {', '.join(conditions)}")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to use")
+    parser.add_argument('--install', action='store_true', help="(Re)build the index")
+    parser.add_argument('--triggers', action='store_true',
+                        help="With --install, keep it current with insert triggers")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Fold in rows past the high-water marks")
+    parser.add_argument('--drop', action='store_true', help="Remove the index and triggers")
+    parser.add_argument('--tier', choices=flag_queries, default=None,
+                        help="Answer a join-based tier query from the index")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.drop:
+            with conn:
+                drop(conn)
+            print("Dropped module_flags.")
+            return
+        if args.install:
+            install(conn, args.triggers)
+        if args.refresh:
+            for table, rows in refresh(conn).items():
+                print(f"  {table:<16} +{rows:,} rows")
+        if not is_installed(conn):
+            print("❌ module_flags is not installed - run with --install first")
+            return
+        if args.tier:
+            for row in conn.execute(flag_queries[args.tier]):
+                print("  ".join(str(value) for value in row))
+        if args.conditions:
+            print(f"{'Module':<25} " + " ".join(f"{name:>17}" for name in args.conditions))
+            for module, *values in counts(conn, *args.conditions):
+                print(f"{module:<25} " + " ".join(f"{value:>17,}" for value in values))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
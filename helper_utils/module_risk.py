@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - materialized module risk rollup
+Keeps the per-module counters behind the tier 5.2 "smoking gun" CTE in a small
+module_risk table, so the danger score and top-k are read from one row per module
+instead of re-aggregating all five fact tables on every poll.
+
+Built and kept current by rollup.Rollup, one of two ways:
+    triggers - AFTER INSERT triggers bump the counters as rows arrive (in the compact
+               layout they go on the _data tables)
+    batch    - refresh() folds in rows past each table's rowid high-water mark
+
+Usage (from the repository root):
+    python3 -m helper_utils.module_risk --install --triggers   # build + keep live
+    python3 -m helper_utils.module_risk --install             # build for batch refresh
+    python3 -m helper_utils.module_risk --refresh --top 5
+    python3 -m helper_utils.module_risk                       # tier 5.2 from the rollup
+"""
+
+import argparse
+import sqlite3
+
+from helper_utils.rollup import Rollup
+
+# Per source table: the module column and the counters it feeds, as 0/1 expressions
+risk_sources = {
+    'module_events': ('module_name', {
+        'failed_loads': "CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END",
+    }),
+    'error_codes': ('affected_module', {
+        'critical_errors': "CASE WHEN severity = 'CRITICAL' THEN 1 ELSE 0 END",
+    }),
+    'memory_events': ('requesting_module', {
+        'total_allocs': "1",
+        'failed_allocs': "CASE WHEN allocation_success = 0 THEN 1 ELSE 0 END",
+    }),
+    'device_drivers': ('parent_module', {
+        'net_init_failures': "CASE WHEN initialization_status = 'FAILED' "
+                             "AND driver_name IN ('eth0', 'wlan0') THEN 1 ELSE 0 END",
+    }),
+    'system_calls': ('caller_module', {
+        'syscall_failures': "CASE WHEN return_code < 0 THEN 1 ELSE 0 END",
+    }),
+}
+
+rollup = Rollup('module_risk', risk_sources, row_columns=(
+    'status', 'severity', 'allocation_success', 'initialization_status', 'driver_name',
+    'return_code',
+))
+counters = rollup.counters
+install, drop, refresh = rollup.install, rollup.drop, rollup.refresh
+
+# Same weights and rounding as the tier 5.2 query in helper_utils/solutions.py
+danger_score = (
+    "(failed_loads * 3 + critical_errors * 5 + net_init_failures * 4 + syscall_failures * 1)"
+)
+mem_failure_pct = (
+    "COALESCE(ROUND(CAST(failed_allocs AS REAL) / total_allocs * 100, 2), 0)"
+)
+
+smoking_gun_query = f"""
+    SELECT
+        module_name,
+        failed_loads,
+        critical_errors,
+        {mem_failure_pct} AS mem_failure_pct,
+        net_init_failures AS network_failures,
+        syscall_failures,
+        {danger_score} AS danger_score
+    FROM module_risk
+    WHERE failed_loads >= 3
+        AND critical_errors >= 2
+        AND {mem_failure_pct} > 35
+    ORDER BY danger_score DESC
+"""
+
+top_k_query = f"""
+    SELECT module_name, {danger_score} AS danger_score, {mem_failure_pct} AS mem_failure_pct
+    FROM module_risk
+    ORDER BY danger_score DESC, module_name
+    LIMIT ?
+"""
+
+
+def smoking_gun(conn: sqlite3.Connection) -> list[tuple]:
+    """Tier 5.2's result rows, answered from the rollup in O(modules)."""
+    return conn.execute(smoking_gun_query).fetchall()
+
+
+def top_k(conn: sqlite3.Connection, k: int = 5) -> list[tuple]:
+    """The k most dangerous modules as (module_name, danger_score, mem_failure_pct)."""
+    return conn.execute(top_k_query, (k,)).fetchall()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Materialized per-module risk rollup")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to use")
+    parser.add_argument('--install', action='store_true', help="(Re)build the rollup")
+    parser.add_argument('--triggers', action='store_true',
+                        help="With --install, keep it current with insert triggers")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Fold in rows past the high-water marks")
+    parser.add_argument('--drop', action='store_true', help="Remove the rollup and triggers")
+    parser.add_argument('--top', type=int, default=None, help="Show the top-k danger scores")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    if args.drop:
+        with conn:
+            drop(conn)
+        print("Dropped module_risk.")
+    else:
+        if args.install:
+            install(conn, args.triggers)
+        if args.refresh:
+            for table, rows in refresh(conn).items():
+                print(f"  {table:<16} +{rows:,} rows")
+        if args.top:
+            print(f"{'Module':<25} {'SCORE':>10} {'Mem%':>7}")
+            for module, score, pct in top_k(conn, args.top):
+                print(f"{module:<25} {score:>10} {pct:>6.1f}%")
+        else:
+            print(f"{'Module':<25} {'Failed':>7} {'Crit':>7} {'Mem%':>7} {'Net':>7} {'Sys':>7} {'SCORE':>10}")
+            for module, loads, errs, mem_pct, net, sys, score in smoking_gun(conn):
+                print(f"{module:<25} {loads:>7} {errs:>7} {mem_pct:>6.1f}% {net:>7} {sys:>7} {score:>10}")
+    conn.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - per-query profiling
+Opt-in instrumentation for both run_query implementations (helper_utils/query_starter.py and
+solutions/my_solutions.py). While tracing is on, every execution appends one JSON line with
+its wall time, SQLite VM steps, rows fetched, the split between SQLite and pandas, and the
+EXPLAIN QUERY PLAN tree. Nothing is recorded, and nothing is slowed down, while it is off.
+
+Turn it on with an environment variable, or from code:
+    CTF_QUERY_TRACE=query_trace.jsonl python3 main.py
+
+    from helper_utils import query_profiler
+    query_profiler.enable('query_trace.jsonl')
+
+Summarize a trace, slowest queries first (from the repository root):
+    python3 -m helper_utils.query_profiler query_trace.jsonl
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Callable
+
+# The progress handler fires every STEP_INTERVAL VM instructions, so vm_steps is exact
+# to within that many; smaller values cost more per query while tracing
+STEP_INTERVAL = 100
+
+_trace_path = os.environ.get('CTF_QUERY_TRACE') or None
+_write_lock = threading.Lock()
+
+
+def enable(path: str = 'query_trace.jsonl') -> None:
+    global _trace_path
+    _trace_path = path
+
+
+def disable() -> None:
+    global _trace_path
+    _trace_path = None
+
+
+def enabled() -> bool:
+    return _trace_path is not None
+
+
+def plan_tree(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list[dict]:
+    """EXPLAIN QUERY PLAN as nested {'detail': ..., 'children': [...]} nodes."""
+    nodes = {0: {'children': []}}
+    for node_id, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+        nodes[node_id] = {'detail': detail, 'children': []}
+        nodes.get(parent, nodes[0])['children'].append(nodes[node_id])
+    return nodes[0]['children']
+
+
+class QueryProfile:
+    """
+    Context manager around one query execution on 'conn'. Call fetched(rows) once SQLite is
+    done (rows fetched); anything after that until exit is counted as pandas/conversion time.
+    When tracing is off, 'active' is False and the profile does nothing.
+
+    SQLite keeps one progress handler per connection and sqlite3 can't read it back, so a
+    caller that has its own (e.g. benchmark.py's timeout) passes it as 'progress_handler'
+    (handler, n): it is still called about every n steps, its non-zero return still aborts
+    the query, and it is put back on exit instead of being cleared.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, name: str, sql: str, params: tuple = (),
+                 source: str = '',
+                 progress_handler: tuple[Callable[[], int], int] | None = None):
+        self.conn = conn
+        self.name = name
+        self.sql = sql
+        self.params = tuple(params)
+        self.source = source
+        self.progress_handler = progress_handler
+        self.active = enabled()
+        self.ticks = 0
+        self.rows = None
+        self._sqlite_done = None
+
+    def _tick(self) -> int:
+        self.ticks += 1
+        if self.progress_handler is not None:
+            handler, n = self.progress_handler
+            if self.ticks % max(1, n // STEP_INTERVAL) == 0:
+                return handler()
+        return 0  # Non-zero would abort the query
+
+    def fetched(self, rows: int) -> None:
+        self.rows = rows
+        self._sqlite_done = time.perf_counter()
+
+    def __enter__(self) -> 'QueryProfile':
+        if self.active:
+            self.conn.set_progress_handler(self._tick, STEP_INTERVAL)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self.active:
+            return
+        end = time.perf_counter()
+        self.conn.set_progress_handler(*(self.progress_handler or (None, 0)))
+        sqlite_done = self._sqlite_done or end
+        try:
+            plan = plan_tree(self.conn, self.sql, self.params)
+        except sqlite3.Error:
+            plan = None
+        record = {
+            'ts': time.time(),
+            'source': self.source,
+            'name': self.name,
+            'sql': ' '.join(self.sql.split()),
+            'params': [repr(p) for p in self.params],
+            'wall_ms': (end - self._start) * 1000,
+            'sqlite_ms': (sqlite_done - self._start) * 1000,
+            'pandas_ms': (end - sqlite_done) * 1000,
+            'vm_steps': self.ticks * STEP_INTERVAL,
+            'rows': self.rows,
+            'plan': plan,
+            'error': f"{exc_type.__name__}: {exc}" if exc_type else None,
+        }
+        path = _trace_path
+        if path is None:
+            return
+        with _write_lock, open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def summarize(path: str) -> list[dict]:
+    """Per (source, name): executions, total/mean/max wall ms and mean VM steps, hottest first."""
+    grouped = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            grouped[(record['source'], record['name'])].append(record)
+    summary = []
+    for (source, name), records in grouped.items():
+        walls = [r['wall_ms'] for r in records]
+        summary.append({
+            'source': source,
+            'name': name,
+            'runs': len(records),
+            'total_ms': sum(walls),
+            'mean_ms': sum(walls) / len(walls),
+            'max_ms': max(walls),
+            'mean_vm_steps': sum(r['vm_steps'] for r in records) / len(records),
+            'pandas_share': sum(r['pandas_ms'] for r in records) / sum(walls) if sum(walls) else 0.0,
+        })
+    return sorted(summary, key=lambda s: s['total_ms'], reverse=True)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize a query trace, hottest first")
+    parser.add_argument('trace', nargs='?', default='query_trace.jsonl', help="JSONL trace file")
+    parser.add_argument('--top', type=int, default=20, help="How many queries to show")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"{'Source':<14} {'Query':<40} {'Runs':>5} {'Total ms':>10} {'Mean ms':>9} "
+          f"{'Max ms':>9} {'VM steps':>12} {'pandas':>7}")
+    print("-" * 113)
+    for s in summarize(args.trace)[:args.top]:
+        name = s['name'] if len(s['name']) <= 40 else s['name'][:37] + '...'
+        print(f"{s['source']:<14} {name:<40} {s['runs']:>5} {s['total_ms']:>10.2f} "
+              f"{s['mean_ms']:>9.2f} {s['max_ms']:>9.2f} {s['mean_vm_steps']:>12,.0f} "
+              f"{s['pandas_share']:>6.0%}")
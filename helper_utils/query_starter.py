@@ -2,20 +2,33 @@
 """
 SQL CTF: Query Starter Template
 Use this template to start working on the challenges
+Run from the repository root: python3 -m helper_utils.query_starter
 """
 
 import sqlite3
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+
+from helper_utils.connection_pool import get_pool
+from helper_utils.query_profiler import QueryProfile
+from helper_utils.result_printer import render
+from helper_utils.snapshot import get_snapshot
+from helper_utils.solutions import tier_queries
 
 # ============================================================================
 # DATABASE CONNECTION
 # ============================================================================
-def get_connection(db_path: str = 'kernel_logs.db') -> sqlite3.Connection:
-    """Create and return a database connection."""
-    conn = sqlite3.connect(db_path)
-    # Enable foreign keys if needed
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+def get_connection(db_path: str = 'kernel_logs.db', snapshot: bool = False) -> sqlite3.Connection:
+    """
+    Check out a connection from the shared pool (foreign keys and other PRAGMAs are
+    already applied). Calling close() on it returns it to the pool. A thread that already
+    holds a pooled connection gets that same connection (and its open transaction) back.
+
+    With snapshot=True the connection reads an in-memory copy of the database, reloaded
+    whenever the file changes (read-only - see helper_utils/snapshot.py).
+    """
+    if snapshot:
+        return get_snapshot(db_path).checkout()
+    return get_pool(db_path).checkout()
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -30,41 +43,28 @@ def run_query(query: str, params: tuple = ()) -> List[Tuple]:
     
     Returns:
         List of result tuples
+
+    Set CTF_QUERY_TRACE to a file path to profile each call (see query_profiler.py).
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
+    with get_pool().connection() as conn:
+        with QueryProfile(conn, ' '.join(query.split()), query, params,
+                          source='query_starter') as profile:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+            profile.fetched(len(results))
     return results
 
-def print_results(results: List[Tuple], headers: List[str] = None):
+def print_results(results: Iterable[Tuple], headers: List[str] = None, **options):
     """
     Pretty print query results.
     
     Args:
-        results: List of result tuples
-        headers: Optional column headers
+        results: Result tuples - a list, or a cursor to print rows as they are fetched
+        headers: Optional column headers (default: a cursor's column names)
+        options: fmt='tsv'/'jsonl', max_width, widen, page, pause... (see result_printer.py)
     """
-    if not results:
-        print("No results found.")
-        return
-    
-    # Calculate column widths
-    col_widths = [max(len(str(val)) for val in col) for col in zip(*results)]
-    
-    if headers:
-        col_widths = [max(w, len(h)) for w, h in zip(col_widths, headers)]
-        # Print headers
-        header_row = " | ".join(h.ljust(w) for h, w in zip(headers, col_widths))
-        print(header_row)
-        print("-" * len(header_row))
-    
-    # Print rows
-    for row in results:
-        print(" | ".join(str(val).ljust(w) for val, w in zip(row, col_widths)))
-    
-    print(f"\n({len(results)} rows)")
+    render(results, headers, **options)
 
 # ============================================================================
 # EXPLORATION QUERIES
@@ -75,8 +75,8 @@ def explore_schema():
     print("DATABASE SCHEMA")
     print("=" * 70)
     
-    # Get all tables
-    tables = run_query("SELECT name FROM sqlite_master WHERE type='table'")
+    # Get all tables, less FTS5 indexes and other bookkeeping
+    tables = run_query(tier_queries['1.1'])
     
     for (table_name,) in tables:
         print(f"\n📊 Table: {table_name}")
@@ -98,16 +98,11 @@ def sample_data(table_name: str, limit: int = 5):
     """Show sample data from a table."""
     print(f"\n📋 Sample data from {table_name}:")
     print("=" * 70)
-    results = run_query(f"SELECT * FROM {table_name} LIMIT {limit}")
-    
-    # Get column names
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT * FROM {table_name} LIMIT 0")
-    headers = [desc[0] for desc in cursor.description]
-    conn.close()
-    
-    print_results(results, headers)
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit}")
+        # Rows and column names stream from the same cursor - no fetchall, no second trip
+        print_results(cursor)
 
 # ============================================================================
 # YOUR CHALLENGE QUERIES GO HERE
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - streaming result printer
+Prints query results straight from a cursor (or any iterable of rows) without fetching
+them all first. Table output sizes its columns from a leading sample of rows; rows are
+written a page at a time, so memory stays at one sample plus one page however long the
+result is. TSV and JSONL output is for piping into other tools.
+
+    from helper_utils.result_printer import render
+
+    cursor = conn.execute("SELECT * FROM boot_logs")
+    render(cursor)                      # headers come from cursor.description
+    render(cursor, fmt='jsonl')         # one JSON object per row
+
+Usage (from the repository root):
+    python3 -m helper_utils.result_printer "SELECT * FROM module_events" --pause
+    python3 -m helper_utils.result_printer "SELECT * FROM boot_logs" --format tsv | cut -f4
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from itertools import chain, islice
+from typing import Iterable, TextIO
+
+formats = ('table', 'tsv', 'jsonl')
+
+TRUNCATED = '…'
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _headers(rows, headers: list[str] | None) -> list[str] | None:
+    if headers is None and getattr(rows, 'description', None):
+        return [column[0] for column in rows.description]
+    return headers
+
+
+def _fit(text: str, width: int) -> str:
+    return text if len(text) <= width else text[:width - 1] + TRUNCATED
+
+
+def _table_lines(rows: Iterable[tuple], headers: list[str] | None, sample: int,
+                 max_width: int | None, widen: bool):
+    """Yield the table's lines, sizing columns from the first 'sample' rows."""
+    rows = iter(rows)
+    leading = list(islice(rows, sample))
+    if not leading:
+        return
+    columns = len(headers) if headers else len(leading[0])
+    widths = [len(h) for h in headers] if headers else [0] * columns
+    for row in leading:
+        widths = [max(w, len(str(value))) for w, value in zip(widths, row)]
+    if max_width:
+        widths = [min(w, max_width) for w in widths]
+
+    if headers:
+        header_row = " | ".join(_fit(h, w).ljust(w) for h, w in zip(headers, widths))
+        yield header_row
+        yield "-" * len(header_row)
+    for row in chain(leading, rows):
+        cells = []
+        for i, value in enumerate(row):
+            text = str(value)
+            if len(text) > widths[i]:
+                if widen:
+                    widths[i] = len(text)  # This and later rows; earlier ones keep theirs
+                else:
+                    text = _fit(text, widths[i])
+            cells.append(text.ljust(widths[i]))
+        yield " | ".join(cells)
+
+
+def _tsv_lines(rows: Iterable[tuple], headers: list[str] | None):
+    if headers:
+        yield "\t".join(h.translate(TSV_ESCAPES) for h in headers)
+    for row in rows:
+        yield "\t".join('' if v is None else str(v).translate(TSV_ESCAPES) for v in row)
+
+
+def _jsonl_lines(rows: Iterable[tuple], headers: list[str] | None):
+    for row in rows:
+        keys = headers or [f"column{i}" for i in range(len(row))]
+        yield json.dumps(dict(zip(keys, row)), default=str, ensure_ascii=False)
+
+
+def _more() -> bool:
+    """Wait for Enter between pages; False once the reader wants to stop."""
+    try:
+        return input("-- more (Enter, q to stop) --").strip().lower() != 'q'
+    except (KeyboardInterrupt, EOFError):
+        print()
+        return False
+
+
+def render(rows: Iterable[tuple], headers: list[str] | None = None, fmt: str = 'table',
+           sample: int = 200, max_width: int | None = 40, widen: bool = False,
+           page: int = 1000, pause: bool = False, out: TextIO | None = None) -> int:
+    """
+    Print 'rows' as they are read and return how many there were. 'headers' default to
+    the column names of a cursor.
+
+    Table columns are as wide as the widest value among the first 'sample' rows, capped at
+    'max_width' (None for no cap). Longer values further down are cut with '…', or with
+    'widen' the column grows from that row on. Lines are written 'page' rows at a time;
+    with 'pause' (and a terminal on both ends) the printer waits for Enter between pages.
+    """
+    if fmt not in formats:
+        raise ValueError(f"fmt must be one of {formats}, not {fmt!r}")
+    out = out or sys.stdout
+    headers = _headers(rows, headers)
+    count = 0
+
+    def counted(source):
+        nonlocal count
+        for row in source:
+            count += 1
+            yield row
+
+    if fmt == 'table':
+        lines = _table_lines(counted(rows), headers, sample, max_width, widen)
+    elif fmt == 'tsv':
+        lines = _tsv_lines(counted(rows), headers)
+    else:
+        lines = _jsonl_lines(counted(rows), headers)
+
+    interactive = pause and out.isatty() and sys.stdin.isatty()
+    pages = iter(lambda: list(islice(lines, page)), [])
+    for number, lines_on_page in enumerate(pages):
+        if number and interactive and not _more():
+            return count
+        out.write("\n".join(lines_on_page) + "\n")
+        out.flush()
+    if fmt == 'table':
+        out.write(f"\n({count} rows)\n" if count else "No results found.\n")
+    return count
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream a query's results to the terminal")
+    parser.add_argument('query', help="SQL to run")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to query")
+    parser.add_argument('--format', choices=formats, default='table', help="Output format")
+    parser.add_argument('--sample', type=int, default=200,
+                        help="Rows used to size the table columns")
+    parser.add_argument('--max-width', type=int, default=40,
+                        help="Widest a column starts (0 = no limit)")
+    parser.add_argument('--widen', action='store_true',
+                        help="Grow columns for longer values instead of truncating them")
+    parser.add_argument('--page', type=int, default=1000, help="Rows written at a time")
+    parser.add_argument('--pause', action='store_true', help="Wait for Enter between pages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        render(conn.execute(args.query), fmt=args.format, sample=args.sample,
+               max_width=args.max_width or None, widen=args.widen, page=args.page,
+               pause=args.pause)
+    except BrokenPipeError:
+        # The reader (head, less) has gone; keep the exit-time flush from failing again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
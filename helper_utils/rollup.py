@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - incrementally maintained per-module rollups
+The machinery behind module_risk.py and module_flags.py: a table with one row per module
+whose columns are sums of 0/1 expressions over the five fact tables, built with one
+GROUP BY pass per table and kept current two ways:
+    triggers - AFTER INSERT triggers fold each row in as it arrives (in the compact
+               layout they go on the _data tables)
+    batch    - refresh() folds in rows past each table's rowid high-water mark, recorded
+               in a <name>_state table
+
+    risk = Rollup('module_risk', {'module_events': ('module_name', {
+        'failed_loads': "CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END",
+    })}, row_columns=('status',))
+    risk.install(conn)
+    risk.refresh(conn)   # {'module_events': rows folded in}
+"""
+
+import re
+import sqlite3
+
+from helper_utils.compact_schema import data_table, is_compact, new_row_value
+from helper_utils.generate_ctf_db import primary_keys
+
+
+class Rollup:
+    """
+    One row per module in table 'name'. 'sources' maps each fact table to its module column
+    and {counter: 0/1 expression}; 'row_columns' are the fact columns those expressions read,
+    rewritten to the inserted row's values inside the triggers.
+
+    Subclasses can derive extra columns from the counters by extending extra_columns,
+    values() and merge().
+    """
+
+    extra_columns: tuple[str, ...] = ()
+
+    def __init__(self, name: str, sources: dict[str, tuple[str, dict[str, str]]],
+                 row_columns: tuple[str, ...]):
+        self.name = name
+        self.sources = sources
+        self.counters = [counter for _, columns in sources.values() for counter in columns]
+        self.row_columns = re.compile(rf"\b({'|'.join(row_columns)})\b")
+        columns = [*self.extra_columns, *self.counters]
+        self.ddl = f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            module_name TEXT PRIMARY KEY NOT NULL,
+            {', '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in columns)}
+        )
+        """
+        self.state_ddl = f"""
+        CREATE TABLE IF NOT EXISTS {name}_state (
+            table_name TEXT PRIMARY KEY,
+            max_rowid INTEGER NOT NULL
+        )
+        """
+
+    def values(self, expressions: dict[str, str]) -> dict[str, str]:
+        """Column -> SQL value to upsert, given each counter's value for a group of rows."""
+        return expressions
+
+    def merge(self, column: str) -> str:
+        """How an upserted value combines with the module's existing one."""
+        return f"{column} = {column} + excluded.{column}"
+
+    def _upsert(self, key: str, values: dict[str, str], rest: str) -> str:
+        """INSERT ... SELECT ... ON CONFLICT statement folding 'values' onto a module's row."""
+        return (
+            f"INSERT INTO {self.name} (module_name, {', '.join(values)}) "
+            f"SELECT {key}, {', '.join(values.values())} {rest} "
+            f"ON CONFLICT(module_name) DO UPDATE SET {', '.join(map(self.merge, values))}"
+        )
+
+    def _batch_upsert(self, table: str) -> str:
+        """Fold in the rows with primary keys in (?, ?]."""
+        key, columns = self.sources[table]
+        pk = primary_keys[table]
+        sums = {counter: f"SUM({expression})" for counter, expression in columns.items()}
+        return self._upsert(key, self.values(sums), (
+            f"FROM {table} WHERE {pk} > ? AND {pk} <= ? AND {key} IS NOT NULL GROUP BY {key}"
+        ))
+
+    def _trigger(self, table: str, compact: bool = False) -> str:
+        """
+        AFTER INSERT trigger folding each new row in. In the compact layout it goes on the
+        _data table and decodes the row's values back to the originals the expressions test.
+        """
+        key, columns = self.sources[table]
+        if compact:
+            value, target = (lambda column: new_row_value(table, column)), data_table(table)
+        else:
+            value, target = (lambda column: f"NEW.{column}"), table
+        row_values = {counter: self.row_columns.sub(lambda m: value(m.group(1)), expression)
+                      for counter, expression in columns.items()}
+        return f"""
+        CREATE TRIGGER IF NOT EXISTS {self.name}_{table} AFTER INSERT ON {target}
+        BEGIN
+            {self._upsert(value(key), self.values(row_values),
+                          f"WHERE {value(key)} IS NOT NULL")};
+            UPDATE {self.name}_state SET max_rowid = NEW.{primary_keys[table]}
+                WHERE table_name = '{table}';
+        END
+        """
+
+    def _high_water_marks(self, conn: sqlite3.Connection) -> dict[str, int]:
+        return {table: conn.execute(
+            f"SELECT COALESCE(MAX({primary_keys[table]}), 0) FROM {table}"
+        ).fetchone()[0] for table in self.sources}
+
+    @staticmethod
+    def _begin(conn: sqlite3.Connection) -> None:
+        """
+        Take the write lock before reading the marks, so no row can land between reading a
+        table's MAX(rowid) and folding rows up to it in.
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+    def is_installed(self, conn: sqlite3.Connection) -> bool:
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (self.name,)
+        ).fetchone()
+        return count > 0
+
+    def has_triggers(self, conn: sqlite3.Connection) -> bool:
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN "
+            f"({', '.join('?' * len(self.sources))})",
+            [f"{self.name}_{table}" for table in self.sources]
+        ).fetchone()
+        return count > 0
+
+    def install(self, conn: sqlite3.Connection, triggers: bool = False) -> None:
+        """
+        (Re)build the rollup with one pass over each source table and record each table's
+        rowid mark. With 'triggers', AFTER INSERT triggers keep it current from then on;
+        without, call refresh() to fold in new rows.
+        """
+        with conn:
+            self._begin(conn)
+            self.drop(conn)
+            conn.execute(self.ddl)
+            conn.execute(self.state_ddl)
+            for table, max_rowid in self._high_water_marks(conn).items():
+                conn.execute(self._batch_upsert(table), (0, max_rowid))
+                conn.execute(f"INSERT INTO {self.name}_state VALUES (?, ?)", (table, max_rowid))
+            if triggers:
+                compact = is_compact(conn.cursor())
+                for table in self.sources:
+                    conn.execute(self._trigger(table, compact))
+
+    def drop(self, conn: sqlite3.Connection) -> None:
+        for table in self.sources:
+            conn.execute(f"DROP TRIGGER IF EXISTS {self.name}_{table}")
+        conn.execute(f"DROP TABLE IF EXISTS {self.name}")
+        conn.execute(f"DROP TABLE IF EXISTS {self.name}_state")
+
+    def refresh(self, conn: sqlite3.Connection) -> dict[str, int]:
+        """
+        Fold rows inserted since the last mark into the rollup and return {table: new rows}.
+        Only rowids (primary keys) between each mark and the current MAX are read, both taken
+        under one write lock, so the cost follows the size of the increment and a row arriving
+        mid-refresh is left for the next one rather than counted twice.
+        If a source table was rebuilt underneath the rollup (its max rowid is now below the
+        mark), the whole rollup is rebuilt instead. With triggers installed the marks are
+        already current and this is a no-op.
+        """
+        added = {}
+        with conn:
+            self._begin(conn)
+            marks = dict(conn.execute(f"SELECT table_name, max_rowid FROM {self.name}_state"))
+            current = self._high_water_marks(conn)
+            if any(current[table] < marks.get(table, 0) for table in self.sources):
+                self.install(conn, self.has_triggers(conn))
+                return current
+            for table in self.sources:
+                mark = marks.get(table, 0)
+                added[table] = current[table] - mark
+                if added[table] <= 0:
+                    continue
+                conn.execute(self._batch_upsert(table), (mark, current[table]))
+                conn.execute(f"INSERT OR REPLACE INTO {self.name}_state VALUES (?, ?)",
+                             (table, current[table]))
+        return added
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - in-memory snapshot mode
+Copies kernel_logs.db into a shared in-memory database with the sqlite3 backup API and
+serves every read from there, so interactive queries never touch the disk or miss the page
+cache. The copy is reloaded only when the file's change counter moves.
+
+    from helper_utils.snapshot import get_snapshot
+
+    snapshot = get_snapshot('kernel_logs.db')
+    with snapshot.connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM boot_logs").fetchone()
+
+instantiate_db(snapshot=True) and query_starter.get_connection(snapshot=True) use it.
+Snapshot connections are read-only (PRAGMA query_only) - write to the file and the
+snapshot follows. With in_memory=False the file is read in place through a large
+memory map instead, for databases too big to copy.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from helper_utils.connection_pool import ConnectionPool, PooledConnection, default_pragmas
+
+snapshot_pragmas = (
+    "PRAGMA query_only = ON",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Ask for the largest map SQLite allows; builds cap it at SQLITE_MAX_MMAP_SIZE
+mmap_pragmas = default_pragmas + ("PRAGMA mmap_size = 1099511627776", "PRAGMA query_only = ON")
+
+_names = itertools.count(1)
+
+
+def source_version(db_path: str) -> tuple:
+    """
+    The file change counter (header bytes 24-27, bumped by every committing write) plus
+    the WAL file's size and mtime, since commits to a WAL database don't touch the header
+    until a checkpoint. The inode catches the file being replaced outright.
+    """
+    with open(db_path, 'rb') as f:
+        header = f.read(100)
+    stat = os.stat(db_path)
+    try:
+        wal = os.stat(f"{db_path}-wal")
+        wal_version = (wal.st_size, wal.st_mtime_ns)
+    except FileNotFoundError:
+        wal_version = None
+    return (stat.st_ino, int.from_bytes(header[24:28], 'big'), wal_version)
+
+
+class Snapshot:
+    """
+    In-memory copy of one database file behind a bounded connection pool.
+
+    The copy lives in a named shared-cache memory database ('file:...?mode=memory&cache=shared'),
+    so every pooled connection sees the same pages; a holder connection keeps it alive.
+    At most every 'check_interval' seconds a checkout compares source_version() with the one
+    the copy was taken at, and on a change backs the file up into a fresh memory database and
+    swaps the pool. Connections still out on the old copy keep it until they are returned.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, check_interval: float = 1.0,
+                 in_memory: bool = True):
+        self.db_path = os.path.abspath(db_path)
+        self.size = size
+        self.check_interval = check_interval
+        self.in_memory = in_memory
+        self._lock = threading.Lock()
+        self._pool = None
+        self._holder = None
+        self._version = None
+        self._checked = 0.0
+        self.loads = 0
+        self.load_seconds = 0.0
+
+    def _load(self) -> None:
+        version = source_version(self.db_path)
+        if not self.in_memory:
+            self._pool = self._pool or ConnectionPool(self.db_path, self.size,
+                                                      pragmas=mmap_pragmas)
+            self._version = version
+            return
+
+        start = time.perf_counter()
+        uri = f"file:ctf_snapshot_{os.getpid()}_{next(_names)}?mode=memory&cache=shared"
+        holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            source.backup(holder)
+        finally:
+            source.close()
+        pool = ConnectionPool(uri, self.size, pragmas=snapshot_pragmas, uri=True)
+
+        previous_pool, previous_holder = self._pool, self._holder
+        self._pool, self._holder, self._version = pool, holder, version
+        if previous_pool is not None:
+            previous_pool.close()
+            previous_holder.close()
+        self.loads += 1
+        self.load_seconds += time.perf_counter() - start
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the file changed since the copy was taken; True if it reloaded."""
+        with self._lock:
+            now = time.monotonic()
+            if self._pool is not None and not force and now - self._checked < self.check_interval:
+                return False
+            self._checked = now
+            if self._pool is not None and not force \
+                    and source_version(self.db_path) == self._version:
+                return False
+            self._load()
+            return True
+
+    def pool(self) -> ConnectionPool:
+        self.refresh()
+        return self._pool
+
+    def checkout(self) -> PooledConnection:
+        """Borrow a read-only snapshot connection; close() it to give it back."""
+        return self.pool().checkout()
+
+    @contextmanager
+    def connection(self):
+        with self.pool().connection() as conn:
+            yield conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+            if self._holder is not None:
+                self._holder.close()
+            self._pool = self._holder = self._version = None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            'in_memory': self.in_memory,
+            **(self._pool.stats() if self._pool is not None else {}),
+        }
+
+
+_snapshots: dict[str, Snapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(db_path: str = 'kernel_logs.db', **kwargs) -> Snapshot:
+    """The shared snapshot of 'db_path', created with 'kwargs' on first use."""
+    key = os.path.abspath(db_path)
+    with _snapshots_lock:
+        if key not in _snapshots:
+            _snapshots[key] = Snapshot(db_path, **kwargs)
+        return _snapshots[key]
+
+
+if __name__ == "__main__":
+    from helper_utils.solutions import tier_queries
+
+    snapshot = get_snapshot()
+    snapshot.refresh()
+    for label, connect in (("disk", lambda: sqlite3.connect('kernel_logs.db')),
+                           ("snapshot", snapshot.checkout)):
+        started = time.perf_counter()
+        for _ in range(5):
+            conn = connect()
+            for sql in tier_queries.values():
+                conn.execute(sql).fetchall()
+            conn.close()
+        print(f"5 x tier queries from {label:<8}: {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(snapshot.stats())
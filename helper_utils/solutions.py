@@ -7,45 +7,27 @@ Only consult if you're truly stuck on a challenge.
 
 import sqlite3
 
-# Connect to database
-conn = sqlite3.connect('kernel_logs.db')
-cursor = conn.cursor()
+# Names the table listing leaves out: SQLite's own tables, FTS5 indexes and their shadow
+# tables, the derived rollups and high-water marks, and the compact layout's storage and
+# dimension tables (compact_schema.dimensions - spelled out to keep this import-light)
+internal_tables = (
+    'sqlite\\_%', '%\\_fts%', 'module\\_flags%', 'module\\_risk%', '%\\_state', '%\\_data',
+    'log\\_levels', 'modules', 'severities', 'statuses', 'subsystems',
+)
 
-print("=" * 70)
-print("SQL CTF SOLUTIONS - SPOILER WARNING!")
-print("=" * 70)
-print()
-
-# ============================================================================
-# TIER 1: RECONNAISSANCE
-# ============================================================================
-print("TIER 1: RECONNAISSANCE")
-print("-" * 70)
-
-print("\nChallenge 1.1: Table Discovery")
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-tables = cursor.fetchall()
-print(f"Tables found: {[t[0] for t in tables]}")
-
-print("\nChallenge 1.2: Boot Session Analysis")
-cursor.execute("""
+# Every tier's reference query, keyed by challenge number
+tier_queries = {
+    # Views are the tables of the compact layout
+    '1.1': "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+           + ''.join(f"AND name NOT LIKE '{pattern}' ESCAPE '\\' " for pattern in internal_tables)
+           + "ORDER BY name",
+    '1.2': """
     SELECT DISTINCT boot_session
     FROM boot_logs
     WHERE log_level IN ('ERROR', 'CRIT')
     ORDER BY boot_session
-""")
-sessions = cursor.fetchall()
-print(f"Boot sessions with errors: {[s[0] for s in sessions]}")
-
-# ============================================================================
-# TIER 2: PATTERN RECOGNITION
-# ============================================================================
-print("\n" + "=" * 70)
-print("TIER 2: PATTERN RECOGNITION")
-print("-" * 70)
-
-print("\nChallenge 2.1: Failed Module Loads")
-cursor.execute("""
+""",
+    '2.1': """
     SELECT 
         module_name,
         COUNT(*) AS failure_count
@@ -55,15 +37,8 @@ cursor.execute("""
     HAVING COUNT(*) > 0
     ORDER BY failure_count DESC
     LIMIT 10
-""")
-results = cursor.fetchall()
-print(f"{'Module':<25} {'Failures':>10}")
-print("-" * 40)
-for module, count in results:
-    print(f"{module:<25} {count:>10}")
-
-print("\nChallenge 2.2: Cross-Table Investigation")
-cursor.execute("""
+""",
+    '2.2': """
     SELECT DISTINCT me.module_name
     FROM module_events AS me
     INNER JOIN error_codes AS ec
@@ -71,21 +46,8 @@ cursor.execute("""
     WHERE me.status = 'FAILED'
         AND ec.severity IN ('HIGH', 'CRITICAL')
     ORDER BY me.module_name
-""")
-results = cursor.fetchall()
-print(f"Modules with both failed loads and critical errors:")
-for (module,) in results:
-    print(f"  • {module}")
-
-# ============================================================================
-# TIER 3: ADVANCED CORRELATION
-# ============================================================================
-print("\n" + "=" * 70)
-print("TIER 3: ADVANCED CORRELATION")
-print("-" * 70)
-
-print("\nChallenge 3.1: The Triple Threat")
-cursor.execute("""
+""",
+    '3.1': """
     SELECT 
         me.module_name,
         COUNT(DISTINCT me.event_id) AS failed_loads,
@@ -106,15 +68,8 @@ cursor.execute("""
     ORDER BY (COUNT(DISTINCT me.event_id) + 
               COUNT(DISTINCT ec.error_id) + 
               COUNT(DISTINCT mem.mem_id)) DESC
-""")
-results = cursor.fetchall()
-print(f"{'Module':<25} {'Failed Loads':>12} {'Crit Errors':>12} {'Mem Fails':>12}")
-print("-" * 70)
-for module, loads, errors, mem in results:
-    print(f"{module:<25} {loads:>12} {errors:>12} {mem:>12}")
-
-print("\nChallenge 3.2: Temporal Analysis")
-cursor.execute("""
+""",
+    '3.2': """
     SELECT DISTINCT me.module_name
     FROM module_events AS me
     INNER JOIN system_calls AS sc
@@ -123,21 +78,8 @@ cursor.execute("""
         AND sc.return_code < 0
         AND ABS(me.timestamp - sc.timestamp) < 100
     ORDER BY me.module_name
-""")
-results = cursor.fetchall()
-print("Modules with syscall failures within 100s of module load:")
-for (module,) in results:
-    print(f"  • {module}")
-
-# ============================================================================
-# TIER 4: STATISTICAL ANOMALY DETECTION
-# ============================================================================
-print("\n" + "=" * 70)
-print("TIER 4: STATISTICAL ANOMALY DETECTION")
-print("-" * 70)
-
-print("\nChallenge 4.1: Memory Allocation Anomaly")
-cursor.execute("""
+""",
+    '4.1': """
     SELECT 
         requesting_module,
         COUNT(*) AS total_requests,
@@ -152,15 +94,8 @@ cursor.execute("""
     HAVING COUNT(*) >= 5
         AND failure_rate_pct > 40
     ORDER BY failure_rate_pct DESC
-""")
-results = cursor.fetchall()
-print(f"{'Module':<25} {'Total Req':>10} {'Failures':>10} {'Rate %':>10}")
-print("-" * 70)
-for module, total, failures, rate in results:
-    print(f"{module:<25} {total:>10} {failures:>10} {rate:>10.1f}")
-
-print("\nChallenge 4.2: The Network Stack Investigation")
-cursor.execute("""
+""",
+    '4.2': """
     SELECT DISTINCT dd.parent_module
     FROM device_drivers AS dd
     INNER JOIN error_codes AS ec
@@ -170,22 +105,8 @@ cursor.execute("""
         AND ec.subsystem = 'network'
     GROUP BY dd.parent_module
     HAVING COUNT(DISTINCT dd.driver_id) >= 2
-""")
-results = cursor.fetchall()
-print("Modules causing network driver failures:")
-for (module,) in results:
-    print(f"  • {module}")
-
-# ============================================================================
-# TIER 5: THE FINAL PROOF
-# ============================================================================
-print("\n" + "=" * 70)
-print("TIER 5: THE FINAL PROOF")
-print("-" * 70)
-
-print("\nChallenge 5.1: Unified Timeline (sample for one module)")
-# This shows timeline for the faulty module
-cursor.execute("""
+""",
+    '5.1': """
     SELECT 
         timestamp,
         'MODULE_EVENT' AS event_type,
@@ -216,16 +137,8 @@ cursor.execute("""
     
     ORDER BY timestamp
     LIMIT 20
-""")
-results = cursor.fetchall()
-print(f"{'Timestamp':<15} {'Event Type':<15} {'Detail':<15} {'Session':<10}")
-print("-" * 70)
-for ts, evt_type, detail, session in results:
-    session_str = str(int(session)) if session else 'N/A'
-    print(f"{ts:<15.2f} {evt_type:<15} {detail:<15} {session_str:<10}")
-
-print("\nChallenge 5.2: The Smoking Gun - COMPREHENSIVE ANALYSIS")
-cursor.execute("""
+""",
+    '5.2': """
     WITH 
     failed_loads AS (
         SELECT 
@@ -295,44 +208,162 @@ cursor.execute("""
         AND COALESCE(ce.critical_error_count, 0) >= 2
         AND COALESCE(ms.mem_failure_rate, 0) > 35
     ORDER BY danger_score DESC
-""")
+""",
+}
+
+
+def main(db_path: str = 'kernel_logs.db') -> None:
+    # Connect to database
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("=" * 70)
+    print("SQL CTF SOLUTIONS - SPOILER WARNING!")
+    print("=" * 70)
+    print()
+
+    # ============================================================================
+    # TIER 1: RECONNAISSANCE
+    # ============================================================================
+    print("TIER 1: RECONNAISSANCE")
+    print("-" * 70)
+
+    print("\nChallenge 1.1: Table Discovery")
+    cursor.execute(tier_queries['1.1'])
+    tables = cursor.fetchall()
+    print(f"Tables found: {[t[0] for t in tables]}")
+
+    print("\nChallenge 1.2: Boot Session Analysis")
+    cursor.execute(tier_queries['1.2'])
+    sessions = cursor.fetchall()
+    print(f"Boot sessions with errors: {[s[0] for s in sessions]}")
+
+    # ============================================================================
+    # TIER 2: PATTERN RECOGNITION
+    # ============================================================================
+    print("\n" + "=" * 70)
+    print("TIER 2: PATTERN RECOGNITION")
+    print("-" * 70)
+
+    print("\nChallenge 2.1: Failed Module Loads")
+    cursor.execute(tier_queries['2.1'])
+    results = cursor.fetchall()
+    print(f"{'Module':<25} {'Failures':>10}")
+    print("-" * 40)
+    for module, count in results:
+        print(f"{module:<25} {count:>10}")
+
+    print("\nChallenge 2.2: Cross-Table Investigation")
+    cursor.execute(tier_queries['2.2'])
+    results = cursor.fetchall()
+    print(f"Modules with both failed loads and critical errors:")
+    for (module,) in results:
+        print(f"  • {module}")
+
+    # ============================================================================
+    # TIER 3: ADVANCED CORRELATION
+    # ============================================================================
+    print("\n" + "=" * 70)
+    print("TIER 3: ADVANCED CORRELATION")
+    print("-" * 70)
+
+    print("\nChallenge 3.1: The Triple Threat")
+    cursor.execute(tier_queries['3.1'])
+    results = cursor.fetchall()
+    print(f"{'Module':<25} {'Failed Loads':>12} {'Crit Errors':>12} {'Mem Fails':>12}")
+    print("-" * 70)
+    for module, loads, errors, mem in results:
+        print(f"{module:<25} {loads:>12} {errors:>12} {mem:>12}")
+
+    print("\nChallenge 3.2: Temporal Analysis")
+    cursor.execute(tier_queries['3.2'])
+    results = cursor.fetchall()
+    print("Modules with syscall failures within 100s of module load:")
+    for (module,) in results:
+        print(f"  • {module}")
+
+    # ============================================================================
+    # TIER 4: STATISTICAL ANOMALY DETECTION
+    # ============================================================================
+    print("\n" + "=" * 70)
+    print("TIER 4: STATISTICAL ANOMALY DETECTION")
+    print("-" * 70)
+
+    print("\nChallenge 4.1: Memory Allocation Anomaly")
+    cursor.execute(tier_queries['4.1'])
+    results = cursor.fetchall()
+    print(f"{'Module':<25} {'Total Req':>10} {'Failures':>10} {'Rate %':>10}")
+    print("-" * 70)
+    for module, total, failures, rate in results:
+        print(f"{module:<25} {total:>10} {failures:>10} {rate:>10.1f}")
+
+    print("\nChallenge 4.2: The Network Stack Investigation")
+    cursor.execute(tier_queries['4.2'])
+    results = cursor.fetchall()
+    print("Modules causing network driver failures:")
+    for (module,) in results:
+        print(f"  • {module}")
+
+    # ============================================================================
+    # TIER 5: THE FINAL PROOF
+    # ============================================================================
+    print("\n" + "=" * 70)
+    print("TIER 5: THE FINAL PROOF")
+    print("-" * 70)
+
+    print("\nChallenge 5.1: Unified Timeline (sample for one module)")
+    # This shows timeline for the faulty module
+    cursor.execute(tier_queries['5.1'])
+    results = cursor.fetchall()
+    print(f"{'Timestamp':<15} {'Event Type':<15} {'Detail':<15} {'Session':<10}")
+    print("-" * 70)
+    for ts, evt_type, detail, session in results:
+        session_str = str(int(session)) if session else 'N/A'
+        print(f"{ts:<15.2f} {evt_type:<15} {detail:<15} {session_str:<10}")
+
+    print("\nChallenge 5.2: The Smoking Gun - COMPREHENSIVE ANALYSIS")
+    cursor.execute(tier_queries['5.2'])
+
+    results = cursor.fetchall()
+    print(f"\n{'=' * 110}")
+    print(f"{'Module':<25} {'Failed':>7} {'Crit':>7} {'Mem%':>7} {'Net':>7} {'Sys':>7} {'SCORE':>10}")
+    print(f"{'':25} {'Loads':>7} {'Errs':>7} {'Fail':>7} {'Fail':>7} {'Fail':>7} {'':>10}")
+    print(f"{'=' * 110}")
+    for module, loads, errs, mem_pct, net, sys, score in results:
+        print(f"{module:<25} {loads:>7} {errs:>7} {mem_pct:>6.1f}% {net:>7} {sys:>7} {score:>10}")
+
+    print(f"{'=' * 110}")
 
-results = cursor.fetchall()
-print(f"\n{'=' * 110}")
-print(f"{'Module':<25} {'Failed':>7} {'Crit':>7} {'Mem%':>7} {'Net':>7} {'Sys':>7} {'SCORE':>10}")
-print(f"{'':25} {'Loads':>7} {'Errs':>7} {'Fail':>7} {'Fail':>7} {'Fail':>7} {'':>10}")
-print(f"{'=' * 110}")
-for module, loads, errs, mem_pct, net, sys, score in results:
-    print(f"{module:<25} {loads:>7} {errs:>7} {mem_pct:>6.1f}% {net:>7} {sys:>7} {score:>10}")
+    # ============================================================================
+    # THE FLAG
+    # ============================================================================
+    print("\n" + "=" * 70)
+    print("🎯 THE FLAG")
+    print("=" * 70)
 
-print(f"{'=' * 110}")
+    if results:
+        culprit = results[0][0]  # Top result by danger score
+        print(f"\n✅ CULPRIT IDENTIFIED: {culprit}")
+        print(f"\n🏆 FLAG: CTF{{{culprit}}}")
+        print(f"\nCongratulations! You've successfully identified the faulty kernel module!")
+    else:
+        print("\n❌ No module meets all criteria. Review the queries above.")
 
-# ============================================================================
-# THE FLAG
-# ============================================================================
-print("\n" + "=" * 70)
-print("🎯 THE FLAG")
-print("=" * 70)
+    print("\n" + "=" * 70)
 
-if results:
-    culprit = results[0][0]  # Top result by danger score
-    print(f"\n✅ CULPRIT IDENTIFIED: {culprit}")
-    print(f"\n🏆 FLAG: CTF{{{culprit}}}")
-    print(f"\nCongratulations! You've successfully identified the faulty kernel module!")
-else:
-    print("\n❌ No module meets all criteria. Review the queries above.")
+    # Close connection
+    conn.close()
 
-print("\n" + "=" * 70)
+    print("\n💡 Key SQL Concepts Used:")
+    print("  • Multiple CTEs (WITH clauses)")
+    print("  • LEFT JOINs for optional relationships")
+    print("  • COALESCE for NULL handling")
+    print("  • Complex aggregations")
+    print("  • Calculated fields (danger score)")
+    print("  • HAVING clause for post-aggregation filtering")
+    print("  • UNION for combining heterogeneous data")
+    print("\n🎓 You've mastered advanced SQL! Well done!")
 
-# Close connection
-conn.close()
 
-print("\n💡 Key SQL Concepts Used:")
-print("  • Multiple CTEs (WITH clauses)")
-print("  • LEFT JOINs for optional relationships")
-print("  • COALESCE for NULL handling")
-print("  • Complex aggregations")
-print("  • Calculated fields (danger score)")
-print("  • HAVING clause for post-aggregation filtering")
-print("  • UNION for combining heterogeneous data")
-print("\n🎓 You've mastered advanced SQL! Well done!")
+if __name__ == "__main__":
+    main()
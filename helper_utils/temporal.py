@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - temporal correlation engine
+Answers "which modules have an event in table A within N seconds of an event in table B"
+with a single sweep over both tables ordered by (module, timestamp), instead of the
+nested-loop join SQLite runs for ABS(t1.timestamp - t2.timestamp) < N.
+
+Usage (from the repository root):
+    python3 -m helper_utils.temporal                       # challenge 3.2, 100s window
+    python3 -m helper_utils.temporal --window 30 \\
+        --right error_codes.affected_module --right-where "severity = 'CRITICAL'"
+"""
+
+import argparse
+import heapq
+import sqlite3
+from typing import Iterator, NamedTuple
+
+
+class TemporalSource(NamedTuple):
+    """One side of a correlation: a table, its module column and an optional row filter."""
+    table: str
+    key: str
+    where: str = "1 = 1"
+    timestamp: str = 'timestamp'
+
+
+# Challenge 3.2: module loads in sessions 2/3 vs failing syscalls from the same module
+module_loads = TemporalSource('module_events', 'module_name', "boot_session IN (2, 3)")
+failed_syscalls = TemporalSource('system_calls', 'caller_module', "return_code < 0")
+
+
+def stream(conn: sqlite3.Connection, source: TemporalSource, side: int,
+           arraysize: int = 10000) -> Iterator[tuple[str, float, int]]:
+    """Yield (key, timestamp, side) for one source in (key, timestamp) order."""
+    cursor = conn.cursor()
+    cursor.arraysize = arraysize
+    cursor.execute(f"""
+        SELECT {source.key}, {source.timestamp} FROM {source.table}
+        WHERE ({source.where})
+        AND {source.key} IS NOT NULL AND {source.timestamp} IS NOT NULL
+        ORDER BY {source.key}, {source.timestamp}
+    """)
+    while rows := cursor.fetchmany():
+        for key, timestamp in rows:
+            yield key, timestamp, side
+
+
+def correlate(conn: sqlite3.Connection, left: TemporalSource = module_loads,
+              right: TemporalSource = failed_syscalls,
+              window: float = 100.0) -> dict[str, tuple[float, float]]:
+    """
+    Return {key: (left_timestamp, right_timestamp)} for every key with at least one left
+    and one right event strictly less than 'window' seconds apart, along with the first
+    such pair found. Keys come back sorted, matching the SQL's ORDER BY.
+
+    Both sources are merged into one (key, timestamp) ordered stream. Within a key, the
+    closest opposite-side event to any event is either the latest one already seen or
+    the next one to come - and that next one will look back at this event in turn - so
+    remembering the last timestamp per side is enough. The cost is one pass over each
+    table (plus SQLite's sort), with memory independent of events per module.
+    """
+    merged = heapq.merge(stream(conn, left, 0), stream(conn, right, 1))
+    matches = {}
+    current = None
+    last_seen = [None, None]
+    for key, timestamp, side in merged:
+        if key != current:
+            current = key
+            last_seen = [None, None]
+        if key in matches:
+            continue
+        other = last_seen[1 - side]
+        if other is not None and timestamp - other < window:
+            matches[key] = (other, timestamp) if side == 1 else (timestamp, other)
+        last_seen[side] = timestamp
+    return matches
+
+
+def parse_source(spec: str, where: str | None, default: TemporalSource) -> TemporalSource:
+    if spec is None:
+        return default if where is None else default._replace(where=where)
+    table, _, key = spec.partition('.')
+    return TemporalSource(table, key, where or "1 = 1")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep-line time-proximity correlation")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to query")
+    parser.add_argument('--window', type=float, default=100.0,
+                        help="Maximum seconds between the two events (exclusive)")
+    parser.add_argument('--left', default=None, metavar='TABLE.KEY',
+                        help="Left table and module column (default module_events.module_name)")
+    parser.add_argument('--left-where', default=None, help="SQL filter for left rows")
+    parser.add_argument('--right', default=None, metavar='TABLE.KEY',
+                        help="Right table and module column (default system_calls.caller_module)")
+    parser.add_argument('--right-where', default=None, help="SQL filter for right rows")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    matches = correlate(
+        conn,
+        parse_source(args.left, args.left_where, module_loads),
+        parse_source(args.right, args.right_where, failed_syscalls),
+        args.window,
+    )
+    conn.close()
+    print(f"{'Module':<25} {'Left ts':>16} {'Right ts':>16} {'Gap s':>8}")
+    print("-" * 68)
+    for module, (left_ts, right_ts) in matches.items():
+        print(f"{module:<25} {left_ts:>16.2f} {right_ts:>16.2f} {abs(left_ts - right_ts):>8.2f}")
+    print(f"\n({len(matches)} modules)")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+SQL CTF: Kernel Module Detective - streaming unified timeline
+The tier 5.1 timeline as a lazy iterator: one timestamp-ordered cursor per source table,
+merged with a heap, so the first event comes back without SQLite sorting the whole
+UNION ALL first and memory stays at one small fetch buffer per source.
+
+    from itertools import islice
+    from helper_utils.timeline import timeline
+
+    for event in islice(timeline(conn, 'corrupted_netfilter'), 20):
+        print(event)
+
+Each cursor only streams (rather than sorting its matches) when its table has an index on
+(module column, timestamp), or on timestamp for the all-modules timeline. Create them with
+install_indexes() or --install-indexes.
+
+Usage (from the repository root):
+    python3 -m helper_utils.timeline --install-indexes
+    python3 -m helper_utils.timeline --module corrupted_netfilter --limit 20
+    python3 -m helper_utils.timeline --start 1705312800 --end 1705316400 --page 50
+"""
+
+import argparse
+import heapq
+import sqlite3
+from typing import Iterator, NamedTuple
+
+
+class TimelineSource(NamedTuple):
+    """One table feeding the timeline and how its rows are labelled."""
+    table: str
+    event_type: str
+    detail: str  # SQL expression
+    module: str | None  # Module column, None if the table has none
+    boot_session: str = 'NULL'
+
+
+class TimelineEvent(NamedTuple):
+    timestamp: float
+    event_type: str
+    module: str | None
+    detail: str | None
+    boot_session: int | None
+
+
+# The first three are tier 5.1's sources, with the same labels and detail expressions
+timeline_sources = (
+    TimelineSource('module_events', 'MODULE_EVENT', 'status', 'module_name', 'boot_session'),
+    TimelineSource('error_codes', 'ERROR_CODE', 'severity', 'affected_module'),
+    TimelineSource('memory_events', 'MEMORY_EVENT',
+                   "CASE WHEN allocation_success = 0 THEN 'FAILED' ELSE 'SUCCESS' END",
+                   'requesting_module'),
+    TimelineSource('system_calls', 'SYSTEM_CALL', "syscall_name || ' -> ' || return_code",
+                   'caller_module'),
+    TimelineSource('device_drivers', 'DEVICE_DRIVER',
+                   "driver_name || ' ' || initialization_status", 'parent_module'),
+    TimelineSource('boot_logs', 'BOOT_LOG', "log_level || ': ' || message", None,
+                   'boot_session'),
+)
+
+
+def timeline_indexes(sources: tuple[TimelineSource, ...] = timeline_sources) -> list[str]:
+    ddl = []
+    for source in sources:
+        ddl.append(f"CREATE INDEX IF NOT EXISTS idx_{source.table}_ts "
+                   f"ON {source.table}(timestamp)")
+        if source.module:
+            ddl.append(f"CREATE INDEX IF NOT EXISTS idx_{source.table}_{source.module}_ts "
+                       f"ON {source.table}({source.module}, timestamp)")
+    return ddl
+
+
+def install_indexes(conn: sqlite3.Connection) -> None:
+    """Create the timeline indexes - on the _data tables in the compact layout."""
+    from helper_utils.compact_schema import compact_index, is_compact
+
+    compact = is_compact(conn.cursor())
+    with conn:
+        for ddl in timeline_indexes():
+            conn.execute(compact_index(ddl) if compact else ddl)
+
+
+def stream(conn: sqlite3.Connection, source: TimelineSource, module: str | None = None,
+           start: float | None = None, end: float | None = None,
+           arraysize: int = 256) -> Iterator[TimelineEvent]:
+    """One source's events in timestamp order, 'arraysize' rows fetched at a time."""
+    filters, params = ["timestamp IS NOT NULL"], []
+    if module is not None:
+        filters.append(f"{source.module} = ?")
+        params.append(module)
+    if start is not None:
+        filters.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        filters.append("timestamp < ?")
+        params.append(end)
+    cursor = conn.cursor()
+    cursor.arraysize = arraysize
+    cursor.execute(f"""
+        SELECT timestamp, '{source.event_type}', {source.module or 'NULL'},
+               {source.detail}, {source.boot_session}
+        FROM {source.table}
+        WHERE {' AND '.join(filters)}
+        ORDER BY timestamp
+    """, params)
+    try:
+        while rows := cursor.fetchmany():
+            for row in rows:
+                yield TimelineEvent(*row)
+    finally:
+        cursor.close()
+
+
+def timeline(conn: sqlite3.Connection, module: str | None = None, start: float | None = None,
+             end: float | None = None,
+             sources: tuple[TimelineSource, ...] = timeline_sources,
+             arraysize: int = 256) -> Iterator[TimelineEvent]:
+    """
+    Every event for 'module' (or all modules if None) with start <= timestamp < end, in
+    timestamp order. Sources without a module column are left out of a per-module timeline.
+    Nothing is read until the first event is asked for; stop iterating at any point.
+    """
+    if module is not None:
+        sources = tuple(source for source in sources if source.module)
+    streams = [stream(conn, source, module, start, end, arraysize) for source in sources]
+    return heapq.merge(*streams, key=lambda event: event.timestamp)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream the unified event timeline")
+    parser.add_argument('--db', default='kernel_logs.db', help="Database to read")
+    parser.add_argument('--module', default=None, help="Only this module (default: all)")
+    parser.add_argument('--start', type=float, default=None, help="First timestamp (inclusive)")
+    parser.add_argument('--end', type=float, default=None, help="Last timestamp (exclusive)")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many events")
+    parser.add_argument('--page', type=int, default=None,
+                        help="Pause for Enter after every PAGE events")
+    parser.add_argument('--install-indexes', action='store_true',
+                        help="Create the (module, timestamp) and timestamp indexes first")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    conn = sqlite3.connect(args.db)
+    if args.install_indexes:
+        install_indexes(conn)
+    print(f"{'Timestamp':<17} {'Event Type':<14} {'Module':<22} {'Detail':<30} {'Session':<7}")
+    print("-" * 94)
+    try:
+        for n, event in enumerate(timeline(conn, args.module, args.start, args.end), 1):
+            session = str(int(event.boot_session)) if event.boot_session else 'N/A'
+            detail = str(event.detail)[:30]
+            print(f"{event.timestamp:<17.2f} {event.event_type:<14} {event.module or '-':<22} "
+                  f"{detail:<30} {session:<7}")
+            if n == args.limit:
+                break
+            if args.page and n % args.page == 0:
+                input("-- more (Enter, Ctrl-C to stop) --")
+    except (KeyboardInterrupt, EOFError):
+        print()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
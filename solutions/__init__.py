@@ -1,3 +1,26 @@
-from .my_solutions import dump_tables as populate
-from .my_solutions import instantiate_db as instantiate
-from .my_solutions import run_query
+# Exports resolve on first use, so 'import solutions' (or solutions.queries) stays cheap
+# and pandas/SQLAlchemy load only when one of the my_solutions functions is asked for
+_exports = {
+    'populate': ('.my_solutions', 'dump_tables'),
+    'instantiate': ('.my_solutions', 'instantiate_db'),
+    'run_query': ('.my_solutions', 'run_query'),
+    'cache_stats': ('.my_solutions', 'cache_stats'),
+    'run_parallel': ('.my_solutions', 'run_parallel'),
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    module, attribute = _exports[name]
+    value = getattr(import_module(module, __name__), attribute)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
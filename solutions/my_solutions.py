@@ -1,120 +1,270 @@
+import os
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Any
 
 import pandas as pd
-from sqlalchemy import create_engine
-
-queries = {
-    'boot_errors': """
-    SELECT DISTINCT boot_session AS sessions_with_errors
-    FROM boot_logs WHERE log_level IN ('ERROR', 'CRITICAL')
-    ORDER BY sessions_with_errors DESC
-    """,
-    'failed_modules': """
-    SELECT module_name, COUNT(status) AS failure_count FROM module_events
-    WHERE status = 'FAILED'
-    GROUP BY module_name HAVING failure_count >= 1
-    ORDER BY failure_count DESC
-    """,
-    'ct_investigation': """
-    SELECT DISTINCT events.module_name, codes.severity AS error_severity
-    FROM module_events AS events
-    INNER JOIN error_codes AS codes
-    ON events.module_name = codes.affected_module
-    WHERE events.status = 'FAILED' AND
-    (error_severity LIKE 'CRIT%' OR error_severity LIKE 'H___')
-    ORDER BY error_severity
-    """,
-    'triple_threat': """
-    SELECT me.module_name, COUNT(DISTINCT me.event_id) AS failed_loads,
-    COUNT(DISTINCT ec.error_id) AS crit_errors,
-    COUNT(DISTINCT mem.mem_id) AS mem_failures
-    FROM module_events AS me
-    INNER JOIN error_codes AS ec
-    ON me.module_name = ec.affected_module
-    AND ec.severity LIKE 'CRIT%'
-    INNER JOIN memory_events AS mem
-    ON me.module_name = mem.requesting_module
-    AND mem.allocation_success != 'True'
-    WHERE me.status = 'FAILED'
-    GROUP BY me.module_name
-    HAVING COUNT(DISTINCT me.event_id) > 0
-    AND COUNT(DISTINCT ec.error_id) > 0
-    AND COUNT(DISTINCT mem.mem_id) > 0
-    ORDER BY (COUNT(DISTINCT me.event_id) + COUNT(DISTINCT ec.error_id) +
-    COUNT(DISTINCT mem.mem_id)) DESC
-    """,
-    'temporal_analysis': """
-    SELECT DISTINCT module_name FROM module_events as t1
-    INNER JOIN system_calls AS t2
-    ON t1.module_name = t2.caller_module
-    WHERE t1.boot_session IN (2, 3)
-    AND t2.return_code < 0
-    AND ABS(t1.timestamp - t2.timestamp) < 100
-    ORDER BY t1.module_name
-    """,
-}
-
-
-def instantiate_db() -> list[Any, list[str]]:
+
+from helper_utils.connection_pool import ConnectionPool, create_engine, get_pool
+from helper_utils import query_profiler
+from helper_utils.solutions import tier_queries
+from .queries import queries
+from .query_cache import get_cache
+from .typed_frames import memory_report, typed_frame
+
+
+@contextmanager
+def _raw_connection(engine):
+    """The sqlite3 connection behind 'engine' - pooled from disk, or from the snapshot."""
+    fairy = engine.raw_connection()
+    try:
+        yield fairy.driver_connection
+    finally:
+        fairy.close()
+
+
+def instantiate_db(snapshot: bool = False, db_path: str = 'kernel_logs.db') -> list[Any, list[str]]:
     """
     PRELIMINARY WORK:
     Set universally applicable viewing preferences; retrieve top-level view of all tables;
     return a list consisting of an engine object and list of tables.
+
+    With 'snapshot', every read is served from an in-memory copy of the database that is
+    reloaded when the file changes - see helper_utils/snapshot.py.
     """
     pd.set_option('display.max_rows', 1000)
     pd.set_option('display.max_columns', 10)
     pd.set_option('display.width', 200)
-    db_url = "sqlite:///kernel_logs.db"
-    engine = create_engine(db_url)
-
-    # Connect to db & instantiate a cursor object
-    conn = sqlite3.connect('kernel_logs.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-    tables = cursor.fetchall()  # Returns list of tuples
+    # SQLAlchemy draws from the same pooled sqlite3 connections as everything else
+    engine = create_engine(db_path, snapshot=snapshot)
+
+    # Borrow a pooled connection & instantiate a cursor object - returned on exit
+    with _raw_connection(engine) as conn:
+        cursor = conn.cursor()
+        # The fact tables only - no FTS5 shadow tables, rollups or compact-layout storage
+        cursor.execute(tier_queries['1.1'])
+        tables = cursor.fetchall()  # Returns list of tuples
     return [engine, tables]  # Unpack in main.py
 
 
-def dump_tables(engine, tables: list[str, None]) -> None:
+def dump_tables(engine, tables: list[str, None], chunk_size: int = None, head: int = None,
+                export_dir: str = None, typed: bool = False) -> None:
     """
     CHALLENGE 1.1:
     I preferred to start from scratch, installing pandas and sqlalchemy in order to render
     the table data in a more visually appealing manner for initial inspection.
     Feel free to remix this and make it your own.
+
+    By default every table is read whole. For big databases, 'chunk_size' streams each table
+    in rowid order (keyset pagination - no OFFSET rescans) and renders each chunk before
+    reading the next, so peak memory is one chunk however large the table. 'head' reads just
+    the first N rows per table. With 'export_dir', chunks are appended to <table>.csv there
+    instead of being printed. 'typed' loads with per-table dtypes (categories, uint64
+    addresses, bools - see typed_frames.py) and prints the memory saved.
     """
     lst = []
     for index, item in enumerate(tables):
         lst.append(item[0])  # Break up the tuples - 2nd value is null for each of them
     try:
         for t in lst:
-            print(f"{'-' * 50} {str(t.upper())} {'-' * 50}")
-            query = f"SELECT * FROM {t}"
-            df_query = pd.read_sql_query(query, con=engine)
-            print(df_query, end="\n\n")
+            if export_dir:
+                path = os.path.join(export_dir, f"{t}.csv")
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                print(f"{'-' * 50} {str(t.upper())} {'-' * 50}")
+            if head is not None:
+                chunks = [pd.read_sql_query(f"SELECT * FROM {t} LIMIT {int(head)}", con=engine)]
+            elif chunk_size:
+                chunks = iter_table_chunks(engine, t, chunk_size)
+            else:
+                chunks = [pd.read_sql_query(f"SELECT * FROM {t}", con=engine)]
+            for number, chunk in enumerate(chunks):
+                if typed:
+                    raw, chunk = chunk, typed_frame(chunk, t)
+                    if not export_dir:
+                        print(memory_report(raw, chunk))
+                    del raw
+                if export_dir:
+                    chunk.to_csv(path, mode='a', header=number == 0, index=False)
+                elif chunk_size and head is None:
+                    print(chunk.to_string(), end="\n\n")  # Whole chunk, no row elision
+                else:
+                    print(chunk, end="\n\n")
+                del chunk
     except Exception as e:
         print(f"Caught an error - {type(e).__name__}: {str(e)}")
 
 
-def run_query(engine, heading: str = None, **kwargs) -> None:
+def iter_table_chunks(engine, table: str, chunk_size: int):
+    """
+    Yield DataFrames of at most 'chunk_size' rows in rowid order. Each page starts after
+    the last rowid of the previous one (rowid is the INTEGER PRIMARY KEY - log_id, event_id
+    and so on), so every page is an index seek rather than an OFFSET rescan. Views (the
+    compact layout) have no rowid and page on their first column, the primary key.
+    """
+    key = 'rowid'
+    with _raw_connection(engine) as conn:
+        (kind,) = conn.execute(
+            "SELECT type FROM sqlite_master WHERE name = ?", (table,)
+        ).fetchone() or ('table',)
+        if kind == 'view':
+            key = conn.execute(f"PRAGMA table_info({table})").fetchone()[1]
+    query = f"""
+    SELECT {key} AS _page_key, * FROM {table}
+    WHERE {key} > ? ORDER BY {key} LIMIT ?
+    """
+    last_key = 0
+    row_offset = 0
+    while True:
+        chunk = pd.read_sql_query(query, con=engine, params=(last_key, chunk_size))
+        if chunk.empty:
+            return
+        last_key = int(chunk.pop('_page_key').iloc[-1])
+        chunk.index += row_offset  # Keep the running row numbers pandas would have shown
+        row_offset += len(chunk)
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+
+
+def _profiled_frame(conn, name: str, query: str, params: tuple = ()) -> pd.DataFrame:
+    """The fetch behind pd.read_sql_query, split into its SQLite and DataFrame halves."""
+    with query_profiler.QueryProfile(conn, name, query, params, source='my_solutions') as profile:
+        cursor = conn.execute(query, params)
+        rows = cursor.fetchall()
+        profile.fetched(len(rows))
+        return pd.DataFrame.from_records(
+            rows, columns=[column[0] for column in cursor.description], coerce_float=True
+        )
+
+
+def read_frame(engine, name: str, query: str, params: tuple = ()) -> pd.DataFrame:
+    """pd.read_sql_query, profiled into the query trace while tracing is on."""
+    if not query_profiler.enabled():
+        return pd.read_sql_query(query, con=engine, params=params or None)
+    with _raw_connection(engine) as conn:
+        return _profiled_frame(conn, name, query, params)
+
+
+def run_query(engine, heading: str = None, cache: bool = True, params: tuple = (),
+              typed: bool = False, **kwargs) -> None:
     """
     Reusable implementation for various challenges - unpack associated keyword args
     values as lookup keys for 'queries' dictionary
+
+    Results are cached per (query name, text, params) and served again while the database
+    is unchanged - see solutions/query_cache.py. Pass cache=False to always hit SQLite.
+    Set CTF_QUERY_TRACE to a file path to profile each execution (cache misses only).
+    'typed' converts results with typed_frames.py dtypes and prints the memory saved.
     """
     if len(kwargs.items()) == 0:
         print("No key specified to lookup a query.")
         return
         # For now, I'll only ever pass desired dict key/s as kwargs
+    result_cache = get_cache(engine.url.database) if cache else None
     try:
         for v in kwargs.values():
             query = queries.get(v, "Not found.")
-            df_query = pd.read_sql_query(query, con=engine)
+            reports = []
+
+            def load() -> pd.DataFrame:
+                df = read_frame(engine, v, query, params)
+                if not typed:
+                    return df
+                converted = typed_frame(df)
+                reports.append(memory_report(df, converted))
+                return converted
+
+            if result_cache is None:
+                df_query = load()
+            else:
+                key = (v, query, tuple(params)) + (('typed',) if typed else ())
+                df_query = result_cache.fetch(key, load)
             heading = (
                 f"{'-' * 50} {str(v.upper())} {'-' * 50}"
                 if not heading
                 else heading.upper()  # Defaults to formatted query name
             )
             print(heading)
+            for report in reports:  # Only on a cache miss - hits were converted already
+                print(report)
             print(df_query, end="\n\n")
     except Exception as e:
         print(f"Caught an error - {type(e).__name__}: {str(e)}")
+
+
+def cache_stats(engine) -> dict[str, Any]:
+    """Hit/miss/eviction counters and memory use of this database's result cache."""
+    return get_cache(engine.url.database).stats()
+
+
+def enable_wal(db_path: str) -> None:
+    """
+    Switch the database to write-ahead logging (persistent, a no-op if already on), so any
+    number of readers can run alongside each other and alongside a writer.
+    """
+    with get_pool(db_path).connection() as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+
+
+def _read_only_query(db_uri: str, query: str) -> pd.DataFrame:
+    """Process-pool worker: one read-only connection for one query."""
+    conn = sqlite3.connect(db_uri, uri=True)
+    try:
+        return pd.read_sql_query(query, con=conn)
+    finally:
+        conn.close()
+
+
+def run_parallel(engine, *names: str, workers: int = None, processes: bool = False,
+                 wal: bool = False) -> dict[str, pd.DataFrame]:
+    """
+    Run several 'queries' entries concurrently and print them in the order given.
+    Every worker reads through its own read-only URI connection, from a pool sized for
+    this call. Threads share the result cache (sqlite3 releases the GIL while SQLite
+    steps); processes=True sidesteps the GIL for DataFrame building as well. Readers
+    already run side by side in any journal mode; wal=True also switches the database
+    to WAL (a persistent change to the file) so they don't block on a concurrent writer.
+    Returns {name: DataFrame}.
+    """
+    db_path = engine.url.database
+    sqls = {name: queries.get(name, "Not found.") for name in names}
+    workers = workers or min(len(sqls), os.cpu_count() or 1)
+    db_uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+    results = {}
+    read_only_pool = None
+    try:
+        if wal:
+            enable_wal(db_path)
+        if processes:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {name: pool.submit(_read_only_query, db_uri, sql)
+                           for name, sql in sqls.items()}
+        else:
+            read_only_pool = ConnectionPool(db_uri, size=workers, uri=True)
+            result_cache = get_cache(db_path)
+
+            def run(name: str) -> pd.DataFrame:
+                with read_only_pool.connection() as conn:
+                    def load() -> pd.DataFrame:
+                        if query_profiler.enabled():
+                            return _profiled_frame(conn, name, sqls[name])
+                        return pd.read_sql_query(sqls[name], con=conn)
+
+                    return result_cache.fetch((name, sqls[name], ()), load)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {name: pool.submit(run, name) for name in sqls}
+
+        for name, future in futures.items():  # Submission order, not completion order
+            results[name] = future.result()
+            print(f"{'-' * 50} {str(name.upper())} {'-' * 50}")
+            print(results[name], end="\n\n")
+    except Exception as e:
+        print(f"Caught an error - {type(e).__name__}: {str(e)}")
+    finally:
+        if read_only_pool is not None:
+            read_only_pool.close()
+    return results
@@ -0,0 +1,52 @@
+# The challenge queries run by main.py, keyed by name. Kept apart from my_solutions.py so
+# looking one up doesn't import pandas and SQLAlchemy.
+queries = {
+    'boot_errors': """
+    SELECT DISTINCT boot_session AS sessions_with_errors
+    FROM boot_logs WHERE log_level IN ('ERROR', 'CRITICAL')
+    ORDER BY sessions_with_errors DESC
+    """,
+    'failed_modules': """
+    SELECT module_name, COUNT(status) AS failure_count FROM module_events
+    WHERE status = 'FAILED'
+    GROUP BY module_name HAVING failure_count >= 1
+    ORDER BY failure_count DESC
+    """,
+    'ct_investigation': """
+    SELECT DISTINCT events.module_name, codes.severity AS error_severity
+    FROM module_events AS events
+    INNER JOIN error_codes AS codes
+    ON events.module_name = codes.affected_module
+    WHERE events.status = 'FAILED' AND
+    (error_severity LIKE 'CRIT%' OR error_severity LIKE 'H___')
+    ORDER BY error_severity
+    """,
+    'triple_threat': """
+    SELECT me.module_name, COUNT(DISTINCT me.event_id) AS failed_loads,
+    COUNT(DISTINCT ec.error_id) AS crit_errors,
+    COUNT(DISTINCT mem.mem_id) AS mem_failures
+    FROM module_events AS me
+    INNER JOIN error_codes AS ec
+    ON me.module_name = ec.affected_module
+    AND ec.severity LIKE 'CRIT%'
+    INNER JOIN memory_events AS mem
+    ON me.module_name = mem.requesting_module
+    AND mem.allocation_success != 'True'
+    WHERE me.status = 'FAILED'
+    GROUP BY me.module_name
+    HAVING COUNT(DISTINCT me.event_id) > 0
+    AND COUNT(DISTINCT ec.error_id) > 0
+    AND COUNT(DISTINCT mem.mem_id) > 0
+    ORDER BY (COUNT(DISTINCT me.event_id) + COUNT(DISTINCT ec.error_id) +
+    COUNT(DISTINCT mem.mem_id)) DESC
+    """,
+    'temporal_analysis': """
+    SELECT DISTINCT module_name FROM module_events as t1
+    INNER JOIN system_calls AS t2
+    ON t1.module_name = t2.caller_module
+    WHERE t1.boot_session IN (2, 3)
+    AND t2.return_code < 0
+    AND ABS(t1.timestamp - t2.timestamp) < 100
+    ORDER BY t1.module_name
+    """,
+}
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import pandas as pd
+
+
+class QueryCache:
+    """
+    LRU cache of query results (DataFrames) for one database file.
+
+    Entries are keyed by (query name, query text, params). Before every lookup the cache
+    compares the database's version token - PRAGMA data_version on a long-lived monitor
+    connection plus the file's inode/size/mtime - and drops everything if it moved, so a
+    hit is only ever served from an unchanged snapshot. data_version catches commits from
+    any other connection (WAL included); the stat fields catch the file being replaced.
+
+    Callers always get their own copy of a result, so mutating it (new columns, inplace=True)
+    never reaches the cached frame or later hits.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._version = None
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _current_version(self) -> tuple:
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return (None,)
+        if self._monitor is None or self._version is None or stat.st_ino != self._version[0]:
+            if self._monitor is not None:
+                self._monitor.close()
+            self._monitor = sqlite3.connect(self.db_path, check_same_thread=False)
+        (data_version,) = self._monitor.execute("PRAGMA data_version").fetchone()
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns, data_version)
+
+    def _validate(self) -> None:
+        version = self._current_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def fetch(self, key: tuple, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Return a copy of the cached result for 'key', or run 'loader' and cache what it
+        returns. A result is only cached if the database version is still the one seen
+        before loading - one read across a commit could mix old and new data.
+        """
+        with self._lock:
+            self._validate()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0].copy()
+            self.misses += 1
+            version = self._version
+
+        result = loader()
+        size = int(result.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._validate()
+            if self._version != version:
+                return result  # The data moved while loading; serve it, don't cache it
+            if size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (result, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+        return result.copy()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+_caches: dict[str, QueryCache] = {}
+
+
+def get_cache(db_path: str, max_bytes: int = None) -> QueryCache:
+    """Shared cache per database path; 'max_bytes' resizes it if given."""
+    db_path = os.path.abspath(db_path)
+    cache = _caches.setdefault(db_path, QueryCache(db_path))
+    if max_bytes is not None:
+        cache.max_bytes = max_bytes
+    return cache
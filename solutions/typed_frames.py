@@ -0,0 +1,110 @@
+import pandas as pd
+
+CATEGORY = 'category'
+
+# Per table, the dtype each column should have once loaded. Besides real pandas dtypes:
+#   'timestamp' - float64 epoch seconds, or datetime64 with timestamps='datetime'
+#   'int'       - smallest integer type that fits (nullable Int64 if there are NULLs)
+#   'bool'      - bool (nullable boolean if there are NULLs)
+#   'address'   - '0x...' hex strings as uint64
+table_dtypes = {
+    'boot_logs': {
+        'log_id': 'int', 'timestamp': 'timestamp', 'log_level': CATEGORY,
+        'subsystem': CATEGORY, 'message': CATEGORY, 'boot_session': 'int',
+    },
+    'module_events': {
+        'event_id': 'int', 'timestamp': 'timestamp', 'module_name': CATEGORY,
+        'action': CATEGORY, 'status': CATEGORY, 'load_address': 'address',
+        'boot_session': 'int',
+    },
+    'error_codes': {
+        'error_id': 'int', 'timestamp': 'timestamp', 'error_code': CATEGORY,
+        'severity': CATEGORY, 'subsystem': CATEGORY, 'affected_module': CATEGORY,
+        'description': CATEGORY,
+    },
+    'system_calls': {
+        'call_id': 'int', 'timestamp': 'timestamp', 'syscall_name': CATEGORY,
+        'return_code': 'int', 'caller_module': CATEGORY, 'process_name': CATEGORY,
+    },
+    'device_drivers': {
+        'driver_id': 'int', 'timestamp': 'timestamp', 'driver_name': CATEGORY,
+        'device_id': CATEGORY, 'initialization_status': CATEGORY, 'parent_module': CATEGORY,
+    },
+    'memory_events': {
+        'mem_id': 'int', 'timestamp': 'timestamp', 'event_type': CATEGORY,
+        'allocated_bytes': 'int', 'requesting_module': CATEGORY, 'allocation_success': 'bool',
+    },
+}
+
+# Query results carry no table name - match their columns by name across every table
+column_dtypes = {column: dtype for dtypes in table_dtypes.values()
+                 for column, dtype in dtypes.items()}
+
+# A column only becomes 'category' if it has at most this many distinct values per row;
+# above that the codes cost more than they save (e.g. unique device ids, real log text)
+max_category_ratio = 0.5
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _low_cardinality(column: pd.Series) -> bool:
+    return len(column) > 0 and column.nunique(dropna=True) <= len(column) * max_category_ratio
+
+
+def _convert(column: pd.Series, dtype: str, timestamps: str) -> pd.Series:
+    if dtype == CATEGORY:
+        return column.astype(CATEGORY) if _low_cardinality(column) else column
+    if dtype == 'timestamp':
+        if timestamps == 'datetime':
+            return pd.to_datetime(column, unit='s')
+        return column.astype('float64')
+    if dtype == 'int':
+        if column.isna().any():
+            return column.astype('Int64')
+        return pd.to_numeric(column, downcast='integer')
+    if dtype == 'bool':
+        column = column.replace({'True': 1, 'False': 0, 'true': 1, 'false': 0})
+        return column.astype('boolean' if column.isna().any() else bool)
+    if dtype == 'address':
+        values = column.map(lambda v: int(v, 16) if isinstance(v, str) else v)
+        return values.astype('UInt64' if values.isna().any() else 'uint64')
+    return column.astype(dtype)
+
+
+def typed_frame(df: pd.DataFrame, table: str = None, timestamps: str = 'float') -> pd.DataFrame:
+    """
+    Return 'df' with the dtypes from table_dtypes (or, without a 'table', matched by column
+    name). Other text columns with few distinct values become 'category' as well. A column
+    whose values don't fit its dtype (e.g. a non-hex address) is left as loaded.
+    """
+    dtypes = table_dtypes.get(table, column_dtypes)
+    typed = {}
+    for name, column in df.items():
+        dtype = dtypes.get(name)
+        if dtype is None:
+            dtype = CATEGORY if pd.api.types.is_string_dtype(column.dtype) else None
+        try:
+            typed[name] = _convert(column, dtype, timestamps) if dtype else column
+        except (TypeError, ValueError):
+            typed[name] = column
+    return pd.DataFrame(typed, index=df.index)
+
+
+def _size(n: int) -> str:
+    return f"{n / 2**20:.2f} MiB" if n >= 2**20 else f"{n / 2**10:.1f} KiB"
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> str:
+    old, new = memory_bytes(before), memory_bytes(after)
+    return f"Memory: {_size(old)} -> {_size(new)} ({new / old:.0%} of untyped)"
+
+
+def read_typed(con, table: str, timestamps: str = 'float', report: bool = False) -> pd.DataFrame:
+    """Load a whole table with its typed dtypes; 'report' prints memory before and after."""
+    raw = pd.read_sql_query(f"SELECT * FROM {table}", con=con)
+    typed = typed_frame(raw, table, timestamps)
+    if report:
+        print(f"{table}: {memory_report(raw, typed)}")
+    return typed